@@ -0,0 +1,394 @@
+"""
+Headless JSON HTTP API for discovery and feed management.
+
+Endpoints:
+    GET    /health                 Liveness check with cache and job stats
+    POST   /discover               {"url": ..., "force": false, "timeout": 30}
+                                   Scan and wait; 504 with a job_id if it takes too long
+    POST   /jobs                   {"url": ..., "force": false} start a background scan
+    GET    /jobs/<id>              Poll a background scan
+    GET    /feeds                  Stream all saved feeds (?website=NAME for one group)
+    GET    /feeds/search?q=TEXT    Search feeds by name, website nickname or URL
+    POST   /feeds                  Save a feed
+    DELETE /feeds/<id>             Delete a feed
+    GET    /export/opml            Stream all saved feeds as OPML
+    GET    /river.rss              Newest items across all feeds as RSS
+                                   (?website=NAME for one group, ?limit=N)
+    GET    /river.json             The same river as JSON Feed 1.1
+
+Requests are served by a bounded worker pool; connections beyond the pool and
+its pending queue get an immediate 503 instead of piling up.
+"""
+
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, Iterable, Iterator, Optional
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape, quoteattr
+
+import validators
+
+from db_manager import DatabaseManager
+from dns_cache import dns_cache
+from feed_cache import FeedCache, DiscoveryCache, UNNAMED_WEBSITE
+from river import FeedRiver
+from rss_discovery import RSSDiscovery
+from scan_jobs import ScanJobManager, QUEUED, RUNNING, FAILED
+from url_utils import normalize_url
+
+# Responses are streamed in chunks of roughly this many bytes
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ApiError(Exception):
+    """An error reported to the client as a JSON body with an HTTP status."""
+
+    def __init__(self, status: int, message: str, **extra):
+        super().__init__(message)
+        self.status = status
+        self.payload = {'error': message, **extra}
+
+
+class ApiContext:
+    """Long-lived objects shared by every request in the server process."""
+
+    def __init__(self, db_path: str = "feed_storage.db", scan_workers: int = 4, discover_timeout: float = 60):
+        self.db_manager = DatabaseManager(db_path)
+        self.feed_cache = FeedCache(self.db_manager)
+        self.discovery_cache = DiscoveryCache(RSSDiscovery(verbose_logging=False), self.db_manager)
+        self.scan_jobs = ScanJobManager(self.discovery_cache, max_workers=scan_workers)
+        self.river = FeedRiver(self.db_manager)
+        self.discover_timeout = discover_timeout
+
+
+def iter_opml(feeds: Iterable[Dict], title: str = "RSS Architect Feeds") -> Iterator[str]:
+    """Render feeds (ordered by website nickname) as OPML 2.0, one fragment at a time."""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<opml version="2.0">\n'
+    yield f'  <head>\n    <title>{escape(title)}</title>\n'
+    yield f'    <dateCreated>{datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")}</dateCreated>\n  </head>\n  <body>\n'
+
+    current_group = None
+    for feed in feeds:
+        group = feed['website_nickname'] or UNNAMED_WEBSITE
+        if group != current_group:
+            if current_group is not None:
+                yield '    </outline>\n'
+            yield f'    <outline text={quoteattr(group)} title={quoteattr(group)}>\n'
+            current_group = group
+
+        name = feed['user_given_name'] or feed['feed_url']
+        yield (f'      <outline type="rss" text={quoteattr(name)} title={quoteattr(name)} '
+               f'xmlUrl={quoteattr(feed["feed_url"])} htmlUrl={quoteattr(feed["site_url"])}/>\n')
+
+    if current_group is not None:
+        yield '    </outline>\n'
+    yield '  </body>\n</opml>\n'
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """Routes API requests; one instance per connection."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'RSSArchitectAPI/1.0'
+    # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    ROUTES = [
+        ('GET', re.compile(r'^/health$'), 'handle_health'),
+        ('POST', re.compile(r'^/discover$'), 'handle_discover'),
+        ('POST', re.compile(r'^/jobs$'), 'handle_create_job'),
+        ('GET', re.compile(r'^/jobs/(\d+)$'), 'handle_get_job'),
+        ('GET', re.compile(r'^/feeds$'), 'handle_list_feeds'),
+        ('GET', re.compile(r'^/feeds/search$'), 'handle_search_feeds'),
+        ('POST', re.compile(r'^/feeds$'), 'handle_save_feed'),
+        ('DELETE', re.compile(r'^/feeds/(\d+)$'), 'handle_delete_feed'),
+        ('GET', re.compile(r'^/export/opml$'), 'handle_export_opml'),
+        ('GET', re.compile(r'^/river\.(rss|json)$'), 'handle_river'),
+    ]
+
+    @property
+    def context(self) -> ApiContext:
+        return self.server.context
+
+    def setup(self):
+        # Socket timeout for slow or idle clients (applies per read/write)
+        self.timeout = self.server.request_timeout
+        super().setup()
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _dispatch(self, method: str):
+        """Match the request to a route and turn errors into JSON responses."""
+        parsed = urlparse(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        try:
+            for route_method, pattern, handler_name in self.ROUTES:
+                match = pattern.match(parsed.path)
+                if match and route_method == method:
+                    getattr(self, handler_name)(*match.groups())
+                    return
+            if any(pattern.match(parsed.path) for _, pattern, _ in self.ROUTES):
+                raise ApiError(405, f"Method {method} not allowed for {parsed.path}")
+            raise ApiError(404, f"No route for {parsed.path}")
+        except ApiError as e:
+            self.send_json(e.status, e.payload)
+        except Exception as e:
+            if self.close_connection:
+                # Failed mid-stream; nothing more can be sent on this connection
+                return
+            self.send_json(500, {'error': f"Internal error: {e}"})
+
+    def read_json(self) -> Dict:
+        """Read and decode the JSON request body."""
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ApiError(400, "Request body must be valid JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Request body must be a JSON object")
+        return body
+
+    def send_json(self, status: int, payload):
+        """Send a complete JSON response."""
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_text(self, status: int, content_type: str, text: str):
+        """Send a complete text response."""
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, status: int, content_type: str, fragments: Iterable[str]):
+        """Send a chunked response, flushing roughly every STREAM_CHUNK_SIZE bytes."""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        buffer = []
+        size = 0
+        try:
+            for fragment in fragments:
+                data = fragment.encode('utf-8')
+                buffer.append(data)
+                size += len(data)
+                if size >= STREAM_CHUNK_SIZE:
+                    self._write_chunk(b''.join(buffer))
+                    buffer, size = [], 0
+        except Exception:
+            # Headers are already sent; drop the connection so the client sees a truncated body
+            self.close_connection = True
+            raise
+        if buffer:
+            self._write_chunk(b''.join(buffer))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+
+    def _site_url(self, body: Dict, field: str = 'url') -> str:
+        """Validate and normalize a site URL field ('url' of a discovery request by default)."""
+        url = body.get(field)
+        if not url or not isinstance(url, str):
+            raise ApiError(400, f"'{field}' is required")
+        normalized = normalize_url(url)
+        if not validators.url(normalized):
+            raise ApiError(400, f"Invalid URL: {url}")
+        return normalized
+
+    def handle_health(self):
+        self.send_json(200, {
+            'status': 'ok',
+            'feed_cache': self.context.feed_cache.stats(),
+            'discovery_cache': self.context.discovery_cache.stats(),
+            'jobs': self.context.scan_jobs.stats(),
+            'river': self.context.river.stats(),
+            'dns': dns_cache.stats()
+        })
+
+    def handle_discover(self):
+        body = self.read_json()
+        url = self._site_url(body)
+        try:
+            timeout = min(float(body.get('timeout', self.context.discover_timeout)), self.context.discover_timeout)
+        except (TypeError, ValueError):
+            raise ApiError(400, "'timeout' must be a number of seconds")
+
+        job_id = self.context.scan_jobs.submit(url, force=bool(body.get('force')))
+        job = self.context.scan_jobs.wait(job_id, timeout)
+        if job is None:
+            # Pruned from the job table before its result could be read
+            raise ApiError(503, "Discovery job is no longer available; retry the request", job_id=job_id)
+        if job['status'] in (QUEUED, RUNNING):
+            raise ApiError(504, "Discovery did not finish in time; poll the job for results",
+                           job_id=job_id, feeds_so_far=job['feeds'])
+        if job['status'] == FAILED:
+            raise ApiError(502, job['error'], job_id=job_id)
+        self.send_json(200, {'site_url': url, **job['result']})
+
+    def handle_create_job(self):
+        body = self.read_json()
+        url = self._site_url(body)
+        job_id = self.context.scan_jobs.submit(url, force=bool(body.get('force')))
+        self.send_json(202, {'job_id': job_id, 'site_url': url})
+
+    def handle_get_job(self, job_id: str):
+        job = self.context.scan_jobs.get(int(job_id))
+        if job is None:
+            raise ApiError(404, f"Unknown job {job_id}")
+        self.send_json(200, job)
+
+    def handle_list_feeds(self):
+        website = self.query.get('website')
+        if website is not None:
+            self.send_json(200, self.context.feed_cache.get_feeds_for_website(website))
+            return
+
+        def fragments() -> Iterator[str]:
+            yield '['
+            for i, feed in enumerate(self.context.db_manager.iter_feeds()):
+                yield (',' if i else '') + json.dumps(feed)
+            yield ']'
+
+        self.send_stream(200, 'application/json', fragments())
+
+    def handle_search_feeds(self):
+        query = self.query.get('q', '').strip()
+        if not query:
+            raise ApiError(400, "'q' is required")
+        try:
+            limit = min(int(self.query.get('limit', 100)), 1000)
+        except ValueError:
+            raise ApiError(400, "'limit' must be an integer")
+        self.send_json(200, self.context.db_manager.search_feeds(query, limit))
+
+    def handle_save_feed(self):
+        body = self.read_json()
+        site_url = self._site_url(body, 'site_url')
+        feed_url = body.get('feed_url')
+        if not feed_url or not isinstance(feed_url, str):
+            raise ApiError(400, "'feed_url' is required")
+        # Stored as given (query strings matter for feeds), so it must already be absolute
+        if not validators.url(feed_url):
+            raise ApiError(400, f"Invalid URL: {feed_url}")
+
+        existing_feed = self.context.db_manager.get_existing_feed(feed_url)
+        if existing_feed:
+            raise ApiError(409, "Feed already exists", feed=existing_feed)
+
+        feed_id = self.context.feed_cache.save_feed(
+            site_url,
+            feed_url,
+            body.get('user_given_name') or feed_url,
+            body.get('website_nickname'),
+            is_synthetic=bool(body.get('is_synthetic', False))
+        )
+        self.send_json(201, {'id': feed_id})
+
+    def handle_delete_feed(self, feed_id: str):
+        if not self.context.feed_cache.delete_feed(int(feed_id)):
+            raise ApiError(404, f"Unknown feed {feed_id}")
+        self.send_json(200, {'deleted': int(feed_id)})
+
+    def handle_export_opml(self):
+        self.send_stream(200, 'text/x-opml; charset=utf-8', iter_opml(self.context.db_manager.iter_feeds()))
+
+    def handle_river(self, output_format: str):
+        river = self.context.river
+        try:
+            limit = min(int(self.query.get('limit', river.size)), river.size)
+        except ValueError:
+            raise ApiError(400, "'limit' must be an integer")
+        if limit < 1:
+            raise ApiError(400, "'limit' must be positive")
+        content_type = 'application/rss+xml; charset=utf-8' if output_format == 'rss' else 'application/feed+json'
+        self.send_text(200, content_type, river.render(self.query.get('website'), output_format, limit))
+
+
+class BoundedHTTPServer(HTTPServer):
+    """HTTPServer that handles connections on a fixed-size thread pool."""
+
+    def __init__(self, server_address, context: ApiContext, max_workers: int = 16, max_pending: int = 64,
+                 request_timeout: float = 30, verbose: bool = False):
+        super().__init__(server_address, ApiRequestHandler)
+        self.context = context
+        self.request_timeout = request_timeout
+        self.verbose = verbose
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='api')
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            self._reject(request)
+            return
+        self._pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def _reject(self, request):
+        """Answer 503 straight away when the pool and its queue are full."""
+        body = json.dumps({'error': 'Server busy, retry later'}).encode('utf-8')
+        try:
+            request.sendall(
+                b'HTTP/1.1 503 Service Unavailable\r\n'
+                b'Content-Type: application/json\r\n'
+                b'Retry-After: 1\r\n'
+                b'Connection: close\r\n'
+                + f'Content-Length: {len(body)}\r\n\r\n'.encode('ascii') + body
+            )
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, db_path: str = "feed_storage.db", workers: int = 16,
+          scan_workers: int = 4, request_timeout: float = 30, discover_timeout: float = 60,
+          verbose: bool = False, context: Optional[ApiContext] = None):
+    """Run the API server until interrupted."""
+    context = context or ApiContext(db_path, scan_workers=scan_workers, discover_timeout=discover_timeout)
+    server = BoundedHTTPServer((host, port), context, max_workers=workers,
+                               request_timeout=request_timeout, verbose=verbose)
+    print(f"🌐 RSS Architect API listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 RSS Architect API stopped")
+    finally:
+        server.server_close()
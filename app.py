@@ -1,9 +1,17 @@
 import streamlit as st
 from db_manager import DatabaseManager
+from feed_cache import FeedCache, DiscoveryCache
+from feed_health import describe_health
 from rss_discovery import RSSDiscovery
+from scan_jobs import ScanJobManager, QUEUED, RUNNING, FAILED
+from url_utils import normalize_url
 from urllib.parse import urlparse
+import time
 import validators
 
+# Scan jobs kept in one session's list; older ones keep running but are no longer shown
+MAX_SESSION_SCAN_JOBS = 10
+
 def get_website_nickname_from_url(url: str) -> str:
     """Extract a default website nickname from URL."""
     parsed = urlparse(url)
@@ -22,12 +30,156 @@ def get_website_nickname_from_url(url: str) -> str:
         # Fallback to the original method if domain structure is unusual
         return domain.replace('.', ' ').title()
 
-def normalize_url(url: str) -> str:
-    """Normalize URL for consistent storage."""
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
-    parsed = urlparse(url)
-    return f"{parsed.scheme}://{parsed.netloc}{parsed.path}".rstrip('/')
+@st.cache_resource
+def get_db_manager() -> DatabaseManager:
+    """Database manager shared by every session in this server process."""
+    return DatabaseManager()
+
+@st.cache_resource
+def get_rss_discovery() -> RSSDiscovery:
+    """RSS discovery engine shared by every session in this server process."""
+    return RSSDiscovery(verbose_logging=False)  # Reduce console noise
+
+@st.cache_resource
+def get_feed_cache() -> FeedCache:
+    """Feed listing cache shared by every session in this server process."""
+    return FeedCache(get_db_manager())
+
+@st.cache_resource
+def get_discovery_cache() -> DiscoveryCache:
+    """Scan results cached per normalized URL, backed by the DiscoveryResults table."""
+    return DiscoveryCache(get_rss_discovery(), get_db_manager())
+
+@st.cache_resource
+def get_scan_jobs() -> ScanJobManager:
+    """Background scan executor shared by every session in this server process."""
+    return ScanJobManager(get_discovery_cache())
+
+def any_scan_job_active(scan_jobs: ScanJobManager) -> bool:
+    """Check if any of this session's scan jobs is still queued or running."""
+    for entry in st.session_state.scan_jobs:
+        job = scan_jobs.get(entry['job_id'])
+        if job and job['status'] in (QUEUED, RUNNING):
+            return True
+    return False
+
+def render_scan_result_messages(result: dict):
+    """Show the outcome of a finished scan (blocked, paywall, error or feed count)."""
+    scan_age = time.time() - result['scanned_at']
+    if scan_age > 60:
+        st.caption(f"🕒 Showing results from a scan {int(scan_age // 60)} min ago — tick 'Force rescan' to refresh")
+    
+    if result['error']:
+        if "Failed to fetch page" in result['error']:
+            st.warning("⚠️ **Website Access Blocked**")
+            st.info("""
+            This website appears to be blocking automated requests. This is common with major news sites that have bot protection.
+            
+            **What you can try:**
+            1. Look for an RSS or Feeds page on their website
+            2. Check their footer for RSS links  
+            3. Try adding `/rss` or `/feed` to their URL manually
+            4. Search for "[website name] RSS feeds" in a search engine
+            """)
+        else:
+            st.error(f"Error: {result['error']}")
+    elif result['is_paywall']:
+        st.warning("This website appears to be behind a paywall.")
+    elif result['feeds']:
+        st.success(f"Found {len(result['feeds'])} RSS feeds!")
+    else:
+        st.info("No RSS feeds found for this website.")
+    
+    articles = result.get('article_candidates') or []
+    if articles and not result['feeds']:
+        with st.expander(f"🗺️ {len(articles)} recent articles found in the site's sitemaps (usable for a synthetic feed)"):
+            for article in articles[:20]:
+                st.markdown(f"- [{article['title'] or article['url']}]({article['url']})")
+    sitemap_cost = (result.get('method_costs') or {}).get('sitemap')
+    if sitemap_cost:
+        st.caption(f"🗺️ Sitemaps: {sitemap_cost['sitemaps']} read, {sitemap_cost['entries']} entries, "
+                   f"{sitemap_cost['bytes'] / 1024:.0f} KB in {sitemap_cost['seconds']:.1f}s"
+                   + (" (budget reached)" if sitemap_cost['truncated'] else ""))
+
+def render_discovered_feed(feed: dict, i: int, key_prefix: str, site_url: str, website_nickname: str,
+                           db_manager: DatabaseManager, feed_cache: FeedCache):
+    """Show one discovered feed with its save form."""
+    with st.expander(f"Feed {i+1}: {feed['title']}", expanded=True):
+        # Make feed URL clickable and open in new tab with enhanced styling
+        st.markdown(f"""
+        <div class="feed-link">
+            🔗 <a href="{feed['url']}" target="_blank">
+            <strong>Test Feed:</strong> {feed['url'][:50]}{'...' if len(feed['url']) > 50 else ''} 
+            <span style="font-size: 0.9em;">🔗 (Opens in new tab)</span>
+            </a>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Keep code block for easy copying
+        with st.expander("📋 Copy URL", expanded=False):
+            st.code(feed['url'])
+        
+        # Individual save form for each feed (not nested)
+        with st.form(f"save_form_{key_prefix}_{i}"):
+            feed_nickname = st.text_input(
+                "Feed Nickname", 
+                value=feed['title'][:50],
+                key=f"nickname_{key_prefix}_{i}"
+            )
+            
+            save_clicked = st.form_submit_button(f"💾 Save Feed {i+1}")
+            
+            if save_clicked:
+                try:
+                    # Check if feed already exists
+                    if db_manager.feed_exists(feed['url']):
+                        existing_feed = db_manager.get_existing_feed(feed['url'])
+                        st.warning(f"⚠️ Feed already exists!")
+                        st.info(f"Existing feed: '{existing_feed['user_given_name']}' in website '{existing_feed['website_nickname']}'")
+                    else:
+                        feed_id = feed_cache.save_feed(
+                            site_url,
+                            feed['url'],
+                            feed_nickname,
+                            website_nickname,
+                            is_synthetic=False
+                        )
+                        st.success(f"✅ Saved '{feed_nickname}' successfully! (ID: {feed_id})")
+                except Exception as e:
+                    st.error(f"❌ Failed to save: {str(e)}")
+
+def render_scan_jobs(scan_jobs: ScanJobManager, db_manager: DatabaseManager, feed_cache: FeedCache):
+    """Show this session's scan jobs, newest first, with feeds found so far."""
+    for entry in list(st.session_state.scan_jobs):
+        job = scan_jobs.get(entry['job_id'])
+        if job is None:
+            continue
+        
+        header_col, dismiss_col = st.columns([6, 1])
+        with header_col:
+            st.subheader(f"📡 Discovered Feeds: {entry['site_url']}")
+        with dismiss_col:
+            if st.button("✖ Dismiss", key=f"dismiss_{job['id']}"):
+                st.session_state.scan_jobs.remove(entry)
+                st.rerun()
+        
+        if job['status'] in (QUEUED, RUNNING):
+            st.info(f"⏳ {job['phase']}... {len(job['feeds'])} feeds found so far")
+        elif job['status'] == FAILED:
+            st.error(f"Error: {job['error']}")
+        else:
+            render_scan_result_messages(job['result'])
+        
+        for i, feed in enumerate(job['feeds']):
+            render_discovered_feed(feed, i, str(job['id']), entry['site_url'], entry['website_nickname'],
+                                   db_manager, feed_cache)
+
+@st.fragment(run_every=1)
+def render_scan_jobs_live(scan_jobs: ScanJobManager, db_manager: DatabaseManager, feed_cache: FeedCache):
+    """Poll running scan jobs once a second; switch back to a static render when all finish."""
+    render_scan_jobs(scan_jobs, db_manager, feed_cache)
+    if not any_scan_job_active(scan_jobs):
+        st.rerun()
 
 def main():
     st.set_page_config(
@@ -178,9 +330,10 @@ def main():
     
     st.divider()
     
-    # Initialize components
-    db_manager = DatabaseManager()
-    rss_discovery = RSSDiscovery(verbose_logging=False)  # Reduce console noise
+    # Shared components (created once per server process)
+    db_manager = get_db_manager()
+    feed_cache = get_feed_cache()
+    scan_jobs = get_scan_jobs()
     
     # Display content based on current page
     if st.session_state.current_page == "scan":
@@ -196,6 +349,8 @@ def main():
             st.session_state.nickname_auto_generated = False
         if "trigger_autopopulate" not in st.session_state:
             st.session_state.trigger_autopopulate = False
+        if "scan_jobs" not in st.session_state:
+            st.session_state.scan_jobs = []
         
         # Input section
         col1, col2 = st.columns([2, 1])
@@ -259,6 +414,11 @@ def main():
         st.markdown('<div class="scan-button">', unsafe_allow_html=True)
         scan_clicked = st.button("🔍 Scan for Feeds", type="primary", use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
+        force_rescan = st.checkbox(
+            "Force rescan",
+            key="force_rescan",
+            help="Ignore the recent result for this URL and scan the website again"
+        )
         
         if scan_clicked:
             if not url_input:
@@ -276,105 +436,39 @@ def main():
                     if not current_nickname:
                         current_nickname = get_website_nickname_from_url(normalized_url_temp)
                     
-                    # Store in session state for use in save operations
-                    st.session_state.current_url = normalized_url_temp
-                    st.session_state.current_website_nickname = current_nickname
-                
-                # Process the URL
-                normalized_url = st.session_state.current_url
-                
-                # Check existing feeds
-                existing_feeds = db_manager.get_feeds_by_site_url(normalized_url)
-                if existing_feeds:
-                    st.success(f"Found {len(existing_feeds)} existing feeds in database")
-                    for feed in existing_feeds:
-                        st.write(f"- {feed['user_given_name']}: {feed['feed_url']}")
-                
-                # Scan for new feeds
-                with st.spinner("Scanning for feeds..."):
-                    result = rss_discovery.find_rss_feeds(normalized_url)
+                    # Check existing feeds
+                    existing_feeds = feed_cache.get_feeds_by_site_url(normalized_url_temp)
+                    if existing_feeds:
+                        st.success(f"Found {len(existing_feeds)} existing feeds in database")
+                        for feed in existing_feeds:
+                            st.write(f"- {feed['user_given_name']}: {feed['feed_url']}")
                     
-                    if result['error']:
-                        if "Failed to fetch page" in result['error']:
-                            st.warning("⚠️ **Website Access Blocked**")
-                            st.info("""
-                            This website appears to be blocking automated requests. This is common with major news sites that have bot protection.
-                            
-                            **What you can try:**
-                            1. Look for an RSS or Feeds page on their website
-                            2. Check their footer for RSS links  
-                            3. Try adding `/rss` or `/feed` to their URL manually
-                            4. Search for "[website name] RSS feeds" in a search engine
-                            """)
-                        else:
-                            st.error(f"Error: {result['error']}")
-                    elif result['is_paywall']:
-                        st.warning("This website appears to be behind a paywall.")
-                    else:
-                        discovered_feeds = result['feeds']
-                        
-                        if discovered_feeds:
-                            st.success(f"Found {len(discovered_feeds)} RSS feeds!")
-                            st.session_state.discovered_feeds = discovered_feeds
-                        else:
-                            st.info("No RSS feeds found for this website.")
+                    # Scan for new feeds in the background; results are polled below
+                    job_id = scan_jobs.submit(normalized_url_temp, force=force_rescan)
+                    st.session_state.scan_jobs = [
+                        entry for entry in st.session_state.scan_jobs if entry['job_id'] != job_id
+                    ][:MAX_SESSION_SCAN_JOBS - 1]
+                    st.session_state.scan_jobs.insert(0, {
+                        'job_id': job_id,
+                        'site_url': normalized_url_temp,
+                        'website_nickname': current_nickname
+                    })
         
-        # Display discovered feeds if available
-        if 'discovered_feeds' in st.session_state and st.session_state.discovered_feeds:
-            st.subheader("📡 Discovered Feeds")
-            
-            for i, feed in enumerate(st.session_state.discovered_feeds):
-                with st.expander(f"Feed {i+1}: {feed['title']}", expanded=True):
-                    # Make feed URL clickable and open in new tab with enhanced styling
-                    st.markdown(f"""
-                    <div class="feed-link">
-                        🔗 <a href="{feed['url']}" target="_blank">
-                        <strong>Test Feed:</strong> {feed['url'][:50]}{'...' if len(feed['url']) > 50 else ''} 
-                        <span style="font-size: 0.9em;">🔗 (Opens in new tab)</span>
-                        </a>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Keep code block for easy copying
-                    with st.expander("📋 Copy URL", expanded=False):
-                        st.code(feed['url'])
-                    
-                    # Individual save form for each feed (not nested)
-                    with st.form(f"save_form_{i}"):
-                        feed_nickname = st.text_input(
-                            "Feed Nickname", 
-                            value=feed['title'][:50],
-                            key=f"nickname_{i}"
-                        )
-                        
-                        save_clicked = st.form_submit_button(f"💾 Save Feed {i+1}")
-                        
-                        if save_clicked:
-                            try:
-                                # Check if feed already exists
-                                if db_manager.feed_exists(feed['url']):
-                                    existing_feed = db_manager.get_existing_feed(feed['url'])
-                                    st.warning(f"⚠️ Feed already exists!")
-                                    st.info(f"Existing feed: '{existing_feed['user_given_name']}' in website '{existing_feed['website_nickname']}'")
-                                else:
-                                    feed_id = db_manager.save_feed(
-                                        st.session_state.current_url,
-                                        feed['url'],
-                                        feed_nickname,
-                                        st.session_state.current_website_nickname,
-                                        is_synthetic=False
-                                    )
-                                    st.success(f"✅ Saved '{feed_nickname}' successfully! (ID: {feed_id})")
-                            except Exception as e:
-                                st.error(f"❌ Failed to save: {str(e)}")
+        # Display scan jobs (running ones refresh themselves until they finish)
+        if st.session_state.scan_jobs:
+            if any_scan_job_active(scan_jobs):
+                render_scan_jobs_live(scan_jobs, db_manager, feed_cache)
+            else:
+                render_scan_jobs(scan_jobs, db_manager, feed_cache)
         
     
     else:
         # VIEW FEEDS PAGE
         st.header("View Saved Feeds")
         
-        # Get all feeds grouped by website
-        grouped_feeds = db_manager.get_feeds_grouped_by_website()
+        # Get all feeds grouped by website, plus their last recorded health checks
+        grouped_feeds = feed_cache.get_feeds_grouped_by_website()
+        feed_health = db_manager.get_feed_health_map()
         
         if not grouped_feeds:
             st.info("No saved feeds yet. Go to 'Scan Feed' page to add some feeds!")
@@ -401,11 +495,13 @@ def main():
                                 st.code(feed['feed_url'])
                             
                             st.caption(f"Type: {'🤖 Synthetic' if feed['is_synthetic'] else '🔍 Discovered'} | Saved: {feed['timestamp']}")
+                            if not feed['is_synthetic']:
+                                st.caption(describe_health(feed_health.get(feed['id'])))
                         
                         with col2:
                             # Use regular button instead of form to avoid nesting
                             if st.button("🗑️ Delete", key=f"delete_{feed['id']}"):
-                                if db_manager.delete_feed(feed['id']):
+                                if feed_cache.delete_feed(feed['id']):
                                     st.success("Feed deleted!")
                                     st.rerun()
                                 else:
@@ -1,6 +1,8 @@
 import streamlit as st
 from db_manager import DatabaseManager
+from feed_cache import FeedCache, DiscoveryCache
 from rss_discovery import RSSDiscovery
+from url_utils import normalize_url
 from synthetic_rss import SyntheticRSSGenerator
 from urllib.parse import urlparse
 import validators
@@ -13,12 +15,25 @@ def get_website_nickname_from_url(url: str) -> str:
         domain = domain[4:]
     return domain.replace('.', ' ').title()
 
-def normalize_url(url: str) -> str:
-    """Normalize URL for consistent storage."""
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
-    parsed = urlparse(url)
-    return f"{parsed.scheme}://{parsed.netloc}{parsed.path}".rstrip('/')
+@st.cache_resource
+def get_db_manager() -> DatabaseManager:
+    """Database manager shared by every session in this server process."""
+    return DatabaseManager()
+
+@st.cache_resource
+def get_rss_discovery() -> RSSDiscovery:
+    """RSS discovery engine shared by every session in this server process."""
+    return RSSDiscovery()
+
+@st.cache_resource
+def get_feed_cache() -> FeedCache:
+    """Feed listing cache shared by every session in this server process."""
+    return FeedCache(get_db_manager())
+
+@st.cache_resource
+def get_discovery_cache() -> DiscoveryCache:
+    """Scan results cached per normalized URL, backed by the DiscoveryResults table."""
+    return DiscoveryCache(get_rss_discovery(), get_db_manager())
 
 def main():
     st.set_page_config(
@@ -30,9 +45,10 @@ def main():
     st.title("📡 RSS Architect")
     st.markdown("*Discover or synthesize RSS feeds from any website*")
     
-    # Initialize components
-    db_manager = DatabaseManager()
-    rss_discovery = RSSDiscovery()
+    # Shared components (created once per server process)
+    feed_cache = get_feed_cache()
+    discovery_cache = get_discovery_cache()
+    rss_discovery = get_rss_discovery()
     rss_generator = SyntheticRSSGenerator()
     
     # Navigation tabs
@@ -51,6 +67,8 @@ def main():
             with col2:
                 website_nickname = st.text_input("Website Nickname", placeholder="My Site")
             
+            force_rescan = st.checkbox("Force rescan", help="Ignore the recent result for this URL and scan again")
+            
             scan_clicked = st.form_submit_button("🔍 Scan for Feeds", type="primary")
             
             if scan_clicked:
@@ -63,7 +81,7 @@ def main():
                     normalized_url = normalize_url(url_input)
                     
                     # Check existing feeds
-                    existing_feeds = db_manager.get_feeds_by_site_url(normalized_url)
+                    existing_feeds = feed_cache.get_feeds_by_site_url(normalized_url)
                     if existing_feeds:
                         st.success(f"Found {len(existing_feeds)} existing feeds in database")
                         for feed in existing_feeds:
@@ -71,7 +89,7 @@ def main():
                     
                     # Scan for new feeds
                     with st.spinner("Scanning for feeds..."):
-                        result = rss_discovery.find_rss_feeds(normalized_url)
+                        result = discovery_cache.find_rss_feeds(normalized_url, force=force_rescan)
                         
                         if result['error']:
                             st.error(f"Error: {result['error']}")
@@ -100,7 +118,7 @@ def main():
                                             
                                             if save_clicked:
                                                 try:
-                                                    feed_id = db_manager.save_feed(
+                                                    feed_id = feed_cache.save_feed(
                                                         normalized_url,
                                                         feed['url'],
                                                         feed_nickname,
@@ -138,7 +156,7 @@ def main():
                                             if save_synthetic:
                                                 try:
                                                     synthetic_url = f"{normalized_url}/synthetic-rss.xml"
-                                                    feed_id = db_manager.save_feed(
+                                                    feed_id = feed_cache.save_feed(
                                                         normalized_url,
                                                         synthetic_url,
                                                         synthetic_nickname,
@@ -157,7 +175,7 @@ def main():
         st.header("View Saved Feeds")
         
         # Get all feeds grouped by website
-        grouped_feeds = db_manager.get_feeds_grouped_by_website()
+        grouped_feeds = feed_cache.get_feeds_grouped_by_website()
         
         if not grouped_feeds:
             st.info("No saved feeds yet. Go to 'Scan Feed' tab to add some feeds!")
@@ -178,7 +196,7 @@ def main():
                                 delete_clicked = st.form_submit_button("🗑️ Delete")
                                 
                                 if delete_clicked:
-                                    if db_manager.delete_feed(feed['id']):
+                                    if feed_cache.delete_feed(feed['id']):
                                         st.success("Feed deleted!")
                                         st.rerun()
                                     else:
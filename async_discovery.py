@@ -0,0 +1,324 @@
+"""
+asyncio variant of RSSDiscovery for embedding in async services.
+
+AsyncRSSDiscovery.find_rss_feeds returns the same result dict as
+RSSDiscovery.find_rss_feeds and runs the same four methods, but nothing
+blocks the event loop:
+
+  - the page fetch and pattern probes go through async_http's client, so one
+    process can run thousands of scans with at most max_connections sockets
+    in use at once (max_connections_per_host per site)
+  - analyze_page (parsing, methods 1-2) runs on parse_workers threads, or in
+    parse_processes worker processes
+  - sitemaps (method 4, only read when nothing else found a feed) are read by
+    the threaded SitemapDiscovery on a worker thread
+
+    async with AsyncRSSDiscovery(max_connections=200) as discovery:
+        results = await asyncio.gather(*(discovery.find_rss_feeds(url, timeout=30) for url in urls))
+
+Cancelling a scan cancels its outstanding requests. With timeout, a scan that
+runs over returns the feeds found so far, with error set to say it timed out.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from async_http import AsyncHTTPClient, AsyncHTTPError, HostNotFound
+from discovery_pipeline import analyze_page_in_worker, parse_process_pool
+from rss_discovery import RSSDiscovery
+from url_utils import canonical_key, canonicalize_url
+
+
+class AsyncRSSDiscovery:
+    """
+    Non-blocking RSS discovery sharing one connection-limited HTTP client.
+    Create, use and close() it inside one event loop.
+    """
+
+    def __init__(self, max_connections: int = 100, max_connections_per_host: int = 8, parse_workers: int = 4,
+                 parse_processes: int = 0, use_sitemaps: bool = True, verbose_logging: bool = False,
+                 use_dns_cache: bool = True, **analysis_options):
+        # Parsing, link scans, titles and sitemaps come from the threaded
+        # implementation; analysis_options are its max_link_candidates,
+        # max_text_chars, max_title_chars and measure_memory arguments
+        self.discovery = RSSDiscovery(verbose_logging=verbose_logging, use_sitemaps=use_sitemaps,
+                                      use_dns_cache=use_dns_cache, **analysis_options)
+        self.http = AsyncHTTPClient(max_connections, max_connections_per_host, use_dns_cache=use_dns_cache)
+        self.parse_workers = parse_workers
+        self.parse_processes = parse_processes
+        self._parse_executor: Optional[Executor] = None
+
+    async def __aenter__(self) -> 'AsyncRSSDiscovery':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close pooled connections and stop the parse workers."""
+        await self.http.close()
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown(wait=False, cancel_futures=True)
+            self._parse_executor = None
+
+    async def fetch_page_bytes(self, url: str) -> Optional[bytes]:
+        """Download a web page with RSSDiscovery.fetch_page_bytes' retries, without blocking."""
+        retry_configs = self.discovery._page_retry_configs()
+
+        for attempt, config in enumerate(retry_configs, 1):
+            last_attempt = attempt == len(retry_configs)
+            try:
+                response = await self.http.get(url, **config)
+            except asyncio.TimeoutError:
+                continue
+            except HostNotFound:
+                # Retrying with other headers can't make the host resolve
+                break
+            except AsyncHTTPError:
+                if not last_attempt:
+                    await asyncio.sleep(1)
+                continue
+
+            if response.status_code == 200:
+                return response.content
+            if response.status_code == 403 and not last_attempt:
+                await asyncio.sleep(2)
+            elif response.status_code == 429 and not last_attempt:
+                await asyncio.sleep(5)
+
+        return None
+
+    async def analyze_page(self, body: Optional[bytes], url: str) -> Dict:
+        """RSSDiscovery.analyze_page on the parse workers."""
+        if body is None:
+            return self.discovery.analyze_page(None, url)
+        loop = asyncio.get_running_loop()
+        if self.parse_processes > 0:
+            return await loop.run_in_executor(self._executor(), analyze_page_in_worker, body, url)
+        return await loop.run_in_executor(self._executor(), self.discovery.analyze_page, body, url)
+
+    def _executor(self) -> Executor:
+        if self._parse_executor is None:
+            if self.parse_processes > 0:
+                self._parse_executor = parse_process_pool(self.parse_processes, self.discovery.analysis_settings())
+            else:
+                self._parse_executor = ThreadPoolExecutor(self.parse_workers, thread_name_prefix="async-parse")
+        return self._parse_executor
+
+    async def find_rss_feeds(self, url: str, on_feeds: Optional[Callable[[str, List[Dict]], None]] = None,
+                             timeout: Optional[float] = None) -> Dict:
+        """
+        Find RSS feeds for a given URL; the result has the keys of
+        RSSDiscovery.find_rss_feeds. on_feeds(method, feeds) is called for
+        each deduplicated feed as soon as it is found. When the scan takes
+        longer than timeout seconds it is stopped and the feeds found so far
+        are returned with error set.
+        """
+        found: List[Tuple[str, Dict]] = []
+        result: Dict = {}
+
+        async def scan():
+            events = self.find_rss_feeds_iter(url)
+            try:
+                async for event in events:
+                    if event['event'] == 'feed':
+                        found.append((event['method'], event['feed']))
+                        if on_feeds is not None:
+                            on_feeds(event['method'], [event['feed']])
+                    elif event['event'] == 'done':
+                        result.update(event['result'])
+            finally:
+                await events.aclose()
+
+        try:
+            await asyncio.wait_for(scan(), timeout)
+        except asyncio.TimeoutError:
+            counts = self.discovery._method_counts(0, 0, 0)
+            for method, _ in found:
+                counts[method] += 1
+            return {
+                'feeds': [feed for _, feed in found],
+                'is_paywall': False,
+                'error': f"Discovery timed out after {timeout:g}s",
+                'method_counts': counts,
+                'method_costs': {},
+                'article_candidates': []
+            }
+
+        self.discovery.log_summary(result)
+        return result
+
+    async def find_rss_feeds_iter(self, url: str, page: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """
+        Async generator of the events of RSSDiscovery.find_rss_feeds_iter, in
+        the same order. Closing it (aclose()) cancels outstanding pattern probes.
+        """
+        discovery = self.discovery
+        seen_urls = set()
+        costs: Dict[str, Dict] = {}
+
+        def new_feeds(method: str, links: List[Dict]) -> List[Dict]:
+            events = []
+            for link in links:
+                link['url'] = canonicalize_url(link['url'])
+                key = canonical_key(link['url'])
+                if key not in seen_urls:
+                    seen_urls.add(key)
+                    events.append({'event': 'feed', 'method': method, 'feed': link})
+            return events
+
+        yield {'event': 'progress', 'method': 'fetch', 'status': 'started'}
+        if page is None:
+            started = time.perf_counter()
+            body = await self.fetch_page_bytes(url)
+            costs['fetch'] = discovery._phase_cost('fetch', started)
+            page = await self.analyze_page(body, url)
+        costs.update(page['costs'])
+        yield {'event': 'progress', 'method': 'fetch', 'status': 'finished', 'count': 1 if page['fetched'] else 0}
+
+        if not page['fetched']:
+            # If we can't fetch the main page, try pattern and sitemap discovery anyway
+            pattern_rss_links: List[Dict] = []
+            async for event in self._iter_pattern_method(url, new_feeds, costs, pattern_rss_links):
+                yield event
+            sitemap = {'feeds': [], 'articles': []}
+            async for event in self._iter_sitemap_method(url, new_feeds, costs, sitemap):
+                yield event
+            feeds = discovery._dedupe_links(pattern_rss_links + sitemap['feeds'])
+
+            yield {'event': 'done', 'result': {
+                'feeds': feeds,
+                'is_paywall': False,
+                'error': None if feeds else 'Failed to fetch page and no RSS patterns found',
+                'method_counts': discovery._method_counts(0, 0, len(pattern_rss_links), len(sitemap['feeds'])),
+                'method_costs': costs,
+                'article_candidates': sitemap['articles']
+            }}
+            return
+
+        if page['is_paywall']:
+            yield {'event': 'done', 'result': {'feeds': [], 'is_paywall': True, 'error': None,
+                                               'method_counts': discovery._method_counts(0, 0, 0),
+                                               'method_costs': costs, 'article_candidates': []}}
+            return
+
+        rss_links = []
+
+        # Methods 1 and 2 were run by analyze_page
+        for method, links in (('html_links', page['html_links']), ('content_scan', page['content_links'])):
+            yield {'event': 'progress', 'method': method, 'status': 'started'}
+            rss_links.extend(links)
+            for event in new_feeds(method, links):
+                yield event
+            yield {'event': 'progress', 'method': method, 'status': 'finished', 'count': len(links)}
+
+        # Method 3: Try common RSS URL patterns
+        pattern_rss_links = []
+        async for event in self._iter_pattern_method(url, new_feeds, costs, pattern_rss_links):
+            yield event
+        rss_links.extend(pattern_rss_links)
+
+        # Method 4: Read the site's sitemaps when nothing else found a feed
+        sitemap = {'feeds': [], 'articles': []}
+        if not rss_links:
+            async for event in self._iter_sitemap_method(url, new_feeds, costs, sitemap):
+                yield event
+            rss_links.extend(sitemap['feeds'])
+
+        yield {'event': 'done', 'result': {
+            'feeds': discovery._dedupe_links(rss_links),
+            'is_paywall': False,
+            'error': None,
+            'method_counts': discovery._method_counts(len(page['html_links']), len(page['content_links']),
+                                                      len(pattern_rss_links), len(sitemap['feeds'])),
+            'method_costs': costs,
+            'article_candidates': sitemap['articles']
+        }}
+
+    async def _iter_pattern_method(self, url: str, new_feeds, costs: Dict[str, Dict],
+                                   found_links: List[Dict]) -> AsyncIterator[Dict]:
+        """Run method 3 as events; fills found_links with the pattern feeds in pattern order."""
+        yield {'event': 'progress', 'method': 'pattern_test', 'status': 'started'}
+        started = time.perf_counter()
+        found = []
+        probes = self.iter_common_rss_patterns(url)
+        try:
+            async for index, link in probes:
+                found.append((index, link))
+                for event in new_feeds('pattern_test', [link]):
+                    yield event
+        finally:
+            await probes.aclose()
+        found.sort(key=lambda item: item[0])
+        found_links.extend(link for _, link in found)
+        costs['pattern_test'] = self.discovery._phase_cost('pattern_test', started)
+        yield {'event': 'progress', 'method': 'pattern_test', 'status': 'finished', 'count': len(found)}
+
+    async def _iter_sitemap_method(self, url: str, new_feeds, costs: Dict[str, Dict],
+                                   sitemap: Dict) -> AsyncIterator[Dict]:
+        """Run method 4 as events; fills sitemap with its feeds and article candidates."""
+        if self.discovery.sitemaps is None:
+            return
+        yield {'event': 'progress', 'method': 'sitemap', 'status': 'started'}
+        started = time.perf_counter()
+        sitemap.update(await asyncio.to_thread(self.discovery.sitemaps.discover, url))
+        self.discovery._phase_cost('sitemap', started)
+        for link in sitemap['feeds']:
+            link['title'] = link['title'] or self.discovery.extract_title_from_url(link['url'])
+        stats = sitemap['stats']
+        costs['sitemap'] = stats
+        for event in new_feeds('sitemap', sitemap['feeds']):
+            yield event
+        yield {'event': 'progress', 'method': 'sitemap', 'status': 'finished', 'count': len(sitemap['feeds']),
+               'bytes': stats['bytes'], 'entries': stats['entries'], 'sitemaps': stats['sitemaps']}
+
+    async def iter_common_rss_patterns(self, base_url: str) -> AsyncIterator[Tuple[int, Dict]]:
+        """
+        Probe common RSS URL patterns concurrently, yielding (pattern_index, feed)
+        as each probe succeeds. Closing the iterator cancels the remaining probes.
+        """
+        parsed_url = urlparse(base_url)
+        base_domain = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+        probes = {
+            asyncio.ensure_future(self._probe_pattern(base_domain, pattern, parsed_url.netloc)): index
+            for index, pattern in enumerate(RSSDiscovery.COMMON_RSS_PATTERNS)
+        }
+        try:
+            pending = set(probes)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for probe in sorted(done, key=probes.get):
+                    link = probe.result()
+                    if link:
+                        yield probes[probe], link
+        finally:
+            for probe in probes:
+                probe.cancel()
+
+    async def _probe_pattern(self, base_domain: str, pattern: str, netloc: str) -> Optional[Dict]:
+        """Test one pattern URL with a HEAD request; returns a feed dict on success."""
+        test_url = base_domain + pattern
+        light_headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        }
+        try:
+            response = await self.http.head(test_url, headers=light_headers, timeout=8, allow_redirects=True)
+        except (AsyncHTTPError, asyncio.TimeoutError):
+            return None
+
+        content_type = response.headers.get('content-type', '').lower()
+        if response.status_code == 200 and any(rss_type in content_type for rss_type in ['xml', 'rss', 'atom']):
+            return {
+                'url': test_url,
+                'title': self.discovery.generate_pattern_title(pattern, netloc),
+                'type': 'pattern-discovered'
+            }
+        return None
+
+    def stats(self) -> Dict:
+        """HTTP client counters (requests, connections opened and reused, peak in flight)."""
+        return self.http.stats()
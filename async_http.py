@@ -0,0 +1,375 @@
+"""
+Minimal HTTP/1.1 client on asyncio streams for AsyncRSSDiscovery.
+
+requests blocks the thread it runs on, so an event loop would need a thread
+per request. This client only does what discovery needs: GET and HEAD with
+redirects, Content-Length, chunked and read-to-close bodies, gzip/deflate
+content encoding, TLS and keep-alive connection reuse. Every request holds
+one of max_connections slots (shared by all scans using the client) and one
+of max_connections_per_host slots for its host while it runs. Host names are
+resolved through dns_cache's DNSCache on a worker thread, so the async and
+threaded scanners share one cache.
+
+Not supported: proxies, cookies, authentication, HTTP/2 and request bodies.
+"""
+
+import asyncio
+import socket
+import ssl
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+
+from dns_cache import dns_cache
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# Headers the client manages itself (caller values are dropped)
+MANAGED_HEADERS = ('host', 'connection', 'accept-encoding', 'content-length', 'transfer-encoding')
+
+MAX_HEADERS = 100
+
+
+class AsyncHTTPError(Exception):
+    """A request failed (connection, protocol or redirect error)."""
+
+
+class HostNotFound(AsyncHTTPError):
+    """The host name did not resolve; retrying won't help."""
+
+
+class AsyncResponse:
+    __slots__ = ('url', 'status_code', 'reason', 'headers', 'content', 'truncated')
+
+    def __init__(self, url: str, status_code: int, reason: str, headers: Dict[str, str], content: bytes,
+                 truncated: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        # Lower-case names; repeated headers are joined with ', '
+        self.headers = headers
+        self.content = content
+        # The body was cut at max_body_bytes
+        self.truncated = truncated
+
+
+class _HostSlots:
+    """Per-host semaphore, dropped once no request uses it."""
+    __slots__ = ('semaphore', 'users')
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.users = 0
+
+
+class AsyncHTTPClient:
+    """
+    Connection-limited HTTP client for one event loop. Create it (and call
+    close() on it) inside the loop that uses it.
+    """
+
+    def __init__(self, max_connections: int = 100, max_connections_per_host: int = 8,
+                 keepalive_timeout: float = 15.0, max_body_bytes: int = 20 * 1024 * 1024,
+                 max_redirects: int = 5, use_dns_cache: bool = True):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.max_body_bytes = max_body_bytes
+        self.max_redirects = max_redirects
+        self.use_dns_cache = use_dns_cache
+        self._slots = asyncio.Semaphore(max_connections)
+        self._hosts: Dict[Tuple[str, str, int], _HostSlots] = {}
+        # (scheme, host, port) -> idle (reader, writer, idle_since), oldest first
+        self._idle: "OrderedDict[Tuple[str, str, int], List[Tuple]]" = OrderedDict()
+        self._idle_count = 0
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self._stats = {'requests': 0, 'redirects': 0, 'connections_opened': 0, 'connections_reused': 0,
+                       'timeouts': 0, 'bytes': 0, 'active': 0, 'peak_active': 0}
+
+    async def get(self, url: str, headers: Optional[Dict] = None, timeout: Optional[float] = 10,
+                  allow_redirects: bool = True) -> AsyncResponse:
+        return await self.request('GET', url, headers, timeout, allow_redirects)
+
+    async def head(self, url: str, headers: Optional[Dict] = None, timeout: Optional[float] = 10,
+                   allow_redirects: bool = False) -> AsyncResponse:
+        return await self.request('HEAD', url, headers, timeout, allow_redirects)
+
+    async def request(self, method: str, url: str, headers: Optional[Dict] = None, timeout: Optional[float] = 10,
+                      allow_redirects: bool = True) -> AsyncResponse:
+        """
+        Send a request, following redirects when allow_redirects is set.
+        timeout bounds each exchange (connect to last body byte), not the
+        wait for a free connection slot, and raises asyncio.TimeoutError;
+        cancelling the caller closes the connection.
+        """
+        headers = headers or {}
+        for _ in range(self.max_redirects + 1):
+            response = await self._send(method, url, headers, timeout)
+            location = response.headers.get('location')
+            if not allow_redirects or response.status_code not in REDIRECT_STATUSES or not location:
+                return response
+            self._stats['redirects'] += 1
+            url = urljoin(url, location)
+            if response.status_code == 303 and method != 'HEAD':
+                method = 'GET'
+        raise AsyncHTTPError(f"Exceeded {self.max_redirects} redirects")
+
+    async def _send(self, method: str, url: str, headers: Dict, timeout: Optional[float]) -> AsyncResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise AsyncHTTPError(f"Unsupported URL: {url}")
+        try:
+            port = parts.port or (443 if parts.scheme == 'https' else 80)
+        except ValueError as e:
+            raise AsyncHTTPError(f"Invalid port in URL: {url}") from e
+        key = (parts.scheme, parts.hostname.lower(), port)
+        request = self._request_bytes(method, parts, headers)
+
+        host = self._hosts.get(key)
+        if host is None:
+            host = self._hosts[key] = _HostSlots(self.max_connections_per_host)
+        host.users += 1
+        try:
+            # Per-host slot first, so requests queued behind a busy host hold no global slot
+            async with host.semaphore, self._slots:
+                self._stats['requests'] += 1
+                self._stats['active'] += 1
+                self._stats['peak_active'] = max(self._stats['peak_active'], self._stats['active'])
+                try:
+                    return await asyncio.wait_for(self._exchange(key, url, method, request), timeout)
+                except asyncio.TimeoutError:
+                    self._stats['timeouts'] += 1
+                    raise
+                finally:
+                    self._stats['active'] -= 1
+        finally:
+            host.users -= 1
+            if host.users == 0:
+                del self._hosts[key]
+
+    async def _exchange(self, key: Tuple[str, str, int], url: str, method: str, request: bytes) -> AsyncResponse:
+        """One request/response on a pooled or new connection (a stale pooled one is replaced once)."""
+        connection = self._take_idle(key)
+        while True:
+            reused = connection is not None
+            if connection is None:
+                connection = await self._connect(*key)
+            reader, writer = connection
+            try:
+                writer.write(request)
+                await writer.drain()
+                response, reusable = await self._read_response(reader, url, method)
+            except (ConnectionError, asyncio.IncompleteReadError, AsyncHTTPError) as e:
+                writer.close()
+                if reused and not isinstance(e, AsyncHTTPError):
+                    # The server closed the idle connection; retry on a new one
+                    connection = None
+                    continue
+                if isinstance(e, AsyncHTTPError):
+                    raise
+                raise AsyncHTTPError(f"Connection to {key[1]} failed: {e!r}") from e
+            except (ValueError, asyncio.LimitOverrunError, zlib.error, OSError) as e:
+                # Oversized header lines, corrupt bodies, TLS errors mid-read
+                writer.close()
+                raise AsyncHTTPError(f"Bad response from {key[1]}: {e!r}") from e
+            except BaseException:
+                # Timeout or cancellation mid-exchange: the connection state is unknown
+                writer.close()
+                raise
+            if reused:
+                self._stats['connections_reused'] += 1
+            if reusable:
+                self._put_idle(key, connection)
+            else:
+                writer.close()
+            return response
+
+    async def _connect(self, scheme: str, host: str, port: int):
+        loop = asyncio.get_running_loop()
+        try:
+            if self.use_dns_cache:
+                addresses = await loop.run_in_executor(None, dns_cache.getaddrinfo, host, port, 0,
+                                                       socket.SOCK_STREAM)
+            else:
+                addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise HostNotFound(f"Failed to resolve {host}: {e}") from e
+
+        tls = self._tls_context() if scheme == 'https' else None
+        error: Optional[OSError] = None
+        for family, _, _, _, address in addresses:
+            try:
+                connection = await asyncio.open_connection(
+                    address[0], port, family=family, ssl=tls, server_hostname=host if tls else None)
+                self._stats['connections_opened'] += 1
+                return connection
+            except OSError as e:
+                error = e
+        raise AsyncHTTPError(f"Could not connect to {host}:{port}: {error!r}")
+
+    def _tls_context(self) -> ssl.SSLContext:
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return self._ssl_context
+
+    def _request_bytes(self, method: str, parts, headers: Dict) -> bytes:
+        path = quote(parts.path or '/', safe="/%:@!$&'()*+,;=-._~")
+        if parts.query:
+            path += '?' + quote(parts.query, safe="/%:@!$&'()*+,;=-._~?")
+        host = parts.hostname.encode('idna').decode('ascii')
+        if ':' in host:
+            host = f"[{host}]"
+        if parts.port:
+            host = f"{host}:{parts.port}"
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}"]
+        lines += [f"{name}: {value}" for name, value in headers.items() if name.lower() not in MANAGED_HEADERS]
+        lines += ["Accept-Encoding: gzip, deflate", "Connection: keep-alive", "", ""]
+        return "\r\n".join(lines).encode('latin-1')
+
+    async def _read_response(self, reader: asyncio.StreamReader, url: str, method: str) -> Tuple[AsyncResponse, bool]:
+        """Read one response; returns it and whether the connection can be reused."""
+        while True:
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("Connection closed before a response")
+            try:
+                version, status, *reason = status_line.decode('latin-1').strip().split(' ', 2)
+                status = int(status)
+            except ValueError:
+                raise AsyncHTTPError(f"Malformed status line: {status_line[:100]!r}") from None
+            headers = await self._read_headers(reader)
+            # Skip interim responses (100 Continue, 103 Early Hints)
+            if not 100 <= status < 200:
+                break
+
+        keep_alive = version == 'HTTP/1.1' and 'close' not in headers.get('connection', '').lower()
+        truncated = False
+        if method == 'HEAD' or status in (204, 304):
+            body = b''
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            body, truncated = await self._read_chunked(reader)
+        elif 'content-length' in headers:
+            try:
+                length = int(headers['content-length'])
+            except ValueError:
+                raise AsyncHTTPError(f"Bad Content-Length: {headers['content-length']!r}") from None
+            truncated = length > self.max_body_bytes
+            body = await reader.readexactly(min(length, self.max_body_bytes))
+        else:
+            body, truncated = await self._read_to_close(reader)
+            keep_alive = False
+
+        self._stats['bytes'] += len(body)
+        encoding = headers.get('content-encoding', '').lower()
+        if encoding in ('gzip', 'x-gzip', 'deflate') and body:
+            body, cut = self._decompress(body, encoding)
+            truncated = truncated or cut
+        return AsyncResponse(url, status, reason[0] if reason else '', headers, body, truncated), \
+            keep_alive and not truncated
+
+    async def _read_headers(self, reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_HEADERS):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n'):
+                return headers
+            if not line:
+                raise ConnectionResetError("Connection closed in the response headers")
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+        raise AsyncHTTPError(f"More than {MAX_HEADERS} response headers")
+
+    async def _read_chunked(self, reader: asyncio.StreamReader) -> Tuple[bytes, bool]:
+        chunks = []
+        size = 0
+        while True:
+            line = await reader.readline()
+            try:
+                length = int(line.split(b';', 1)[0].strip(), 16)
+            except ValueError:
+                raise AsyncHTTPError(f"Malformed chunk size: {line[:100]!r}") from None
+            if length == 0:
+                # Trailers, then the blank line ending the body
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks), False
+            if size + length > self.max_body_bytes:
+                chunks.append(await reader.readexactly(self.max_body_bytes - size))
+                return b''.join(chunks), True
+            chunks.append(await reader.readexactly(length))
+            size += length
+            await reader.readline()
+
+    async def _read_to_close(self, reader: asyncio.StreamReader) -> Tuple[bytes, bool]:
+        chunks = []
+        size = 0
+        while size < self.max_body_bytes:
+            chunk = await reader.read(min(65536, self.max_body_bytes - size))
+            if not chunk:
+                return b''.join(chunks), False
+            chunks.append(chunk)
+            size += len(chunk)
+        return b''.join(chunks), not reader.at_eof()
+
+    def _decompress(self, body: bytes, encoding: str) -> Tuple[bytes, bool]:
+        """Undo gzip/deflate content encoding, stopping at max_body_bytes."""
+        wbits = 16 + zlib.MAX_WBITS if encoding != 'deflate' else zlib.MAX_WBITS
+        try:
+            decompressor = zlib.decompressobj(wbits)
+            data = decompressor.decompress(body, self.max_body_bytes)
+        except zlib.error:
+            if encoding != 'deflate':
+                raise AsyncHTTPError("Invalid gzip body") from None
+            # Some servers send raw deflate streams without the zlib header
+            try:
+                decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                data = decompressor.decompress(body, self.max_body_bytes)
+            except zlib.error:
+                raise AsyncHTTPError("Invalid deflate body") from None
+        return data, bool(decompressor.unconsumed_tail)
+
+    def _take_idle(self, key: Tuple[str, str, int]):
+        """A pooled connection to key that is still fresh, if any."""
+        connections = self._idle.get(key)
+        now = time.monotonic()
+        while connections:
+            reader, writer, idle_since = connections.pop()
+            self._idle_count -= 1
+            if not connections:
+                del self._idle[key]
+            if now - idle_since < self.keepalive_timeout and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return None
+
+    def _put_idle(self, key: Tuple[str, str, int], connection):
+        connections = self._idle.setdefault(key, [])
+        self._idle.move_to_end(key)
+        if len(connections) >= self.max_connections_per_host:
+            connection[1].close()
+            return
+        connections.append((*connection, time.monotonic()))
+        self._idle_count += 1
+        # Keep at most max_connections idle sockets; close the least recently used host's first
+        while self._idle_count > self.max_connections:
+            oldest_key, oldest = next(iter(self._idle.items()))
+            oldest.pop(0)[1].close()
+            self._idle_count -= 1
+            if not oldest:
+                del self._idle[oldest_key]
+
+    async def close(self):
+        """Close every pooled connection."""
+        for connections in self._idle.values():
+            for _, writer, _ in connections:
+                writer.close()
+        self._idle.clear()
+        self._idle_count = 0
+
+    def stats(self) -> Dict:
+        """Request, connection and byte counters (active is requests in flight now)."""
+        return {**self._stats, 'idle_connections': self._idle_count}
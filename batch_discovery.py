@@ -0,0 +1,136 @@
+"""
+Batch discovery jobs that run outside the Streamlit UI.
+
+The discovery stack (requests, the DNS cache, snapshots) is imported by the
+functions that scan, so read_site_list() stays cheap for the enqueue CLI.
+"""
+
+import multiprocessing
+import time
+from typing import Callable, List, Dict, Optional
+
+from url_utils import CanonicalResolver, canonical_resolver, dedupe_urls
+
+
+def read_site_list(path: str) -> List[str]:
+    """Read one site URL per line, skipping blanks and '#' comments."""
+    sites = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                sites.append(line)
+    return sites
+
+
+def prewarm(sites: List[str], db_path: str = "feed_storage.db", workers: int = 4, force: bool = False,
+            profiler=None, snapshot_dir: Optional[str] = None, parse_processes: Optional[int] = None,
+            discovery_options: Optional[Dict] = None) -> Dict:
+    """
+    Fill the DiscoveryResults table for a list of sites.
+
+    Sites with a fresh stored result are skipped unless force is set.
+    Returns a summary that counts each site once: scanned, cached, failed
+    (scan raised or returned an error) or cached_errors (a fresh stored
+    result that records an error).
+    Scans run through a DiscoveryPipeline: workers fetch and finish threads,
+    and parse_processes parse processes (default: CPU count; 0 parses on the
+    fetch threads). profiler (a profiling.Profiler) records phase and request
+    spans of every scan (except parsing done in other processes);
+    with snapshot_dir every response is also recorded there for replay().
+    discovery_options are extra RSSDiscovery arguments (page analysis caps,
+    measure_memory); with measure_memory the summary's peak_page_memory
+    names the site whose page analysis peaked highest.
+    """
+    from db_manager import DatabaseManager
+    from discovery_pipeline import DiscoveryPipeline
+    from dns_cache import dns_cache
+    from feed_cache import DiscoveryCache
+    from rss_discovery import RSSDiscovery
+    from snapshot_store import SnapshotStore
+
+    snapshot_store = SnapshotStore(snapshot_dir) if snapshot_dir else None
+    rss_discovery = RSSDiscovery(verbose_logging=False, profiler=profiler, snapshot_store=snapshot_store,
+                                 **(discovery_options or {}))
+    # Record the redirect lookups too, so replay resolves sites to the same URLs
+    resolver = CanonicalResolver(http=rss_discovery.http) if snapshot_store else canonical_resolver
+    discovery_cache = DiscoveryCache(rss_discovery, DatabaseManager(db_path), resolver=resolver)
+    pipeline = DiscoveryPipeline(rss_discovery, discovery_cache, fetch_workers=workers,
+                                 parse_processes=parse_processes, finish_workers=workers)
+    urls = dedupe_urls(sites)
+    summary = {'sites': len(urls), 'scanned': 0, 'cached': 0, 'failed': 0, 'cached_errors': 0, 'feeds': 0,
+               'peak_page_memory': None}
+    started = time.time()
+
+    for url, result, cached, error in pipeline.run(urls, force=force):
+        if error is not None:
+            summary['failed'] += 1
+            print(f"❌ Scan failed: {error}")
+            continue
+
+        if result['error']:
+            summary['cached_errors' if cached else 'failed'] += 1
+        else:
+            summary['cached' if cached else 'scanned'] += 1
+        summary['feeds'] += len(result['feeds'])
+        peak_bytes = result['method_costs'].get('parse_html', {}).get('peak_bytes')
+        if not cached and peak_bytes is not None and peak_bytes > (summary['peak_page_memory'] or {}).get('peak_bytes', -1):
+            summary['peak_page_memory'] = {'url': url, 'peak_bytes': peak_bytes}
+        status = 'cached' if cached else f"{result['scan_duration']:.1f}s"
+        if result['error']:
+            print(f"⚠️  {url}: {result['error']} ({status})")
+        else:
+            print(f"✓ {url}: {len(result['feeds'])} feeds ({status})")
+
+    summary['elapsed'] = time.time() - started
+    summary['pipeline'] = pipeline.stats()
+    summary['dns'] = dns_cache.stats()
+    return summary
+
+
+# Per-process state of replay() workers
+_replay_state: Dict = {}
+
+
+def _init_replay_worker(snapshot_dir: str):
+    """Pool initializer: one offline RSSDiscovery per worker process."""
+    from rss_discovery import RSSDiscovery
+    from snapshot_store import SnapshotStore
+
+    rss_discovery = RSSDiscovery(verbose_logging=False, snapshot_store=SnapshotStore(snapshot_dir), replay=True)
+    _replay_state['discovery'] = rss_discovery
+    _replay_state['resolver'] = CanonicalResolver(http=rss_discovery.http)
+
+
+def _replay_site(url: str):
+    started = time.process_time()
+    rss_discovery = _replay_state['discovery']
+    result = rss_discovery.find_rss_feeds(_replay_state['resolver'].resolve(url))
+    return url, result, time.process_time() - started
+
+
+def replay(sites: List[str], snapshot_dir: str, processes: Optional[int] = None,
+           on_result: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+    """
+    Re-run the full discovery pipeline for a list of sites from recorded
+    snapshots (see prewarm(snapshot_dir=...)), without network access.
+
+    Sites are spread over a process pool; on_result(url, result) is called in
+    this process as each site finishes. Returns a summary of the outcomes.
+    """
+    urls = dedupe_urls(sites)
+    summary = {'sites': len(urls), 'with_feeds': 0, 'feeds': 0, 'paywalls': 0, 'errors': 0, 'cpu_seconds': 0.0}
+    started = time.time()
+
+    with multiprocessing.Pool(processes, initializer=_init_replay_worker, initargs=(snapshot_dir,)) as pool:
+        for url, result, cpu_seconds in pool.imap_unordered(_replay_site, urls, chunksize=8):
+            summary['cpu_seconds'] += cpu_seconds
+            summary['feeds'] += len(result['feeds'])
+            summary['with_feeds'] += 1 if result['feeds'] else 0
+            summary['paywalls'] += 1 if result['is_paywall'] else 0
+            summary['errors'] += 1 if result['error'] else 0
+            if on_result is not None:
+                on_result(url, result)
+
+    summary['elapsed'] = time.time() - started
+    return summary
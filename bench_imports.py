@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the RSS Architect entry points.
+
+Each entry point's imports run in a fresh interpreter, several times, and the
+median import time and whole-process time (interpreter start included) are
+reported, e.g.:
+
+    python bench_imports.py                         # every entry point, 5 runs each
+    python bench_imports.py --entry worker --top 10 # plus the slowest modules (-X importtime)
+    python bench_imports.py --budget-ms 1000        # exit 1 if any process takes longer
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# What each entry point imports before it starts working
+ENTRY_POINTS = {
+    'launcher': "import run",
+    'app': "import streamlit, validators; from feed_cache import FeedCache, DiscoveryCache; "
+           "from feed_health import describe_health; from rss_discovery import RSSDiscovery; "
+           "from scan_jobs import ScanJobManager",
+    'scan': "from rss_discovery import RSSDiscovery; from url_utils import normalize_url",
+    'prewarm': "from batch_discovery import prewarm; from db_manager import DatabaseManager; "
+               "from feed_cache import DiscoveryCache; from rss_discovery import RSSDiscovery; "
+               "from snapshot_store import SnapshotStore",
+    'replay': "from batch_discovery import replay; from rss_discovery import RSSDiscovery; "
+              "from snapshot_store import SnapshotStore",
+    'serve-api': "from api_server import serve",
+    'enqueue': "from batch_discovery import read_site_list; from job_queue import JobQueue; "
+               "from url_utils import dedupe_urls",
+    'worker': "from discovery_worker import start_workers",
+    'queue-stats': "from job_queue import JobQueue",
+    'check-health': "from db_manager import DatabaseManager; from feed_health import FeedHealthChecker",
+}
+
+TIMED_IMPORT = "import time; started = time.perf_counter(); {statement}; print(time.perf_counter() - started)"
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def time_entry_point(statement: str, runs: int = 5) -> Dict:
+    """Median import and process wall time (ms) of a statement over fresh interpreters."""
+    import_ms = []
+    process_ms = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-c", TIMED_IMPORT.format(statement=statement)],
+                                   cwd=REPO_DIR, capture_output=True, text=True)
+        process_ms.append((time.perf_counter() - started) * 1000)
+        if completed.returncode != 0:
+            return {'error': completed.stderr.strip().splitlines()[-1]}
+        import_ms.append(float(completed.stdout.strip().splitlines()[-1]) * 1000)
+    return {
+        'import_ms': statistics.median(import_ms),
+        'process_ms': statistics.median(process_ms),
+        'max_process_ms': max(process_ms)
+    }
+
+
+def slowest_modules(statement: str, top: int = 10) -> List[Dict]:
+    """The top modules by cumulative import time, from one run with -X importtime."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                               cwd=REPO_DIR, capture_output=True, text=True)
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append({'module': name.strip(), 'self_ms': int(self_us) / 1000,
+                        'cumulative_ms': int(cumulative_us) / 1000})
+    return sorted(modules, key=lambda module: -module['cumulative_ms'])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time of each RSS Architect entry point")
+    parser.add_argument("--entry", action="append", choices=list(ENTRY_POINTS),
+                        help="Entry point to measure (repeatable, default all)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest modules per entry point")
+    parser.add_argument("--budget-ms", type=float, help="Exit with status 1 if a median process time exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = {}
+    for name in args.entry or list(ENTRY_POINTS):
+        report[name] = time_entry_point(ENTRY_POINTS[name], max(1, args.runs))
+        if args.top:
+            report[name]['slowest'] = slowest_modules(ENTRY_POINTS[name], args.top)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"⏱️  Import time per entry point (median of {args.runs} fresh interpreters)")
+        for name, stats in report.items():
+            if 'error' in stats:
+                print(f"   {name:<13} ❌ {stats['error']}")
+                continue
+            print(f"   {name:<13} imports {stats['import_ms']:7.1f}ms | process {stats['process_ms']:7.1f}ms "
+                  f"| max {stats['max_process_ms']:7.1f}ms")
+            for module in stats.get('slowest', []):
+                print(f"      {module['cumulative_ms']:8.1f}ms  {module['module']}")
+
+    over_budget = [name for name, stats in report.items()
+                   if 'error' in stats or (args.budget_ms and stats['process_ms'] > args.budget_ms)]
+    if args.budget_ms and over_budget:
+        print(f"❌ Over the {args.budget_ms:.0f}ms budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,33 @@
+import json
 import sqlite3
+import time
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
+
+from url_utils import canonical_key
+
+# Item columns (with the owning feed's name and website) returned by the FeedItems queries
+FEED_ITEM_COLUMNS = """
+    i.id, i.feed_id, i.guid, i.title, i.link, i.summary, i.published_at,
+    f.user_given_name AS feed_title, f.feed_url, f.website_nickname
+"""
 
 class DatabaseManager:
     def __init__(self, db_path: str = "feed_storage.db"):
         self.db_path = db_path
         self.init_database()
     
+    @property
+    def data_version(self) -> int:
+        """
+        FeedMaster data version, bumped by triggers on every insert, update and
+        delete so caches in any process can tell their data is stale.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM DataVersion WHERE id = 1")
+            return cursor.fetchone()[0]
+    
     def init_database(self):
         """Initialize the database and create tables if they don't exist."""
         with sqlite3.connect(self.db_path) as conn:
@@ -30,16 +51,133 @@ class DatabaseManager:
             except sqlite3.OperationalError:
                 # Column already exists
                 pass
+            
+            # Canonical keys (see url_utils.canonical_key) for duplicate checks and site lookups
+            for column in ('canonical_site_key', 'canonical_feed_key'):
+                try:
+                    cursor.execute(f"ALTER TABLE FeedMaster ADD COLUMN {column} TEXT")
+                except sqlite3.OperationalError:
+                    # Column already exists
+                    pass
+            cursor.execute("SELECT id, site_url, feed_url FROM FeedMaster WHERE canonical_feed_key IS NULL OR canonical_site_key IS NULL")
+            cursor.executemany(
+                "UPDATE FeedMaster SET canonical_site_key = ?, canonical_feed_key = ? WHERE id = ?",
+                [(canonical_key(site_url), canonical_key(feed_url), feed_id) for feed_id, site_url, feed_url in cursor.fetchall()]
+            )
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_feedmaster_canonical_feed ON FeedMaster (canonical_feed_key)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_feedmaster_canonical_site ON FeedMaster (canonical_site_key)")
+            conn.commit()
+            
+            # Shared cache of find_rss_feeds output, one row per normalized site URL
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS DiscoveryResults (
+                    site_url TEXT PRIMARY KEY,
+                    feeds_json TEXT NOT NULL,
+                    is_paywall BOOLEAN NOT NULL DEFAULT 0,
+                    error TEXT,
+                    method1_count INTEGER NOT NULL DEFAULT 0,
+                    method2_count INTEGER NOT NULL DEFAULT 0,
+                    method3_count INTEGER NOT NULL DEFAULT 0,
+                    scanned_at REAL NOT NULL,
+                    scan_duration REAL NOT NULL DEFAULT 0
+                )
+            """)
+            for column in ('canonical_key TEXT', 'method4_count INTEGER NOT NULL DEFAULT 0',
+                           'method_costs_json TEXT', 'article_candidates_json TEXT'):
+                try:
+                    cursor.execute(f"ALTER TABLE DiscoveryResults ADD COLUMN {column}")
+                except sqlite3.OperationalError:
+                    # Column already exists
+                    pass
+            cursor.execute("SELECT site_url FROM DiscoveryResults WHERE canonical_key IS NULL")
+            cursor.executemany(
+                "UPDATE DiscoveryResults SET canonical_key = ? WHERE site_url = ?",
+                [(canonical_key(site_url), site_url) for (site_url,) in cursor.fetchall()]
+            )
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_discovery_results_canonical ON DiscoveryResults (canonical_key)")
+            
+            # Latest health check per saved feed (see feed_health.py)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS FeedHealth (
+                    feed_id INTEGER PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    http_status INTEGER,
+                    latency_ms REAL,
+                    final_url TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    error TEXT,
+                    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+                    last_checked_at REAL NOT NULL,
+                    last_changed_at REAL,
+                    check_interval REAL NOT NULL,
+                    next_check_at REAL NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_feed_health_next_check ON FeedHealth (next_check_at)
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS FeedMaster_delete_health
+                AFTER DELETE ON FeedMaster
+                BEGIN
+                    DELETE FROM FeedHealth WHERE feed_id = OLD.id;
+                END
+            """)
+            
+            # Items read from saved feeds by the health checker (see river.py)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS FeedItems (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    feed_id INTEGER NOT NULL,
+                    guid TEXT NOT NULL,
+                    title TEXT,
+                    link TEXT,
+                    summary TEXT,
+                    published_at REAL NOT NULL,
+                    first_seen_at REAL NOT NULL,
+                    UNIQUE (feed_id, guid)
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_feed_items_newest ON FeedItems (feed_id, published_at, id)
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS FeedMaster_delete_items
+                AFTER DELETE ON FeedMaster
+                BEGIN
+                    DELETE FROM FeedItems WHERE feed_id = OLD.id;
+                END
+            """)
+            
+            # FeedMaster write counter maintained by triggers (see data_version)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS DataVersion (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("INSERT OR IGNORE INTO DataVersion (id, version) VALUES (1, 0)")
+            for action in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS FeedMaster_version_{action.lower()}
+                    AFTER {action} ON FeedMaster
+                    BEGIN
+                        UPDATE DataVersion SET version = version + 1 WHERE id = 1;
+                    END
+                """)
+            conn.commit()
     
     def get_feeds_by_site_url(self, site_url: str) -> List[Dict]:
-        """Get all feeds for a given site URL."""
+        """Get all feeds for a given site URL (matched on its canonical key)."""
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, site_url, feed_url, user_given_name, website_nickname, is_synthetic, timestamp
                 FROM FeedMaster 
-                WHERE site_url = ?
-            """, (site_url,))
+                WHERE canonical_site_key = ?
+            """, (canonical_key(site_url),))
             
             columns = [desc[0] for desc in cursor.description]
             return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -49,9 +187,11 @@ class DatabaseManager:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO FeedMaster (site_url, feed_url, user_given_name, website_nickname, is_synthetic, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (site_url, feed_url, user_given_name, website_nickname, is_synthetic, datetime.now()))
+                INSERT INTO FeedMaster (site_url, feed_url, user_given_name, website_nickname, is_synthetic, timestamp,
+                                        canonical_site_key, canonical_feed_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (site_url, feed_url, user_given_name, website_nickname, is_synthetic, datetime.now(),
+                  canonical_key(site_url), canonical_key(feed_url)))
             conn.commit()
             return cursor.lastrowid
     
@@ -68,6 +208,53 @@ class DatabaseManager:
             columns = [desc[0] for desc in cursor.description]
             return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
+    def get_feeds_by_website_nickname(self, website_nickname: Optional[str]) -> List[Dict]:
+        """Get all feeds for one website nickname (None or '' for unnamed websites)."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            if website_nickname:
+                cursor.execute("""
+                    SELECT id, site_url, feed_url, user_given_name, website_nickname, is_synthetic, timestamp
+                    FROM FeedMaster 
+                    WHERE website_nickname = ?
+                    ORDER BY timestamp DESC
+                """, (website_nickname,))
+            else:
+                cursor.execute("""
+                    SELECT id, site_url, feed_url, user_given_name, website_nickname, is_synthetic, timestamp
+                    FROM FeedMaster 
+                    WHERE website_nickname IS NULL OR website_nickname = ''
+                    ORDER BY timestamp DESC
+                """)
+            
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def get_website_nicknames(self) -> List[Optional[str]]:
+        """Get the distinct website nicknames in listing order."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT DISTINCT website_nickname FROM FeedMaster ORDER BY website_nickname
+            """)
+            return [row[0] for row in cursor.fetchall()]
+    
+    def get_feed_by_id(self, feed_id: int) -> Optional[Dict]:
+        """Get feed details by ID."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, site_url, feed_url, user_given_name, website_nickname, is_synthetic, timestamp
+                FROM FeedMaster 
+                WHERE id = ?
+            """, (feed_id,))
+            
+            row = cursor.fetchone()
+            if row:
+                columns = [desc[0] for desc in cursor.description]
+                return dict(zip(columns, row))
+            return None
+    
     def get_feeds_grouped_by_website(self) -> Dict[str, List[Dict]]:
         """Get all feeds grouped by website nickname."""
         feeds = self.get_all_feeds()
@@ -81,13 +268,56 @@ class DatabaseManager:
         
         return grouped
     
+    def iter_feeds(self, batch_size: int = 500) -> Iterator[Dict]:
+        """
+        Yield all feeds ordered by website nickname, in batches.
+        
+        Each batch uses its own short-lived connection (keyset pagination), so a
+        slow consumer never holds a read lock while streaming a large listing.
+        """
+        last_key = ('', 0)
+        while True:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, site_url, feed_url, user_given_name, website_nickname, is_synthetic, timestamp
+                    FROM FeedMaster 
+                    WHERE (COALESCE(website_nickname, ''), id) > (?, ?)
+                    ORDER BY COALESCE(website_nickname, ''), id
+                    LIMIT ?
+                """, (last_key[0], last_key[1], batch_size))
+                
+                columns = [desc[0] for desc in cursor.description]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last_key = (rows[-1]['website_nickname'] or '', rows[-1]['id'])
+    
+    def search_feeds(self, query: str, limit: int = 100) -> List[Dict]:
+        """Find feeds whose name, website nickname or URLs contain the query text."""
+        pattern = f"%{query}%"
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, site_url, feed_url, user_given_name, website_nickname, is_synthetic, timestamp
+                FROM FeedMaster 
+                WHERE user_given_name LIKE ? OR website_nickname LIKE ? OR feed_url LIKE ? OR site_url LIKE ?
+                ORDER BY website_nickname, timestamp DESC
+                LIMIT ?
+            """, (pattern, pattern, pattern, pattern, limit))
+            
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
     def feed_exists(self, feed_url: str) -> bool:
-        """Check if a feed URL already exists in the database."""
+        """Check if a feed URL (or an equivalent form of it) already exists in the database."""
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT COUNT(*) FROM FeedMaster WHERE feed_url = ?
-            """, (feed_url,))
+                SELECT COUNT(*) FROM FeedMaster WHERE canonical_feed_key = ?
+            """, (canonical_key(feed_url),))
             count = cursor.fetchone()[0]
             return count > 0
     
@@ -98,8 +328,8 @@ class DatabaseManager:
             cursor.execute("""
                 SELECT id, site_url, feed_url, user_given_name, website_nickname, is_synthetic, timestamp
                 FROM FeedMaster 
-                WHERE feed_url = ?
-            """, (feed_url,))
+                WHERE canonical_feed_key = ?
+            """, (canonical_key(feed_url),))
             
             row = cursor.fetchone()
             if row:
@@ -113,4 +343,201 @@ class DatabaseManager:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM FeedMaster WHERE id = ?", (feed_id,))
             conn.commit()
-            return cursor.rowcount > 0
\ No newline at end of file
+            return cursor.rowcount > 0
+    
+    def save_discovery_result(self, site_url: str, result: Dict, scanned_at: float, scan_duration: float):
+        """Store (or replace) the find_rss_feeds output for a site URL and its equivalents."""
+        method_counts = result.get('method_counts') or {}
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            key = canonical_key(site_url)
+            # Replace any row stored under an equivalent form of the URL
+            cursor.execute("DELETE FROM DiscoveryResults WHERE canonical_key = ?", (key,))
+            cursor.execute("""
+                INSERT OR REPLACE INTO DiscoveryResults
+                    (site_url, feeds_json, is_paywall, error, method1_count, method2_count, method3_count, method4_count,
+                     scanned_at, scan_duration, canonical_key, method_costs_json, article_candidates_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                site_url,
+                json.dumps(result.get('feeds', [])),
+                bool(result.get('is_paywall')),
+                result.get('error'),
+                method_counts.get('html_links', 0),
+                method_counts.get('content_scan', 0),
+                method_counts.get('pattern_test', 0),
+                method_counts.get('sitemap', 0),
+                scanned_at,
+                scan_duration,
+                key,
+                json.dumps(result.get('method_costs', {})),
+                json.dumps(result.get('article_candidates', []))
+            ))
+            conn.commit()
+    
+    def get_discovery_result(self, site_url: str) -> Optional[Dict]:
+        """Get the stored find_rss_feeds output for a site URL (or an equivalent form), with scan metadata."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT feeds_json, is_paywall, error, method1_count, method2_count, method3_count, method4_count,
+                       scanned_at, scan_duration, method_costs_json, article_candidates_json
+                FROM DiscoveryResults
+                WHERE canonical_key = ?
+                ORDER BY scanned_at DESC
+                LIMIT 1
+            """, (canonical_key(site_url),))
+            
+            row = cursor.fetchone()
+            if not row:
+                return None
+            (feeds_json, is_paywall, error, method1, method2, method3, method4,
+             scanned_at, scan_duration, method_costs_json, article_candidates_json) = row
+            return {
+                'feeds': json.loads(feeds_json),
+                'is_paywall': bool(is_paywall),
+                'error': error,
+                'method_counts': {'html_links': method1, 'content_scan': method2, 'pattern_test': method3, 'sitemap': method4},
+                'method_costs': json.loads(method_costs_json or '{}'),
+                'article_candidates': json.loads(article_candidates_json or '[]'),
+                'scanned_at': scanned_at,
+                'scan_duration': scan_duration
+            }
+    
+    def delete_discovery_result(self, site_url: str) -> bool:
+        """Forget the stored discovery result for a site URL."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM DiscoveryResults WHERE canonical_key = ?", (canonical_key(site_url),))
+            conn.commit()
+            return cursor.rowcount > 0
+    
+    def get_feeds_due_for_health_check(self, now: float, limit: Optional[int] = None) -> List[Dict]:
+        """Get non-synthetic feeds never checked or due for a check, most overdue first, with their last health row."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT f.id, f.feed_url, h.status, h.etag, h.last_modified, h.content_hash,
+                       h.consecutive_failures, h.last_changed_at, h.check_interval
+                FROM FeedMaster f
+                LEFT JOIN FeedHealth h ON h.feed_id = f.id
+                WHERE f.is_synthetic = 0 AND (h.feed_id IS NULL OR h.next_check_at <= ?)
+                ORDER BY COALESCE(h.next_check_at, 0), f.id
+                LIMIT ?
+            """, (now, -1 if limit is None else limit))
+            
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def save_feed_health(self, health: Dict):
+        """Store (or replace) the latest health check for a feed."""
+        columns = [
+            'feed_id', 'status', 'http_status', 'latency_ms', 'final_url', 'etag', 'last_modified',
+            'content_hash', 'error', 'consecutive_failures', 'last_checked_at', 'last_changed_at',
+            'check_interval', 'next_check_at'
+        ]
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                INSERT OR REPLACE INTO FeedHealth ({', '.join(columns)})
+                VALUES ({', '.join('?' for _ in columns)})
+            """, [health.get(column) for column in columns])
+            conn.commit()
+    
+    def get_feed_health_map(self) -> Dict[int, Dict]:
+        """Get the latest health check of every checked feed, keyed by feed ID."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT feed_id, status, http_status, latency_ms, final_url, error, consecutive_failures,
+                       last_checked_at, last_changed_at, next_check_at
+                FROM FeedHealth
+            """)
+            
+            columns = [desc[0] for desc in cursor.description]
+            return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+    
+    def save_feed_items(self, feed_id: int, items: List[Dict], max_items: int = 200) -> int:
+        """
+        Store items read from a feed (existing GUIDs are skipped) and keep only
+        its max_items newest. Returns the number of new items.
+        """
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT OR IGNORE INTO FeedItems (feed_id, guid, title, link, summary, published_at, first_seen_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(feed_id, item['guid'], item.get('title'), item.get('link'), item.get('summary'),
+                   item.get('published_at') or now, now) for item in items])
+            added = cursor.rowcount
+            cursor.execute("""
+                DELETE FROM FeedItems
+                WHERE feed_id = ? AND id NOT IN (
+                    SELECT id FROM FeedItems WHERE feed_id = ? ORDER BY published_at DESC, id DESC LIMIT ?
+                )
+            """, (feed_id, feed_id, max_items))
+            conn.commit()
+            return added
+    
+    def get_newest_item_per_feed(self, website_nickname: Optional[str] = None, all_feeds: bool = True) -> List[Dict]:
+        """
+        Get the newest stored item of every feed (or, with all_feeds=False, of the
+        feeds of one website nickname; None or '' for unnamed websites).
+        """
+        query = f"""
+            SELECT {FEED_ITEM_COLUMNS}
+            FROM FeedMaster f
+            JOIN FeedItems i ON i.id = (
+                SELECT id FROM FeedItems WHERE feed_id = f.id ORDER BY published_at DESC, id DESC LIMIT 1
+            )
+        """
+        params = ()
+        if not all_feeds:
+            if website_nickname:
+                query += " WHERE f.website_nickname = ?"
+                params = (website_nickname,)
+            else:
+                query += " WHERE f.website_nickname IS NULL OR f.website_nickname = ''"
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def get_feed_items_before(self, feed_id: int, published_at: float, item_id: int, limit: int = 20) -> List[Dict]:
+        """Get a feed's items older than (published_at, item_id), newest first."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT {FEED_ITEM_COLUMNS}
+                FROM FeedItems i
+                JOIN FeedMaster f ON f.id = i.feed_id
+                WHERE i.feed_id = ? AND (i.published_at, i.id) < (?, ?)
+                ORDER BY i.published_at DESC, i.id DESC
+                LIMIT ?
+            """, (feed_id, published_at, item_id, limit))
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def get_feed_items_since(self, last_item_id: int) -> List[Dict]:
+        """Get items stored after item ID last_item_id, in insertion order."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT {FEED_ITEM_COLUMNS}
+                FROM FeedItems i
+                JOIN FeedMaster f ON f.id = i.feed_id
+                WHERE i.id > ?
+                ORDER BY i.id
+            """, (last_item_id,))
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def get_last_feed_item_id(self) -> int:
+        """Get the newest item ID (0 if no items were ever stored)."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'FeedItems'")
+            row = cursor.fetchone()
+            return row[0] if row else 0
@@ -0,0 +1,241 @@
+"""
+Staged discovery pipeline for batch scans.
+
+HTML parsing and the link scans of methods 1-2 are CPU-bound and hold the
+GIL, so with one thread per scan the network threads stall behind them.
+The pipeline splits every scan into three stages joined by bounded queues:
+
+    fetch threads    download page bytes (I/O only)
+        -> parse queue ->
+    parse processes  RSSDiscovery.analyze_page in a process pool (CPU only)
+        -> finish queue ->
+    finish threads   pattern probes and sitemaps (I/O), then store the result
+
+When a downstream stage falls behind, its queue fills and the stage before
+it blocks on put, so fetched-but-unparsed pages never pile up in memory.
+Parsing throughput scales with parse_processes instead of one core.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+# Marks the end of a stage's input
+_DONE = object()
+
+# Per-process state of parse workers
+_parser_state: Dict = {}
+
+
+def init_parse_worker(settings: Dict):
+    """Pool initializer: one parse-only RSSDiscovery per worker process (settings from analysis_settings())."""
+    from rss_discovery import RSSDiscovery
+
+    _parser_state['discovery'] = RSSDiscovery(verbose_logging=False, use_sitemaps=False, use_dns_cache=False,
+                                              **settings)
+
+
+def analyze_page_in_worker(body: Optional[bytes], url: str) -> Dict:
+    """RSSDiscovery.analyze_page in a worker of a parse_process_pool()."""
+    return _parser_state['discovery'].analyze_page(body, url)
+
+
+def parse_process_pool(processes: int, settings: Dict) -> ProcessPoolExecutor:
+    """A pool of parse-only worker processes for analyze_page_in_worker."""
+    # spawn: forking a process that is already running fetch threads is unsafe
+    return ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=init_parse_worker, initargs=(settings,))
+
+
+class DiscoveryPipeline:
+    """
+    Runs discovery for many sites through fetch, parse and finish stages.
+
+    rss_discovery does the I/O of every stage; results are stored through
+    discovery_cache when one is given (and fresh cached results are used
+    instead of scanning unless force is set). parse_processes=0 parses on
+    the fetch threads instead of a process pool.
+    """
+
+    def __init__(self, rss_discovery, discovery_cache=None, fetch_workers: int = 8,
+                 parse_processes: Optional[int] = None, finish_workers: int = 8, queue_size: int = 32):
+        self.rss_discovery = rss_discovery
+        self.discovery_cache = discovery_cache
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_processes = (os.cpu_count() or 1) if parse_processes is None else parse_processes
+        self.finish_workers = max(1, finish_workers)
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stats: Dict = {}
+
+    def _put(self, q: queue.Queue, item, blocked_key: Optional[str] = None):
+        """Put that waits while the queue is full (backpressure), unless the run is stopped."""
+        started = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        if blocked_key is not None:
+            self._add(blocked_key, time.perf_counter() - started)
+
+    def _get(self, q: queue.Queue):
+        """Get that returns _DONE once the run is stopped."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _add(self, key: str, value: float = 1):
+        with self._lock:
+            self._stats[key] += value
+
+    def _stage(self, name: str, work, workers: int, inbox: queue.Queue, outbox: queue.Queue, next_workers: int):
+        """
+        Start workers threads that call work(item) for each inbox item until
+        _DONE; the last one to finish sends next_workers _DONE markers on.
+        """
+        remaining = [workers]
+
+        def run():
+            while True:
+                item = self._get(inbox)
+                if item is _DONE:
+                    break
+                work(item)
+            with self._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                for _ in range(next_workers):
+                    self._put(outbox, _DONE)
+
+        threads = [threading.Thread(target=run, name=f"pipeline-{name}-{i + 1}", daemon=True) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def run(self, urls: Iterable[str], force: bool = False) -> Iterator[Tuple[str, Optional[Dict], bool, Optional[str]]]:
+        """
+        Scan urls, yielding (url, result, cached, error) as each site finishes,
+        in completion order. error is set (and result None) when a stage
+        raised. Closing the iterator early stops the pipeline.
+        """
+        self._stop.clear()
+        self._stats = {'fetched': 0, 'parsed': 0, 'finished': 0, 'cached': 0, 'failed': 0,
+                       'fetch_seconds': 0.0, 'parse_seconds': 0.0, 'finish_seconds': 0.0,
+                       'fetch_blocked_seconds': 0.0, 'parse_blocked_seconds': 0.0}
+        url_queue = queue.Queue(self.queue_size)
+        parse_queue = queue.Queue(self.queue_size)
+        finish_queue = queue.Queue(self.queue_size)
+        results = queue.Queue(self.queue_size)
+
+        pool = None
+        if self.parse_processes > 0:
+            pool = parse_process_pool(self.parse_processes, self.rss_discovery.analysis_settings())
+
+        def fail(url: str, error: Exception):
+            self._add('failed')
+            self._put(results, (url, None, False, str(error)))
+
+        def fetch(url: str):
+            try:
+                if self.discovery_cache is not None and not force:
+                    cached = self.discovery_cache.get(url)
+                    if cached is not None:
+                        self._add('cached')
+                        self._put(results, (url, cached, True, None))
+                        return
+                target = self.discovery_cache.scan_target(url) if self.discovery_cache is not None else url
+                scanned_at = time.time()
+                started = time.perf_counter()
+                body = self.rss_discovery.fetch_page_bytes(target)
+                fetch_cost = {'seconds': time.perf_counter() - started}
+                self._add('fetched')
+                self._add('fetch_seconds', fetch_cost['seconds'])
+                item = {'url': url, 'target': target, 'body': body, 'fetch_cost': fetch_cost, 'scanned_at': scanned_at}
+                if pool is None:
+                    parse(item)
+                else:
+                    self._put(parse_queue, item, 'fetch_blocked_seconds')
+            except Exception as e:
+                fail(url, e)
+
+        def parse(item: Dict):
+            try:
+                started = time.perf_counter()
+                if pool is None:
+                    page = self.rss_discovery.analyze_page(item.pop('body'), item['target'])
+                else:
+                    page = pool.submit(analyze_page_in_worker, item.pop('body'), item['target']).result()
+                self._add('parsed')
+                self._add('parse_seconds', time.perf_counter() - started)
+                page['costs'] = {'fetch': item['fetch_cost'], **page['costs']}
+                item['page'] = page
+                self._put(finish_queue, item, 'parse_blocked_seconds')
+            except Exception as e:
+                fail(item['url'], e)
+
+        def finish(item: Dict):
+            try:
+                started = time.perf_counter()
+                result = None
+                for event in self.rss_discovery.find_rss_feeds_iter(item['target'], page=item['page']):
+                    if event['event'] == 'done':
+                        result = event['result']
+                finish_seconds = time.perf_counter() - started
+                self._add('finished')
+                self._add('finish_seconds', finish_seconds)
+                # Time spent working on this site, not waiting in queues
+                scan_duration = sum(cost.get('seconds', 0.0) for cost in result['method_costs'].values())
+                if self.discovery_cache is not None:
+                    result = self.discovery_cache.put(item['url'], result, scan_duration=scan_duration,
+                                                      scanned_at=item['scanned_at'])
+                else:
+                    result = {**result, 'scanned_at': item['scanned_at'], 'scan_duration': scan_duration}
+                self._put(results, (item['url'], result, False, None))
+            except Exception as e:
+                fail(item['url'], e)
+
+        # Parse stage threads only hand pages to the pool and wait for them
+        parse_workers = max(1, self.parse_processes)
+        self._stage('fetch', fetch, self.fetch_workers, url_queue,
+                    parse_queue if pool is not None else finish_queue,
+                    parse_workers if pool is not None else self.finish_workers)
+        if pool is not None:
+            self._stage('parse', parse, parse_workers, parse_queue, finish_queue, self.finish_workers)
+        self._stage('finish', finish, self.finish_workers, finish_queue, results, 1)
+
+        def feed():
+            for url in urls:
+                if self._stop.is_set():
+                    return
+                self._put(url_queue, url)
+            for _ in range(self.fetch_workers):
+                self._put(url_queue, _DONE)
+
+        threading.Thread(target=feed, name="pipeline-feed", daemon=True).start()
+
+        try:
+            while True:
+                item = self._get(results)
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self._stop.set()
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        """Counts and busy/blocked seconds per stage of the last run."""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,108 @@
+"""
+Worker processes that run discovery jobs from the SQLite job queue.
+
+Each worker claims a job, keeps its lease alive with a heartbeat thread while
+find_rss_feeds runs, stores the result in the DiscoveryResults table and marks
+the job done (or failed, to be retried).
+"""
+
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Optional
+
+from db_manager import DatabaseManager
+from feed_cache import DiscoveryCache
+from job_queue import JobQueue
+from rss_discovery import RSSDiscovery
+
+
+def run_worker(db_path: str = "feed_storage.db", worker_id: Optional[str] = None, visibility_timeout: float = 120,
+               poll_interval: float = 2.0, max_jobs: Optional[int] = None, stop_event=None) -> int:
+    """
+    Claim and run jobs until stop_event is set (or max_jobs have run).
+    Returns the number of jobs this worker completed.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    queue = JobQueue(db_path)
+    discovery_cache = DiscoveryCache(RSSDiscovery(verbose_logging=False), DatabaseManager(db_path))
+    stop_event = stop_event or threading.Event()
+    completed = 0
+
+    while not stop_event.is_set() and (max_jobs is None or completed < max_jobs):
+        job = queue.claim(worker_id, visibility_timeout)
+        if job is None:
+            stop_event.wait(poll_interval)
+            continue
+
+        # Renew the lease at a third of the visibility timeout while the scan runs
+        scan_done = threading.Event()
+
+        def heartbeat():
+            while not scan_done.wait(visibility_timeout / 3):
+                if not queue.heartbeat(job['id'], worker_id, visibility_timeout):
+                    return
+
+        heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+        heartbeat_thread.start()
+        started = time.time()
+        try:
+            result = discovery_cache.find_rss_feeds(job['site_url'], force=job['force'])
+        except Exception as e:
+            queue.fail(job['id'], worker_id, str(e))
+            print(f"❌ [{worker_id}] job {job['id']} {job['site_url']}: {e}")
+            continue
+        finally:
+            scan_done.set()
+            heartbeat_thread.join()
+
+        if queue.complete(job['id'], worker_id):
+            completed += 1
+            print(f"✓ [{worker_id}] job {job['id']} {job['site_url']}: {len(result['feeds'])} feeds "
+                  f"in {time.time() - started:.1f}s (waited {job['claim_latency']:.1f}s)")
+        else:
+            print(f"⚠️  [{worker_id}] job {job['id']} lease was lost before completion")
+
+    return completed
+
+
+def _worker_process(db_path: str, visibility_timeout: float, poll_interval: float, stop_event):
+    """Process entry point: leave SIGINT to the parent and stop on its signal."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    run_worker(db_path, visibility_timeout=visibility_timeout, poll_interval=poll_interval, stop_event=stop_event)
+
+
+def start_workers(processes: int = 2, db_path: str = "feed_storage.db", visibility_timeout: float = 120,
+                  poll_interval: float = 2.0):
+    """Run N worker processes until interrupted; running jobs finish before exit."""
+    JobQueue(db_path)  # Create the queue table once before the workers race to it
+    stop_event = multiprocessing.Event()
+    workers = [
+        multiprocessing.Process(
+            target=_worker_process,
+            args=(db_path, visibility_timeout, poll_interval, stop_event),
+            name=f"discovery-worker-{i + 1}"
+        )
+        for i in range(max(1, processes))
+    ]
+    for worker in workers:
+        worker.start()
+    print(f"👷 Started {len(workers)} discovery workers (Ctrl+C to stop)")
+
+    def request_stop(signum, frame):
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        print("\n⏳ Stopping workers after their current jobs...")
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        stop_event.set()
+        for worker in workers:
+            worker.join()
+    print("👋 Discovery workers stopped")
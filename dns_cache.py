@@ -0,0 +1,190 @@
+"""
+In-process DNS cache for discovery HTTP traffic.
+
+One scan connects to the same host for the page fetch, its retries, every
+pattern probe, robots.txt and sitemaps; batch runs hit the same hosts again
+and again. install() routes urllib3's (and so requests') connection setup
+through DNSCache.getaddrinfo, which caches answers per host:
+
+  - successful answers for ttl seconds
+  - NXDOMAIN (EAI_NONAME) for negative_ttl seconds, so dead domains in bulk
+    lists fail immediately on repeat
+  - other resolver failures (timeouts, SERVFAIL) for the shorter failure_ttl
+
+Concurrent lookups of the same host share one resolver call. The system
+resolver (getaddrinfo) does not report record TTLs, so ttl is the upper bound
+an answer is trusted for; keep it at or below the TTLs of the sites scanned.
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import urllib3.util.connection as urllib3_connection
+from urllib3.exceptions import LocationParseError, NameResolutionError
+
+
+def _is_ip_literal(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def is_name_resolution_error(error: BaseException) -> bool:
+    """Check if a requests/urllib3 connection error means the host name didn't resolve."""
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, 'reason', reason), NameResolutionError)
+
+
+class DNSCache:
+    def __init__(self, ttl: float = 300, negative_ttl: float = 300, failure_ttl: float = 30,
+                 max_entries: int = 4096):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.failure_ttl = failure_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (expires_at, addrinfo list or gaierror, seconds the lookup took)
+        self._entries: "OrderedDict[Tuple, Tuple[float, object, float]]" = OrderedDict()
+        self._inflight: Dict[Tuple, threading.Event] = {}
+        self._stats = {'lookups': 0, 'hits': 0, 'negative_hits': 0, 'misses': 0, 'evictions': 0,
+                       'resolver_seconds': 0.0, 'saved_seconds': 0.0}
+        self._original_create_connection = None
+
+    def _cached(self, key: Tuple):
+        """Return the live cache entry for key, counting the hit (caller holds the lock)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self._stats['negative_hits' if isinstance(entry[1], socket.gaierror) else 'hits'] += 1
+        self._stats['saved_seconds'] += entry[2]
+        return entry
+
+    def getaddrinfo(self, host: str, port, family: int = 0, type: int = 0, proto: int = 0, flags: int = 0) -> List:
+        """socket.getaddrinfo with caching; raises the cached socket.gaierror for failed hosts."""
+        if _is_ip_literal(host):
+            return socket.getaddrinfo(host, port, family, type, proto, flags)
+
+        key = (host.lower(), port, family, type, proto, flags)
+        with self._lock:
+            self._stats['lookups'] += 1
+        while True:
+            with self._lock:
+                entry = self._cached(key)
+                if entry is None:
+                    pending = self._inflight.get(key)
+                    if pending is None:
+                        done = threading.Event()
+                        self._inflight[key] = done
+                        self._stats['misses'] += 1
+                        break
+            if entry is not None:
+                if isinstance(entry[1], socket.gaierror):
+                    # A fresh copy, so repeated raises don't keep growing one traceback
+                    raise socket.gaierror(*entry[1].args)
+                return list(entry[1])
+            # Another thread is resolving this host; wait and reuse its answer
+            pending.wait()
+
+        started = time.perf_counter()
+        try:
+            try:
+                result = socket.getaddrinfo(host, port, family, type, proto, flags)
+                ttl = self.ttl
+            except socket.gaierror as e:
+                result = e
+                ttl = self.negative_ttl if e.errno == socket.EAI_NONAME else self.failure_ttl
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                self._stats['resolver_seconds'] += elapsed
+                self._entries[key] = (time.time() + ttl, result, elapsed)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats['evictions'] += 1
+        finally:
+            # Also on other errors (bad port, bad host encoding): waiters retry instead of hanging
+            with self._lock:
+                del self._inflight[key]
+            done.set()
+
+        if isinstance(result, socket.gaierror):
+            raise result
+        return list(result)
+
+    def create_connection(self, address, timeout=urllib3_connection._DEFAULT_TIMEOUT, source_address=None,
+                          socket_options=None) -> socket.socket:
+        """urllib3.util.connection.create_connection, resolving through the cache."""
+        host, port = address
+        if host.startswith("["):
+            host = host.strip("[]")
+        try:
+            host.encode("idna")
+        except UnicodeError:
+            raise LocationParseError(f"'{host}', label empty or too long") from None
+
+        err = None
+        for af, socktype, proto, _, sa in self.getaddrinfo(host, port, urllib3_connection.allowed_gai_family(),
+                                                           socket.SOCK_STREAM):
+            sock = None
+            try:
+                sock = socket.socket(af, socktype, proto)
+                urllib3_connection._set_socket_options(sock, socket_options)
+                if timeout is not urllib3_connection._DEFAULT_TIMEOUT:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sa)
+                return sock
+            except OSError as e:
+                err = e
+                if sock is not None:
+                    sock.close()
+
+        if err is not None:
+            raise err
+        raise OSError("getaddrinfo returns an empty list")
+
+    def install(self):
+        """Route every urllib3/requests connection in this process through the cache."""
+        with self._lock:
+            if self._original_create_connection is None:
+                self._original_create_connection = urllib3_connection.create_connection
+                urllib3_connection.create_connection = self.create_connection
+
+    def uninstall(self):
+        """Restore urllib3's own resolution."""
+        with self._lock:
+            if self._original_create_connection is not None:
+                urllib3_connection.create_connection = self._original_create_connection
+                self._original_create_connection = None
+
+    def clear(self):
+        """Forget every cached answer."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Lookup counters, hit rate, resolver time spent and time saved by hits."""
+        with self._lock:
+            lookups = self._stats['lookups']
+            return {
+                **self._stats,
+                'hit_rate': (self._stats['hits'] + self._stats['negative_hits']) / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'installed': self._original_create_connection is not None
+            }
+
+
+# Shared by all discovery traffic in the process
+dns_cache = DNSCache()
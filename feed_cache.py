@@ -0,0 +1,313 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Dict, Optional
+
+from db_manager import DatabaseManager
+from url_utils import canonical_key, canonical_resolver
+
+UNNAMED_WEBSITE = 'Unnamed Website'
+
+
+class FeedCache:
+    """
+    Process-wide read-through cache over the FeedMaster queries used by the UI.
+
+    Website groups and per-site lookups are cached separately so a write only
+    invalidates the groups and site it touches. Writes made through
+    save_feed/delete_feed here are invalidated precisely; any other write
+    (including one from another process) is detected through the
+    DatabaseManager data version, checked at most once per check_interval
+    seconds, and clears the whole cache.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, max_groups: int = 256, max_sites: int = 1024,
+                 check_interval: float = 1.0):
+        self.db_manager = db_manager
+        self.max_groups = max_groups
+        self.max_sites = max_sites
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._groups: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._sites: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._group_names: Optional[List[str]] = None
+        self._version = db_manager.data_version
+        self._checked_at = time.time()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    @property
+    def data_version(self) -> int:
+        """Data version the cached entries were read at."""
+        return self._version
+
+    def _check_version(self, force: bool = False):
+        """Drop everything if the database was written behind our back (rate-limited unless force)."""
+        now = time.time()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        version = self.db_manager.data_version
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+    def _get(self, store: OrderedDict, key: str, loader, max_size: int) -> List[Dict]:
+        """Return a cached entry, loading and inserting it on a miss (LRU eviction)."""
+        if key in store:
+            store.move_to_end(key)
+            self._stats['hits'] += 1
+            return store[key]
+
+        self._stats['misses'] += 1
+        value = loader()
+        store[key] = value
+        while len(store) > max_size:
+            store.popitem(last=False)
+            self._stats['evictions'] += 1
+        return value
+
+    def _invalidate(self, website_nickname: Optional[str], site_url: Optional[str]):
+        """Invalidate the entries affected by a write to one group and site."""
+        group_key = website_nickname or UNNAMED_WEBSITE
+        if self._groups.pop(group_key, None) is not None:
+            self._stats['invalidations'] += 1
+        if site_url is not None and self._sites.pop(canonical_key(site_url), None) is not None:
+            self._stats['invalidations'] += 1
+        self._version += 1
+        # Another writer slipped in alongside ours; fall back to a full clear
+        self._check_version(force=True)
+
+    def _website_names(self) -> List[str]:
+        """Group names in listing order (caller holds the lock and checked the version)."""
+        if self._group_names is None:
+            self._stats['misses'] += 1
+            names = []
+            for nickname in self.db_manager.get_website_nicknames():
+                name = nickname or UNNAMED_WEBSITE
+                if name not in names:
+                    names.append(name)
+            self._group_names = names
+        else:
+            self._stats['hits'] += 1
+        return self._group_names
+
+    def _website_feeds(self, website_name: str) -> List[Dict]:
+        """Feeds of one group (caller holds the lock and checked the version)."""
+        nickname = None if website_name == UNNAMED_WEBSITE else website_name
+        return self._get(
+            self._groups, website_name,
+            lambda: self.db_manager.get_feeds_by_website_nickname(nickname),
+            self.max_groups
+        )
+
+    def get_website_names(self) -> List[str]:
+        """Get the website group names in listing order."""
+        with self._lock:
+            self._check_version()
+            return list(self._website_names())
+
+    def get_feeds_for_website(self, website_name: str) -> List[Dict]:
+        """Get the feeds of one website group."""
+        with self._lock:
+            self._check_version()
+            return list(self._website_feeds(website_name))
+
+    def get_feeds_grouped_by_website(self) -> Dict[str, List[Dict]]:
+        """Get all feeds grouped by website nickname."""
+        with self._lock:
+            self._check_version()
+            grouped = {}
+            for name in self._website_names():
+                feeds = self._website_feeds(name)
+                if feeds:
+                    grouped[name] = list(feeds)
+            return grouped
+
+    def get_feeds_by_site_url(self, site_url: str) -> List[Dict]:
+        """Get all feeds for a given site URL."""
+        with self._lock:
+            self._check_version()
+            return list(self._get(
+                self._sites, canonical_key(site_url),
+                lambda: self.db_manager.get_feeds_by_site_url(site_url),
+                self.max_sites
+            ))
+
+    def save_feed(self, site_url: str, feed_url: str, user_given_name: str, website_nickname: str, is_synthetic: bool = False) -> int:
+        """Save a feed and invalidate its website group and site lookup."""
+        with self._lock:
+            self._check_version()
+            feed_id = self.db_manager.save_feed(site_url, feed_url, user_given_name, website_nickname, is_synthetic)
+            if self._group_names is not None and (website_nickname or UNNAMED_WEBSITE) not in self._group_names:
+                self._group_names = None
+            self._invalidate(website_nickname, site_url)
+            return feed_id
+
+    def delete_feed(self, feed_id: int) -> bool:
+        """Delete a feed and invalidate its website group and site lookup."""
+        with self._lock:
+            self._check_version()
+            feed = self.db_manager.get_feed_by_id(feed_id)
+            if not feed:
+                return False
+            deleted = self.db_manager.delete_feed(feed_id)
+            if deleted:
+                # The group may now be empty, so the name listing must be rebuilt
+                self._group_names = None
+                self._invalidate(feed['website_nickname'], feed['site_url'])
+            return deleted
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._stats['invalidations'] += len(self._groups) + len(self._sites)
+            self._groups.clear()
+            self._sites.clear()
+            self._group_names = None
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters, hit rate and current sizes."""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+                'groups': len(self._groups),
+                'sites': len(self._sites),
+                'data_version': self._version
+            }
+
+
+class DiscoveryCache:
+    """
+    Read-through cache of find_rss_feeds results keyed by canonical site URL.
+
+    Lookups check an in-process LRU first, then the shared DiscoveryResults
+    table (when a DatabaseManager is given), and only then scan the network.
+    Successful results live for ttl_seconds; errors (blocked or unreachable
+    sites) for the shorter error_ttl_seconds. force=True skips both layers
+    and replaces the entry. Concurrent scans of the same site (in any of its
+    equivalent URL forms) share one scan, which fetches the form the resolver
+    reports the host redirects to.
+    """
+
+    def __init__(self, rss_discovery, db_manager: Optional[DatabaseManager] = None,
+                 ttl_seconds: float = 6 * 3600, error_ttl_seconds: float = 900, max_entries: int = 512,
+                 resolver=canonical_resolver):
+        self.rss_discovery = rss_discovery
+        self.db_manager = db_manager
+        self.resolver = resolver
+        self.ttl_seconds = ttl_seconds
+        self.error_ttl_seconds = error_ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._stats = {'hits': 0, 'db_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def is_fresh(self, result: Dict) -> bool:
+        """Apply the TTL policy to a stored result."""
+        ttl = self.error_ttl_seconds if result.get('error') else self.ttl_seconds
+        return time.time() - result['scanned_at'] <= ttl
+
+    def scan_target(self, url: str) -> str:
+        """The URL a scan of url should actually fetch."""
+        return self.resolver.resolve(url) if self.resolver is not None else url
+
+    def _remember(self, key: str, result: Dict):
+        """Insert a result into the in-process LRU."""
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached result for url if it is still fresh."""
+        key = canonical_key(url)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                if self.is_fresh(result):
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return result
+                del self._entries[key]
+
+        if self.db_manager is not None:
+            result = self.db_manager.get_discovery_result(url)
+            if result is not None and self.is_fresh(result):
+                self._remember(key, result)
+                with self._lock:
+                    self._stats['db_hits'] += 1
+                return result
+        return None
+
+    def put(self, url: str, result: Dict, scan_duration: float = 0.0, scanned_at: Optional[float] = None) -> Dict:
+        """Cache a scan result for url in every layer; returns it with scan metadata."""
+        scanned_at = time.time() if scanned_at is None else scanned_at
+        result = {**result, 'scanned_at': scanned_at, 'scan_duration': scan_duration}
+        self._remember(canonical_key(url), result)
+        if self.db_manager is not None:
+            self.db_manager.save_discovery_result(url, result, scanned_at, scan_duration)
+        return result
+
+    def find_rss_feeds(self, url: str, force: bool = False, on_event: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Return find_rss_feeds(url), scanning only on a miss, expiry or force.
+        If this call runs the scan, on_event receives its find_rss_feeds_iter
+        events (all but 'done') as they happen; callers that join another
+        scan or hit the cache get only the result.
+        """
+        key = canonical_key(url)
+        while True:
+            if not force:
+                result = self.get(url)
+                if result is not None:
+                    return result
+
+            with self._lock:
+                pending = self._inflight.get(key)
+                if pending is None:
+                    done = threading.Event()
+                    self._inflight[key] = done
+                    self._stats['misses'] += 1
+                    break
+            # Another caller is scanning this URL; wait and reuse its result
+            pending.wait()
+            force = False
+
+        try:
+            started = time.time()
+            target = self.scan_target(url)
+            if on_event is None:
+                result = self.rss_discovery.find_rss_feeds(target)
+            else:
+                for event in self.rss_discovery.find_rss_feeds_iter(target):
+                    if event['event'] == 'done':
+                        result = event['result']
+                    else:
+                        on_event(event)
+            return self.put(url, result, scan_duration=time.time() - started, scanned_at=started)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            done.set()
+
+    def invalidate(self, url: str):
+        """Forget the cached result for url in every layer."""
+        with self._lock:
+            self._entries.pop(canonical_key(url), None)
+        if self.db_manager is not None:
+            self.db_manager.delete_discovery_result(url)
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters, hit rate and current size."""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['db_hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': (self._stats['hits'] + self._stats['db_hits']) / lookups if lookups else 0.0,
+                'entries': len(self._entries)
+            }
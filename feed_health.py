@@ -0,0 +1,238 @@
+"""
+Health checks for saved feeds.
+
+Every due feed is fetched concurrently with a conditional GET (ETag /
+Last-Modified), and the outcome is stored in the FeedHealth table together
+with the next check time. Intervals adapt per feed: stable healthy feeds back
+off towards MAX_INTERVAL, feeds whose status flips are rechecked at
+MIN_INTERVAL, and failing feeds back off exponentially from MIN_INTERVAL.
+The UI only reads FeedHealth, so rendering never touches the network.
+Items of feeds whose content changed are stored in FeedItems for the river.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import requests
+
+from db_manager import DatabaseManager
+from feed_items import parse_feed_items
+from profiling import span
+
+MIN_INTERVAL = 15 * 60
+DEFAULT_INTERVAL = 6 * 3600
+MAX_INTERVAL = 7 * 24 * 3600
+
+# A healthy feed with no new content for this long is reported as stale
+STALE_AFTER = 30 * 24 * 3600
+
+# Only this much of a body is read; larger bodies are hashed and parsed up to this size
+MAX_BODY_BYTES = 5 * 1024 * 1024
+
+OK = 'ok'
+NOT_FEED = 'not_feed'
+HTTP_ERROR = 'http_error'
+UNREACHABLE = 'unreachable'
+
+STATUS_LABELS = {
+    OK: '✅ OK',
+    NOT_FEED: '⚠️ Not a feed',
+    HTTP_ERROR: '❌ HTTP error',
+    UNREACHABLE: '❌ Unreachable'
+}
+
+
+def looks_like_feed(content_type: str, body_start: bytes) -> bool:
+    """Check if a response is an RSS/Atom document rather than an HTML page."""
+    content_type = content_type.lower()
+    if any(feed_type in content_type for feed_type in ['rss', 'atom']):
+        return True
+    head = body_start[:2048].lstrip().lower()
+    if b'<html' in head or b'<!doctype html' in head:
+        return False
+    return 'xml' in content_type or b'<rss' in head or b'<feed' in head or b'<rdf:rdf' in head
+
+
+def next_interval(previous: Dict, status: str, changed: bool, consecutive_failures: int) -> float:
+    """Pick the next check interval from the previous check and this outcome."""
+    interval = previous.get('check_interval') or DEFAULT_INTERVAL
+    previous_status = previous.get('status')
+
+    if status != OK:
+        interval = MIN_INTERVAL * (2 ** min(consecutive_failures - 1, 10))
+    elif previous_status is not None and previous_status != OK:
+        # Just recovered (flapping): look again soon
+        interval = MIN_INTERVAL
+    elif changed:
+        interval = interval / 2
+    else:
+        interval = interval * 2
+
+    interval = max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+    # Jitter so feeds saved together don't stay in lockstep
+    return interval * random.uniform(0.9, 1.1)
+
+
+class FeedHealthChecker:
+    def __init__(self, db_manager: DatabaseManager, workers: int = 16, timeout: float = 10, profiler=None):
+        self.db_manager = db_manager
+        self.workers = workers
+        self.timeout = timeout
+        # Optional profiling.Profiler; records a span per feed request when set
+        self.profiler = profiler
+        self.headers = {
+            'User-Agent': 'RSS Architect Feed Health Checker/1.0',
+            'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, text/xml;q=0.9, */*;q=0.1'
+        }
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        """One keep-alive session per checker thread."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self.headers)
+        return session
+
+    def check_feed(self, feed: Dict) -> Dict:
+        """Check one feed (a row from get_feeds_due_for_health_check) and return its new health row."""
+        now = time.time()
+        headers = {}
+        if feed.get('etag'):
+            headers['If-None-Match'] = feed['etag']
+        if feed.get('last_modified'):
+            headers['If-Modified-Since'] = feed['last_modified']
+
+        health = {
+            'feed_id': feed['id'],
+            'last_checked_at': now,
+            'etag': feed.get('etag'),
+            'last_modified': feed.get('last_modified'),
+            'content_hash': feed.get('content_hash'),
+            'last_changed_at': feed.get('last_changed_at'),
+            'http_status': None,
+            'final_url': None,
+            'error': None
+        }
+        changed = False
+        started = time.perf_counter()
+        try:
+            with span(self.profiler, 'GET feed', 'request', url=feed['feed_url']), \
+                    self._session().get(feed['feed_url'], headers=headers, timeout=self.timeout,
+                                        allow_redirects=True, stream=True) as response:
+                health['http_status'] = response.status_code
+                health['final_url'] = response.url if response.url != feed['feed_url'] else None
+
+                if response.status_code == 304:
+                    status = OK
+                elif response.status_code == 200:
+                    body = read_body(response, MAX_BODY_BYTES)
+                    if looks_like_feed(response.headers.get('content-type', ''), body):
+                        status = OK
+                        content_hash = hashlib.sha1(body).hexdigest()
+                        changed = feed.get('content_hash') is not None and content_hash != feed['content_hash']
+                        if content_hash != feed.get('content_hash'):
+                            health['items'] = parse_feed_items(body)
+                        health['content_hash'] = content_hash
+                        health['etag'] = response.headers.get('ETag')
+                        health['last_modified'] = response.headers.get('Last-Modified')
+                    else:
+                        status = NOT_FEED
+                        health['error'] = f"Returned {response.headers.get('content-type', 'unknown content')} instead of a feed"
+                else:
+                    status = HTTP_ERROR
+                    health['error'] = f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            status = UNREACHABLE
+            health['error'] = str(e)[:500]
+
+        health['latency_ms'] = (time.perf_counter() - started) * 1000
+        health['status'] = status
+        if changed or (status == OK and not health['last_changed_at']):
+            health['last_changed_at'] = now
+        health['consecutive_failures'] = 0 if status == OK else (feed.get('consecutive_failures') or 0) + 1
+        health['check_interval'] = next_interval(feed, status, changed, health['consecutive_failures'])
+        health['next_check_at'] = now + health['check_interval']
+        return health
+
+    def check_due(self, limit: Optional[int] = None) -> List[Dict]:
+        """Check every feed that is due, concurrently, and store the results."""
+        feeds = self.db_manager.get_feeds_due_for_health_check(time.time(), limit)
+        if not feeds:
+            return []
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='feed-health') as executor:
+            futures = {executor.submit(self.check_feed, feed): feed for feed in feeds}
+            # Store each result as it arrives, so one failing check can't discard the others
+            for future in as_completed(futures):
+                try:
+                    health = future.result()
+                except Exception as e:
+                    print(f"⚠️  Health check of feed {futures[future]['id']} failed: {e}")
+                    continue
+                self.db_manager.save_feed_health(health)
+                if health.get('items'):
+                    self.db_manager.save_feed_items(health['feed_id'], health['items'])
+                results.append(health)
+        return results
+
+    def run_forever(self, max_sleep: float = 60, stop_event: Optional[threading.Event] = None):
+        """Keep checking feeds as they come due."""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            results = self.check_due()
+            if results:
+                failing = sum(1 for health in results if health['status'] != OK)
+                print(f"🩺 Checked {len(results)} feeds ({failing} failing)")
+            stop_event.wait(max_sleep)
+
+
+def read_body(response: requests.Response, max_bytes: int) -> bytes:
+    """
+    Read at most max_bytes of a streamed response body (decoded). Read errors
+    surface as requests exceptions, unlike response.raw.read().
+    """
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            break
+    return b''.join(chunks)[:max_bytes]
+
+
+def describe_health(health: Optional[Dict], now: Optional[float] = None) -> str:
+    """One-line human summary of a FeedHealth row for the UI."""
+    if not health:
+        return "🩺 Not checked yet"
+    now = now or time.time()
+
+    label = STATUS_LABELS.get(health['status'], health['status'])
+    if health['status'] == OK and health['last_changed_at'] and now - health['last_changed_at'] > STALE_AFTER:
+        label = '💤 Stale (no new items)'
+    parts = [label]
+    if health['status'] != OK and health['error']:
+        parts.append(health['error'][:80])
+    if health['consecutive_failures']:
+        parts.append(f"{health['consecutive_failures']} failures in a row")
+    if health['latency_ms'] is not None:
+        parts.append(f"{health['latency_ms']:.0f} ms")
+    parts.append(f"checked {format_age(now - health['last_checked_at'])} ago")
+    if health['last_changed_at']:
+        parts.append(f"changed {format_age(now - health['last_changed_at'])} ago")
+    return " | ".join(parts)
+
+
+def format_age(seconds: float) -> str:
+    """Format a duration as a short human string (e.g. '5m', '3h', '2d')."""
+    if seconds < 3600:
+        return f"{max(0, int(seconds // 60))}m"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 86400)}d"
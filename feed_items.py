@@ -0,0 +1,92 @@
+"""
+Item extraction from RSS 2.0, RSS 1.0 (RDF) and Atom documents.
+"""
+
+import hashlib
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+# Longer summaries are cut before storage
+MAX_SUMMARY_CHARS = 1000
+
+
+def _local_name(tag) -> str:
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def parse_date(value: Optional[str]) -> Optional[float]:
+    """RFC 822 (RSS) or ISO 8601 (Atom, dc:date) date to a timestamp; None if unparseable."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    try:
+        return parsed.timestamp()
+    except (OverflowError, OSError):
+        return None
+
+
+def _item_fields(element: ET.Element) -> Dict:
+    """Map an <item>/<entry> element to title, link, guid, published_at and summary."""
+    fields: Dict = {}
+    for child in element:
+        name = _local_name(child.tag)
+        text = (child.text or '').strip()
+        if name == 'title':
+            fields.setdefault('title', text)
+        elif name == 'link':
+            # Atom: <link rel="alternate" href="..."/>; RSS: <link>...</link>
+            href = child.get('href')
+            if href and child.get('rel', 'alternate') == 'alternate':
+                fields.setdefault('link', href.strip())
+            elif text:
+                fields.setdefault('link', text)
+        elif name in ('guid', 'id'):
+            fields.setdefault('guid', text)
+        elif name in ('pubDate', 'published', 'date', 'updated', 'issued'):
+            # Prefer the publication date over 'updated'
+            published = parse_date(text)
+            if published is not None and (name != 'updated' or 'published_at' not in fields):
+                fields['published_at'] = published
+        elif name in ('description', 'summary', 'content', 'encoded'):
+            fields.setdefault('summary', text[:MAX_SUMMARY_CHARS])
+    return fields
+
+
+def parse_feed_items(body: bytes) -> List[Dict]:
+    """
+    Items of a feed document as dicts with guid, title, link, summary and
+    published_at (None when the item has no parseable date). Returns [] for
+    documents that can't be parsed.
+    """
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return []
+
+    items = []
+    for element in root.iter():
+        if _local_name(element.tag) not in ('item', 'entry'):
+            continue
+        fields = _item_fields(element)
+        if not fields.get('link') and not fields.get('title'):
+            continue
+        guid = fields.get('guid') or fields.get('link') or hashlib.sha1(fields['title'].encode('utf-8')).hexdigest()
+        items.append({
+            'guid': guid,
+            'title': fields.get('title') or None,
+            'link': fields.get('link') or None,
+            'summary': fields.get('summary') or None,
+            'published_at': fields.get('published_at')
+        })
+    return items
@@ -0,0 +1,255 @@
+"""
+Durable discovery job queue stored in the SQLite database.
+
+Workers claim jobs under a lease that expires after a visibility timeout
+unless renewed with heartbeat(). Jobs whose worker crashed become claimable
+again once the lease expires; each claim counts as an attempt and a job is
+marked failed after max_attempts. Claims use BEGIN IMMEDIATE so several
+processes (or machines sharing the database file) never claim the same job.
+The default rollback journal is kept on purpose: WAL does not work on
+network file systems.
+"""
+
+import sqlite3
+import time
+from typing import List, Dict, Optional
+
+from stats_utils import percentile
+
+QUEUED = 'queued'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobQueue:
+    def __init__(self, db_path: str = "feed_storage.db", busy_timeout: float = 30):
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.init_queue()
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None so claim() can issue its own BEGIN IMMEDIATE
+        return sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+
+    def init_queue(self):
+        """Create the DiscoveryJobs table and its indexes if they don't exist."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS DiscoveryJobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    site_url TEXT NOT NULL,
+                    force BOOLEAN NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL DEFAULT 3,
+                    enqueued_at REAL NOT NULL,
+                    available_at REAL NOT NULL,
+                    claimed_at REAL,
+                    lease_owner TEXT,
+                    lease_expires_at REAL,
+                    heartbeat_at REAL,
+                    finished_at REAL,
+                    error TEXT
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_discovery_jobs_ready
+                ON DiscoveryJobs (status, available_at)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_discovery_jobs_lease
+                ON DiscoveryJobs (status, lease_expires_at)
+            """)
+
+    def enqueue(self, site_url: str, force: bool = False, max_attempts: int = 3) -> int:
+        """Add a discovery job and return its ID."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO DiscoveryJobs (site_url, force, max_attempts, enqueued_at, available_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (site_url, force, max_attempts, now, now))
+            return cursor.lastrowid
+
+    def enqueue_many(self, site_urls: List[str], force: bool = False, max_attempts: int = 3) -> int:
+        """Add one discovery job per site URL in a single transaction."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            cursor.executemany("""
+                INSERT INTO DiscoveryJobs (site_url, force, max_attempts, enqueued_at, available_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(site_url, force, max_attempts, now, now) for site_url in site_urls])
+            cursor.execute("COMMIT")
+            return len(site_urls)
+
+    def claim(self, worker_id: str, visibility_timeout: float = 120) -> Optional[Dict]:
+        """
+        Lease the oldest ready job to worker_id, or return None if there is none.
+
+        Expired leases are recovered first: requeued if attempts remain,
+        otherwise marked failed.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute("""
+                    UPDATE DiscoveryJobs
+                    SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                        error = 'Lease expired (worker ' || lease_owner || ' stopped responding)',
+                        finished_at = CASE WHEN attempts >= max_attempts THEN ? ELSE NULL END,
+                        available_at = ?,
+                        lease_owner = NULL,
+                        lease_expires_at = NULL
+                    WHERE status = 'leased' AND lease_expires_at < ?
+                """, (now, now, now))
+
+                cursor.execute("""
+                    SELECT id, site_url, force, attempts, max_attempts, enqueued_at, available_at
+                    FROM DiscoveryJobs
+                    WHERE status = 'queued' AND available_at <= ?
+                    ORDER BY available_at, id
+                    LIMIT 1
+                """, (now,))
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute("COMMIT")
+                    return None
+
+                columns = [desc[0] for desc in cursor.description]
+                job = dict(zip(columns, row))
+                cursor.execute("""
+                    UPDATE DiscoveryJobs
+                    SET status = 'leased', attempts = attempts + 1, claimed_at = ?,
+                        lease_owner = ?, lease_expires_at = ?, heartbeat_at = ?
+                    WHERE id = ?
+                """, (now, worker_id, now + visibility_timeout, now, job['id']))
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+        job['force'] = bool(job['force'])
+        job['attempts'] += 1
+        job['claimed_at'] = now
+        job['claim_latency'] = now - job['available_at']
+        return job
+
+    def heartbeat(self, job_id: int, worker_id: str, visibility_timeout: float = 120) -> bool:
+        """Extend a lease; returns False if the worker no longer holds it."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE DiscoveryJobs
+                SET lease_expires_at = ?, heartbeat_at = ?
+                WHERE id = ? AND status = 'leased' AND lease_owner = ?
+            """, (now + visibility_timeout, now, job_id, worker_id))
+            return cursor.rowcount > 0
+
+    def complete(self, job_id: int, worker_id: str) -> bool:
+        """Mark a leased job done; returns False if the lease was lost."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE DiscoveryJobs
+                SET status = 'done', finished_at = ?, error = NULL, lease_expires_at = NULL
+                WHERE id = ? AND status = 'leased' AND lease_owner = ?
+            """, (time.time(), job_id, worker_id))
+            return cursor.rowcount > 0
+
+    def fail(self, job_id: int, worker_id: str, error: str, retry_delay: float = 30) -> bool:
+        """
+        Record a failed attempt. The job is requeued after retry_delay * attempts
+        seconds, or marked failed once it has used all its attempts.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE DiscoveryJobs
+                SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                    finished_at = CASE WHEN attempts >= max_attempts THEN ? ELSE NULL END,
+                    available_at = ? + ? * attempts,
+                    error = ?,
+                    lease_expires_at = NULL
+                WHERE id = ? AND status = 'leased' AND lease_owner = ?
+            """, (now, now, retry_delay, error, job_id, worker_id))
+            return cursor.rowcount > 0
+
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """Get a job row by ID."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM DiscoveryJobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+            if row:
+                columns = [desc[0] for desc in cursor.description]
+                return dict(zip(columns, row))
+            return None
+
+    def stats(self, window_seconds: float = 3600) -> Dict:
+        """
+        Queue depth by status, claim latency (time from available to claimed)
+        and per-worker throughput over the last window_seconds.
+        """
+        now = time.time()
+        since = now - window_seconds
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT status, COUNT(*) FROM DiscoveryJobs GROUP BY status")
+            depth = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+            depth.update(dict(cursor.fetchall()))
+
+            cursor.execute("""
+                SELECT COUNT(*) FROM DiscoveryJobs WHERE status = 'queued' AND available_at <= ?
+            """, (now,))
+            ready = cursor.fetchone()[0]
+
+            cursor.execute("""
+                SELECT claimed_at - available_at FROM DiscoveryJobs
+                WHERE claimed_at >= ? AND status IN ('leased', 'done')
+                ORDER BY 1
+            """, (since,))
+            latencies = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute("""
+                SELECT lease_owner, COUNT(*), AVG(finished_at - claimed_at)
+                FROM DiscoveryJobs
+                WHERE status = 'done' AND finished_at >= ?
+                GROUP BY lease_owner
+                ORDER BY lease_owner
+            """, (since,))
+            workers = {
+                worker_id: {
+                    'completed': completed,
+                    'jobs_per_minute': completed / (window_seconds / 60),
+                    'avg_job_seconds': avg_seconds
+                }
+                for worker_id, completed, avg_seconds in cursor.fetchall()
+            }
+
+        def pct(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return percentile(latencies, p)
+
+        return {
+            'depth': depth,
+            'ready': ready,
+            'claim_latency': {
+                'count': len(latencies),
+                'avg': sum(latencies) / len(latencies) if latencies else None,
+                'p50': pct(50),
+                'p95': pct(95),
+                'max': latencies[-1] if latencies else None
+            },
+            'workers': workers,
+            'window_seconds': window_seconds
+        }
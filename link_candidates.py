@@ -0,0 +1,80 @@
+"""
+Compact, bounded collection of candidate links found on a page.
+
+RSS directory pages can carry tens of thousands of matching anchors. Instead
+of one dict per match, deduplicated only at the end, candidates are stored as
+slotted LinkCandidate objects and deduplicated by canonical key as they are
+added. At most max_candidates are kept and titles are cut to max_title_chars.
+Dicts are built only for the candidates that survive.
+"""
+
+import sys
+from typing import Callable, Dict, Iterator, List, Union
+
+from url_utils import canonical_key
+
+
+class LinkCandidate:
+    __slots__ = ('url', 'title', 'type')
+
+    def __init__(self, url: str, title: str, link_type: str):
+        self.url = url
+        self.title = title
+        self.type = link_type
+
+    def to_dict(self) -> Dict:
+        return {'url': self.url, 'title': self.title, 'type': self.type}
+
+
+class CandidateSet:
+    """Insertion-ordered candidates, deduplicated on add and capped at max_candidates."""
+
+    def __init__(self, max_candidates: int = 5000, max_title_chars: int = 200,
+                 key: Callable[[str], str] = canonical_key):
+        self.max_candidates = max_candidates
+        self.max_title_chars = max_title_chars
+        self.key = key
+        self._seen = set()
+        self._candidates: List[LinkCandidate] = []
+        self.duplicates = 0
+        self.dropped = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self._candidates) >= self.max_candidates
+
+    @property
+    def truncated(self) -> bool:
+        """Whether candidates were turned away because the cap was reached."""
+        return self.dropped > 0
+
+    def add(self, url: str, title: Union[str, Callable[[], str], None], link_type: str = 'discovered') -> bool:
+        """
+        Add a candidate unless its key was seen or the set is full; returns True
+        if added. title may be a callable, called only for candidates that are kept.
+        """
+        key = self.key(url)
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        if self.full:
+            self.dropped += 1
+            return False
+        self._seen.add(key)
+        if callable(title):
+            title = title()
+        # Types repeat on every candidate; share one string object per type
+        self._candidates.append(LinkCandidate(url, (title or '')[:self.max_title_chars], sys.intern(link_type)))
+        return True
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+    def __iter__(self) -> Iterator[LinkCandidate]:
+        return iter(self._candidates)
+
+    def to_dicts(self) -> List[Dict]:
+        return [candidate.to_dict() for candidate in self._candidates]
+
+    def stats(self) -> Dict:
+        return {'candidates': len(self._candidates), 'duplicates': self.duplicates, 'dropped': self.dropped}
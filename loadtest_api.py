@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Load generator for the RSS Architect HTTP API (python run.py serve-api).
+
+Sends requests from N concurrent clients and reports throughput and latency
+percentiles per endpoint, e.g.:
+
+    python loadtest_api.py --concurrency 32 --requests 2000 --path /health --path /feeds
+    python loadtest_api.py --method POST --path /discover --body '{"url": "https://example.com"}'
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import requests
+
+from stats_utils import percentile
+
+
+def run_load(base_url: str, paths: List[str], method: str = 'GET', body: Dict = None,
+             concurrency: int = 8, total_requests: int = 1000, timeout: float = 30) -> Dict:
+    """Issue total_requests round-robin over paths from concurrency threads."""
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+
+    def client():
+        session = requests.Session()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            path = paths[i % len(paths)]
+            started = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=timeout)
+                response.content  # Drain streamed responses
+                status = response.status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies[path].append(elapsed)
+                statuses[path][status] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - started
+
+    report = {'wall_time': wall_time, 'requests': total_requests,
+              'throughput': total_requests / wall_time if wall_time else 0.0, 'paths': {}}
+    for path, values in latencies.items():
+        values.sort()
+        report['paths'][path] = {
+            'count': len(values),
+            'p50_ms': percentile(values, 50) * 1000,
+            'p90_ms': percentile(values, 90) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+            'max_ms': values[-1] * 1000,
+            'statuses': dict(statuses[path])
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the RSS Architect HTTP API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="API server base URL")
+    parser.add_argument("--path", action="append", help="Endpoint path (repeatable, default /health)")
+    parser.add_argument("--method", default="GET", help="HTTP method")
+    parser.add_argument("--body", help="JSON request body")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=1000, help="Total requests")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = run_load(args.base_url.rstrip('/'), args.path or ['/health'], args.method.upper(),
+                      json.loads(args.body) if args.body else None,
+                      args.concurrency, args.requests, args.timeout)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"📊 {report['requests']} requests in {report['wall_time']:.2f}s "
+          f"({report['throughput']:.1f} req/s, concurrency {args.concurrency})")
+    for path, stats in report['paths'].items():
+        print(f"   {args.method.upper()} {path}: p50 {stats['p50_ms']:.1f}ms | p90 {stats['p90_ms']:.1f}ms | "
+              f"p99 {stats['p99_ms']:.1f}ms | max {stats['max_ms']:.1f}ms | statuses {stats['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Multi-session load test for the Streamlit app (app.py).
+
+Drives N simulated sessions concurrently with Streamlit's app testing
+utilities (streamlit.testing.v1.AppTest). All sessions run in one process, so
+they share st.cache_resource objects and background scan jobs the way
+sessions on one server do; their script reruns take turns (see _RERUN_LOCK).
+Each session runs these flows against a local stand-in site server:
+
+    open -> enter URL -> scan (polling until the scan job finishes)
+    -> save a feed -> view feeds -> delete the saved feed
+
+It reports rerun latency percentiles per step and the memory retained per
+session, e.g.:
+
+    python loadtest_app.py --sessions 10 --iterations 3
+    python loadtest_app.py --sessions 25 --site-latency 200 --json
+
+The app's database (feed_storage.db) is created in a temporary working
+directory, never the one in the repository.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from stats_utils import percentile
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(REPO_DIR, "app.py")
+
+# AppTest.run() swaps process-global Streamlit state (the runtime instance,
+# config options), so reruns of different sessions must not overlap. Like
+# CPU-bound reruns on one server process sharing the GIL, they take turns.
+_RERUN_LOCK = threading.Lock()
+SAVED_ID = re.compile(r"\(ID: (\d+)\)")
+
+
+class StandInSiteHandler(BaseHTTPRequestHandler):
+    """Serves /site<N>/ pages that link one RSS feed each; everything else is a 404."""
+
+    def do_GET(self):
+        self._respond(with_body=True)
+
+    def do_HEAD(self):
+        self._respond(with_body=False)
+
+    def _respond(self, with_body: bool):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        if not parts:
+            self._send(200, 'text/html', '<html><body>Stand-in sites</body></html>', with_body)
+        elif parts[0].startswith('site') and len(parts) == 1:
+            site = parts[0]
+            self._send(200, 'text/html', (
+                f'<html><head><title>{site}</title>'
+                f'<link rel="alternate" type="application/rss+xml" title="{site} feed" href="/{site}/feed.xml">'
+                f'</head><body><h1>{site}</h1>'
+                + ''.join(f'<p><a href="/{site}/post-{i}">A fairly long title for stand-in post number {i}</a></p>'
+                          for i in range(50))
+                + '</body></html>'), with_body)
+        elif parts[0].startswith('site') and parts[1:] == ['feed.xml']:
+            self._send(200, 'application/rss+xml', (
+                f'<?xml version="1.0"?><rss version="2.0"><channel><title>{parts[0]}</title>'
+                f'<item><title>Post</title><link>http://{self.headers["Host"]}/{parts[0]}/post-0</link></item>'
+                f'</channel></rss>'), with_body)
+        else:
+            self._send(404, 'text/plain', 'Not found', with_body)
+
+    def _send(self, status: int, content_type: str, body: str, with_body: bool):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def max_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process, where the platform reports it."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return max_rss / 1024 / 1024 if sys.platform == 'darwin' else max_rss / 1024
+
+
+def start_stand_in_sites(latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stand-in site server on a free 127.0.0.1 port (stop it with .shutdown())."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInSiteHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, name="stand-in-sites", daemon=True).start()
+    return server
+
+
+class SessionDriver:
+    """One simulated user session: an AppTest instance stepped through the app's flows."""
+
+    def __init__(self, session_id: int, base_url: str, timeout: float, think_time: float, record):
+        from streamlit.testing.v1 import AppTest
+
+        self.session_id = session_id
+        self.base_url = base_url
+        self.timeout = timeout
+        self.think_time = think_time
+        self.record = record
+        self.app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def _run(self, step: str):
+        """Rerun the script and record its latency under step (and, apart, the wait for _RERUN_LOCK)."""
+        if self.think_time:
+            time.sleep(self.think_time)
+        started = time.perf_counter()
+        with _RERUN_LOCK:
+            running = time.perf_counter()
+            self.app.run()
+        finished = time.perf_counter()
+        self.record(step, finished - running, running - started)
+        if self.app.exception:
+            raise RuntimeError(f"{step}: {self.app.exception[0].message}")
+
+    def _button(self, label: str):
+        for button in self.app.button:
+            if button.label == label:
+                return button
+        raise RuntimeError(f"No '{label}' button on the page")
+
+    def run_flows(self, iteration: int, scan_timeout: float = 60):
+        site_url = f"{self.base_url}/site{self.session_id}-{iteration}/"
+        if iteration == 0:
+            self._run('open')
+        self.app.button(key="nav_scan").click()
+        self._run('navigate')
+
+        self.app.text_input(key="scan_url").input(site_url)
+        self._run('enter_url')
+
+        self._button("🔍 Scan for Feeds").click()
+        self._run('scan')
+        deadline = time.time() + scan_timeout
+        # The job's live progress message ("⏳ Scanning... N feeds found so far")
+        while any("feeds found so far" in info.value for info in self.app.info):
+            if time.time() > deadline:
+                raise RuntimeError(f"Scan of {site_url} did not finish in {scan_timeout:.0f}s")
+            time.sleep(0.2)
+            self._run('poll')
+
+        self._button("💾 Save Feed 1").click()
+        self._run('save')
+        feed_id = self._saved_feed_id()
+        if feed_id is None:
+            raise RuntimeError(f"Saving the feed of {site_url} failed")
+
+        self.app.button(key="nav_view").click()
+        self._run('view')
+
+        self.app.button(key=f"delete_{feed_id}").click()
+        self._run('delete')
+
+    def _saved_feed_id(self) -> Optional[int]:
+        """The feed ID from the "Saved ... (ID: N)" message, if the save succeeded."""
+        for success in self.app.success:
+            match = SAVED_ID.search(success.value)
+            if match:
+                return int(match.group(1))
+        return None
+
+
+def run_app_load(sessions: int = 5, iterations: int = 1, think_time: float = 0.0, site_latency: float = 0.0,
+                 timeout: float = 30, measure_memory: bool = True) -> Dict:
+    """Run sessions concurrent sessions through the flows iterations times each."""
+    latencies = defaultdict(list)
+    # Time spent waiting for other sessions' reruns (harness overhead, not app latency)
+    queue_waits: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def record(step: str, seconds: float, queued: float):
+        with lock:
+            latencies[step].append(seconds)
+            queue_waits.append(queued)
+
+    # Imported before the memory baseline so module code isn't counted per session
+    from streamlit.testing.v1 import AppTest  # noqa: F401
+
+    server = start_stand_in_sites(site_latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    if measure_memory:
+        tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0] if measure_memory else 0
+
+    drivers = []
+    barrier = threading.Barrier(sessions)
+
+    def session(session_id: int):
+        try:
+            driver = SessionDriver(session_id, base_url, timeout, think_time, record)
+            with lock:
+                drivers.append(driver)
+            barrier.wait()
+            for iteration in range(iterations):
+                driver.run_flows(iteration)
+        except Exception as e:
+            with lock:
+                errors.append(f"session {session_id}: {e}")
+            barrier.abort()
+
+    started = time.time()
+    threads = [threading.Thread(target=session, args=(i + 1,), name=f"session-{i + 1}") for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.time() - started
+
+    memory = None
+    if measure_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # Retained while every session (and its AppTest state) is still alive
+        memory = {
+            'retained_per_session_mb': (current - baseline) / len(drivers) / 1024 / 1024 if drivers else 0.0,
+            'peak_mb': (peak - baseline) / 1024 / 1024,
+            'max_rss_mb': max_rss_mb()
+        }
+    server.shutdown()
+
+    steps = {}
+    for step, values in latencies.items():
+        values.sort()
+        steps[step] = {
+            'reruns': len(values),
+            'p50_ms': percentile(values, 50) * 1000,
+            'p90_ms': percentile(values, 90) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+            'max_ms': values[-1] * 1000,
+            'mean_ms': statistics.fmean(values) * 1000
+        }
+    all_values = sorted(value for values in latencies.values() for value in values)
+    queue_waits.sort()
+    return {
+        'sessions': sessions,
+        'iterations': iterations,
+        'reruns': len(all_values),
+        'wall_time': wall_time,
+        'reruns_per_second': len(all_values) / wall_time if wall_time else 0.0,
+        'queue_wait': {
+            'total_seconds': sum(queue_waits),
+            'p50_ms': percentile(queue_waits, 50) * 1000,
+            'p90_ms': percentile(queue_waits, 90) * 1000,
+            'p99_ms': percentile(queue_waits, 99) * 1000
+        },
+        'p50_ms': percentile(all_values, 50) * 1000,
+        'p90_ms': percentile(all_values, 90) * 1000,
+        'p99_ms': percentile(all_values, 99) * 1000,
+        'steps': steps,
+        'memory': memory,
+        'errors': errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the RSS Architect Streamlit app with simulated sessions")
+    parser.add_argument("--sessions", type=int, default=5, help="Concurrent sessions")
+    parser.add_argument("--iterations", type=int, default=1, help="Times each session runs the flows")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds a session waits before each action")
+    parser.add_argument("--site-latency", type=float, default=0.0, help="Milliseconds the stand-in sites wait per request")
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds one rerun may take")
+    parser.add_argument("--no-memory", action="store_true", help="Skip memory tracking (tracemalloc slows reruns)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_DIR)
+    workdir = tempfile.mkdtemp(prefix="rss-architect-loadtest-")
+    os.chdir(workdir)
+
+    report = run_app_load(args.sessions, args.iterations, args.think_time, args.site_latency / 1000,
+                          args.timeout, measure_memory=not args.no_memory)
+    report['workdir'] = workdir
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"📊 {report['sessions']} sessions x {report['iterations']} iterations: {report['reruns']} reruns "
+              f"in {report['wall_time']:.1f}s ({report['reruns_per_second']:.1f} reruns/s)")
+        print(f"   all reruns: p50 {report['p50_ms']:.0f}ms | p90 {report['p90_ms']:.0f}ms | p99 {report['p99_ms']:.0f}ms")
+        for step, stats in report['steps'].items():
+            print(f"   {step:<10} {stats['reruns']:>5} reruns: p50 {stats['p50_ms']:.0f}ms | "
+                  f"p90 {stats['p90_ms']:.0f}ms | p99 {stats['p99_ms']:.0f}ms | max {stats['max_ms']:.0f}ms")
+        wait = report['queue_wait']
+        print(f"   queue wait (harness, excluded above): {wait['total_seconds']:.1f}s total | "
+              f"p50 {wait['p50_ms']:.0f}ms | p90 {wait['p90_ms']:.0f}ms | p99 {wait['p99_ms']:.0f}ms")
+        if report['memory']:
+            print(f"🧠 Memory: {report['memory']['retained_per_session_mb']:.1f} MB retained per session, "
+                  f"{report['memory']['peak_mb']:.1f} MB traced peak"
+                  + (f", {report['memory']['max_rss_mb']:.0f} MB max RSS" if report['memory']['max_rss_mb'] else ""))
+        for error in report['errors']:
+            print(f"❌ {error}")
+
+    if report['errors']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
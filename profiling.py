@@ -0,0 +1,210 @@
+"""
+Opt-in profiling for scans and batch runs.
+
+    with Profiler('profiles', 'scan') as profiler:
+        RSSDiscovery(profiler=profiler).find_rss_feeds(url)
+
+writes, into the output directory:
+  <name>.prof         cProfile CPU profile (snakeviz, pstats, ...)
+  <name>.trace.json   wall-clock spans per phase and per request in Chrome
+                      trace format (Perfetto, chrome://tracing, speedscope)
+  <name>.summary.txt  span totals, peak traced memory and top allocators
+
+Code is instrumented with span(profiler, ...), which returns a shared no-op
+context manager when profiler is None, so nothing is hooked or recorded
+unless profiling was asked for. The CPU profile covers the thread that
+entered the Profiler and every thread started while it is active (pool
+workers, pipeline stages), merged into one .prof; spans and allocations are
+recorded on every thread.
+
+peak_memory() measures the peak allocations of one block, such as the page
+analysis of a scan, without a full Profiler.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+NULL_SPAN = nullcontext()
+
+# Before 3.12 cProfile only sees the thread that enabled it, so every thread
+# gets its own profile; from 3.12 one profile records all threads (and a
+# second one can't be enabled at the same time)
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+
+def span(profiler: Optional['Profiler'], name: str, category: str = 'phase', **args):
+    """Context manager timing one span; a no-op when profiler is None."""
+    if profiler is None:
+        return NULL_SPAN
+    return profiler.span(name, category, **args)
+
+
+_meter_lock = threading.Lock()
+# reset_peak keeps the highest peak meters have reset, for traced_peak()
+_meter_state = {'active': 0, 'owns_tracing': False, 'reset_peak': 0}
+
+
+@contextmanager
+def peak_memory():
+    """
+    Measure the peak traced memory of a block above its starting level:
+
+        with peak_memory() as memory:
+            ...
+        memory['peak_bytes']
+
+    tracemalloc runs while any meter is active (unless something else, such
+    as a Profiler, already started it). The first active meter resets the
+    peak whoever started tracing; read a tracer's overall peak with
+    traced_peak(). Peaks are process-wide, so meters in concurrent threads
+    see each other's allocations; in a process handling one block at a time
+    the figure is exact.
+    """
+    with _meter_lock:
+        if _meter_state['active'] == 0:
+            if tracemalloc.is_tracing():
+                _meter_state['reset_peak'] = max(_meter_state['reset_peak'], tracemalloc.get_traced_memory()[1])
+            else:
+                tracemalloc.start()
+                _meter_state['owns_tracing'] = True
+                _meter_state['reset_peak'] = 0
+            tracemalloc.reset_peak()
+        _meter_state['active'] += 1
+        baseline = tracemalloc.get_traced_memory()[0]
+    memory = {'peak_bytes': 0}
+    try:
+        yield memory
+    finally:
+        with _meter_lock:
+            if tracemalloc.is_tracing():
+                memory['peak_bytes'] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            _meter_state['active'] -= 1
+            if _meter_state['active'] == 0 and _meter_state['owns_tracing']:
+                tracemalloc.stop()
+                _meter_state['owns_tracing'] = False
+
+
+def traced_peak() -> int:
+    """Peak traced memory since tracing started, including peaks reset by peak_memory()."""
+    with _meter_lock:
+        return max(_meter_state['reset_peak'], tracemalloc.get_traced_memory()[1])
+
+
+class Profiler:
+    def __init__(self, output_dir: str = 'profiles', name: str = 'profile', cpu: bool = True,
+                 memory: bool = True, top_allocators: int = 25):
+        self.output_dir = output_dir
+        self.name = name
+        self.cpu = cpu
+        self.memory = memory
+        self.top_allocators = top_allocators
+        self.files: List[str] = []
+        self._spans: List[Dict] = []
+        self._profile: Optional[cProfile.Profile] = None
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._started = 0.0
+
+    @contextmanager
+    def span(self, name: str, category: str = 'phase', **args):
+        """Record the wall-clock duration of the block as a trace event."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, category, started, **args)
+
+    def record(self, name: str, category: str, started: float, **args):
+        """Record a span that started at perf_counter() value started and ends now."""
+        # list.append is atomic, so spans from probe threads need no lock
+        self._spans.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (started - self._started) * 1e6,
+            'dur': (time.perf_counter() - started) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args
+        })
+
+    def __enter__(self) -> 'Profiler':
+        self._started = time.perf_counter()
+        if self.memory and not tracemalloc.is_tracing():
+            with _meter_lock:
+                tracemalloc.start()
+                _meter_state['reset_peak'] = 0
+        if self.cpu:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            if PER_THREAD_PROFILES:
+                threading.setprofile(self._profile_thread)
+        return self
+
+    def _profile_thread(self, frame, event, arg):
+        """threading.setprofile hook: the first event of a new thread starts its own cProfile."""
+        profile = cProfile.Profile()
+        profile.enable()
+        self._thread_profiles.append(profile)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profile is not None:
+            self._profile.disable()
+            if PER_THREAD_PROFILES:
+                threading.setprofile(None)
+        snapshot = peak = None
+        if self.memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            peak = traced_peak()
+            tracemalloc.stop()
+        self._write(snapshot, peak)
+        return False
+
+    def _path(self, suffix: str) -> str:
+        path = os.path.join(self.output_dir, f"{self.name}{suffix}")
+        self.files.append(path)
+        return path
+
+    def _write(self, snapshot, peak: Optional[int]):
+        """Write the profile files and remember their paths in self.files."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        elapsed = time.perf_counter() - self._started
+
+        if self._profile is not None:
+            stats = pstats.Stats(self._profile)
+            for profile in self._thread_profiles:
+                # Snapshot of what that thread recorded up to now
+                stats.add(profile)
+            stats.dump_stats(self._path('.prof'))
+
+        with open(self._path('.trace.json'), 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self._spans, 'displayTimeUnit': 'ms'}, f)
+
+        totals: Dict[str, Dict] = {}
+        for event in self._spans:
+            total = totals.setdefault(f"{event['cat']}:{event['name']}", {'count': 0, 'total': 0.0, 'max': 0.0})
+            total['count'] += 1
+            total['total'] += event['dur'] / 1000
+            total['max'] = max(total['max'], event['dur'] / 1000)
+
+        lines = [f"Profile '{self.name}': {elapsed:.3f}s wall clock", "", "Spans (ms):"]
+        lines.append(f"  {'span':<40} {'count':>7} {'total':>10} {'avg':>10} {'max':>10}")
+        for key, total in sorted(totals.items(), key=lambda item: -item[1]['total']):
+            lines.append(f"  {key:<40} {total['count']:>7} {total['total']:>10.1f} "
+                         f"{total['total'] / total['count']:>10.1f} {total['max']:>10.1f}")
+        if snapshot is not None:
+            lines += ["", f"Peak traced memory: {peak / 1024 / 1024:.1f} MB", "",
+                      f"Top {self.top_allocators} allocators (live at the end):"]
+            for stat in snapshot.statistics('lineno')[:self.top_allocators]:
+                frame = stat.traceback[0]
+                lines.append(f"  {stat.size / 1024:>10.1f} KB {stat.count:>8} blocks  {frame.filename}:{frame.lineno}")
+
+        with open(self._path('.summary.txt'), 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
@@ -0,0 +1,220 @@
+"""
+River of news: one merged feed of the newest items across saved feeds.
+
+Every feed's stored items are already ordered by (published_at, id) in the
+idx_feed_items_newest index, so the river is a k-way merge: one lazy stream
+per feed (its newest item, then older pages read only when the merge reaches
+them) merged through a heap with heapq.merge. Building the top N items costs
+one query for the feed heads plus at most one page query per item taken;
+the full item set is never loaded or sorted.
+
+Built rivers and their rendered RSS/JSON outputs are cached per website
+group. New items (detected through the FeedItems ID sequence) are merged
+into the cached rivers incrementally; a FeedMaster write (data version
+change) rebuilds them, since it can rename or remove whole feeds.
+"""
+
+import heapq
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from db_manager import DatabaseManager
+from feed_cache import UNNAMED_WEBSITE
+
+JSON_FEED_VERSION = 'https://jsonfeed.org/version/1.1'
+
+
+def _sort_key(item: Dict):
+    return item['published_at'], item['id']
+
+
+def _group_of(item: Dict) -> str:
+    return item['website_nickname'] or UNNAMED_WEBSITE
+
+
+def _group_key(website: Optional[str]) -> Optional[str]:
+    """Cache key of a requested group: None for all feeds, '' maps to the unnamed group."""
+    if website is None:
+        return None
+    return website or UNNAMED_WEBSITE
+
+
+def _pubdate(item: Dict) -> datetime:
+    return datetime.fromtimestamp(item['published_at'], timezone.utc)
+
+
+class FeedRiver:
+    """
+    Cached river of the size newest items across all feeds (website=None)
+    or across one website group. Safe to share between threads.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, size: int = 100, page_size: int = 20,
+                 max_rivers: int = 256, refresh_interval: float = 1.0,
+                 title: str = "RSS Architect River", link: str = "http://localhost/"):
+        self.db_manager = db_manager
+        self.size = size
+        self.page_size = page_size
+        self.max_rivers = max_rivers
+        self.refresh_interval = refresh_interval
+        self.title = title
+        self.link = link
+        self._lock = threading.RLock()
+        # group name (None for all feeds) -> {'items': [...], 'rendered': {(format, limit): str}}
+        self._rivers: "OrderedDict[Optional[str], Dict]" = OrderedDict()
+        self._version = db_manager.data_version
+        self._last_item_id = db_manager.get_last_feed_item_id()
+        self._checked_at = time.time()
+        self._stats = {'hits': 0, 'builds': 0, 'evictions': 0, 'incremental_updates': 0,
+                       'renders': 0, 'render_hits': 0, 'build_seconds': 0.0}
+
+    def _iter_feed(self, head: Dict) -> Iterator[Dict]:
+        """One feed's items newest first: its head, then older pages as they're needed."""
+        yield head
+        last = head
+        while True:
+            page = self.db_manager.get_feed_items_before(head['feed_id'], last['published_at'], last['id'],
+                                                         self.page_size)
+            yield from page
+            if len(page) < self.page_size:
+                return
+            last = page[-1]
+
+    def _build(self, website: Optional[str]) -> List[Dict]:
+        """Merge the per-feed streams of a group into its size newest items."""
+        started = time.perf_counter()
+        if website is None:
+            heads = self.db_manager.get_newest_item_per_feed()
+        else:
+            nickname = None if website == UNNAMED_WEBSITE else website
+            heads = self.db_manager.get_newest_item_per_feed(nickname, all_feeds=False)
+        streams = [self._iter_feed(head) for head in heads]
+        items = list(islice(heapq.merge(*streams, key=_sort_key, reverse=True), self.size))
+        self._stats['builds'] += 1
+        self._stats['build_seconds'] += time.perf_counter() - started
+        return items
+
+    def _refresh(self):
+        """Pick up database changes, at most once per refresh_interval (caller holds the lock)."""
+        now = time.time()
+        if now - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = now
+
+        version = self.db_manager.data_version
+        if version != self._version:
+            self._rivers.clear()
+            self._version = version
+            self._last_item_id = self.db_manager.get_last_feed_item_id()
+            return
+
+        if self.db_manager.get_last_feed_item_id() == self._last_item_id:
+            return
+        new_items = self.db_manager.get_feed_items_since(self._last_item_id)
+        if not new_items:
+            return
+        self._last_item_id = new_items[-1]['id']
+        # Only the new batch is sorted; it is then merged into each cached river
+        new_items.sort(key=_sort_key, reverse=True)
+        for website, river in self._rivers.items():
+            known = {item['id'] for item in river['items']}
+            fresh = [item for item in new_items
+                     if item['id'] not in known and (website is None or _group_of(item) == website)]
+            if not fresh:
+                continue
+            merged = list(islice(heapq.merge(river['items'], fresh, key=_sort_key, reverse=True), self.size))
+            if [item['id'] for item in merged] != [item['id'] for item in river['items']]:
+                river['items'] = merged
+                river['rendered'].clear()
+                self._stats['incremental_updates'] += 1
+
+    def _river(self, website: Optional[str]) -> Dict:
+        """The cached river of a group, built on a miss (LRU eviction)."""
+        self._refresh()
+        river = self._rivers.get(website)
+        if river is not None:
+            self._rivers.move_to_end(website)
+            self._stats['hits'] += 1
+            return river
+
+        river = {'items': self._build(website), 'rendered': {}}
+        self._rivers[website] = river
+        while len(self._rivers) > self.max_rivers:
+            self._rivers.popitem(last=False)
+            self._stats['evictions'] += 1
+        return river
+
+    def get_items(self, website: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """The newest items across all feeds, or across one website group, newest first."""
+        with self._lock:
+            return list(self._river(_group_key(website))['items'][:limit or self.size])
+
+    def render(self, website: Optional[str] = None, output_format: str = 'rss', limit: Optional[int] = None) -> str:
+        """The river as an RSS 2.0 ('rss') or JSON Feed 1.1 ('json') document."""
+        if output_format not in ('rss', 'json'):
+            raise ValueError(f"Unknown river format: {output_format}")
+        website = _group_key(website)
+        with self._lock:
+            river = self._river(website)
+            key = (output_format, limit)
+            document = river['rendered'].get(key)
+            if document is not None:
+                self._stats['render_hits'] += 1
+                return document
+
+            title = self.title if website is None else f"{self.title}: {website}"
+            items = river['items'][:limit or self.size]
+            document = (self._render_rss if output_format == 'rss' else self._render_json)(title, items)
+            river['rendered'][key] = document
+            self._stats['renders'] += 1
+            return document
+
+    def _render_rss(self, title: str, items: List[Dict]) -> str:
+        import feedgenerator
+
+        feed = feedgenerator.Rss201rev2Feed(
+            title=title,
+            link=self.link,
+            description="Newest items across saved feeds"
+        )
+        for item in items:
+            feed.add_item(
+                title=item['title'] or item['link'] or '',
+                link=item['link'] or '',
+                description=item['summary'] or '',
+                pubdate=_pubdate(item),
+                unique_id=item['guid'],
+                unique_id_is_permalink=False,
+                categories=[item['feed_title']] if item['feed_title'] else None
+            )
+        return feed.writeString('utf-8')
+
+    def _render_json(self, title: str, items: List[Dict]) -> str:
+        return json.dumps({
+            'version': JSON_FEED_VERSION,
+            'title': title,
+            'home_page_url': self.link,
+            'items': [{
+                'id': f"{item['feed_id']}:{item['guid']}",
+                'url': item['link'],
+                'title': item['title'],
+                'summary': item['summary'],
+                'date_published': _pubdate(item).isoformat(),
+                '_source': {
+                    'feed_id': item['feed_id'],
+                    'feed_title': item['feed_title'],
+                    'feed_url': item['feed_url'],
+                    'website': _group_of(item)
+                }
+            } for item in items]
+        })
+
+    def stats(self) -> Dict:
+        """Cache counters and the number of cached rivers."""
+        with self._lock:
+            return {**self._stats, 'rivers': len(self._rivers), 'last_item_id': self._last_item_id}
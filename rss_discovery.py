@@ -1,12 +1,100 @@
 import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urlparse
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, Callable, Generator, Iterator, List, Dict, Optional, Tuple
 import re
+import time
+
+from dns_cache import dns_cache, is_name_resolution_error
+from link_candidates import CandidateSet
+from profiling import peak_memory, span
+from sitemap_discovery import SitemapDiscovery
+from url_utils import canonicalize_url, canonical_key
+
+if TYPE_CHECKING:
+    # bs4 is imported on the first page parse, not when the module loads
+    from bs4 import BeautifulSoup
+
+# The last character that can't be part of a URL in page text, and what follows it
+TEXT_RUN_BOUNDARY = re.compile(r'[\s<>"][^\s<>"]*\Z')
+MAX_TEXT_RUN_CHARS = 64 * 1024
+
 
 class RSSDiscovery:
-    def __init__(self, verbose_logging: bool = True):
+    # Common RSS URL patterns to try
+    COMMON_RSS_PATTERNS = [
+        '/feed/',
+        '/rss/',
+        '/blog/feed/',
+        '/blog/rss/',
+        '/rss.xml',
+        '/feed.xml',
+        '/atom.xml',
+        '/blog/rss.xml',
+        '/blog/feed.xml',
+        '/blog/atom.xml',
+        '/feeds/',
+        '/feeds/all.xml',
+        '/feeds/posts/default',
+        '/index.xml',
+        '/news/rss/',
+        '/news/feed/',
+        '/?feed=rss2',
+        '/?feed=atom',
+        '/wp/feed/',
+        '/wordpress/feed/',
+        '/feed',
+        '/rss',
+        '/atom'
+    ]
+
+    # Page fetch attempts, shared with AsyncRSSDiscovery (headers None means
+    # the instance's full browser headers)
+    PAGE_RETRY_CONFIGS = [
+        # First attempt: Full headers
+        {'headers': None, 'timeout': 10},
+        # Second attempt: Minimal headers with different User-Agent
+        {'headers': {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.1 Safari/605.1.15'
+        }, 'timeout': 15},
+        # Third attempt: Simple request
+        {'headers': {
+            'User-Agent': 'RSS Reader Bot 1.0'
+        }, 'timeout': 20}
+    ]
+    
+    def __init__(self, verbose_logging: bool = True, probe_workers: int = 8, use_sitemaps: bool = True,
+                 sitemap_max_bytes: int = 5 * 1024 * 1024, sitemap_max_entries: int = 50000, profiler=None,
+                 snapshot_store=None, replay: bool = False, use_dns_cache: bool = True,
+                 max_link_candidates: int = 5000, max_text_chars: int = 2_000_000, max_title_chars: int = 200,
+                 measure_memory: bool = False):
         self.verbose_logging = verbose_logging
+        # Bounds on the page analysis of huge (directory) pages: feed candidates
+        # kept from content, page text characters scanned, characters per title
+        self.max_link_candidates = max_link_candidates
+        self.max_text_chars = max_text_chars
+        self.max_title_chars = max_title_chars
+        # Report the peak memory of each page analysis (tracemalloc; slows parsing)
+        self.measure_memory = measure_memory
+        if use_dns_cache:
+            # Process-wide: also serves the resolver, health checks and other instances
+            dns_cache.install()
+        # With a snapshot_store.SnapshotStore every response is recorded into it,
+        # or with replay=True answered from it without touching the network
+        self.replay = replay
+        self.http = snapshot_store.session(replay=replay) if snapshot_store is not None else requests
+        # Optional profiling.Profiler; records phase and request spans when set
+        self.profiler = profiler
+        # Pattern probes run concurrently on this many threads
+        self.probe_workers = probe_workers
+        # Sitemaps are read only when the page is blocked or methods 1-3 find nothing
+        self.sitemaps = SitemapDiscovery(
+            is_feed_url=self.is_rss_url,
+            max_bytes=sitemap_max_bytes,
+            max_entries=sitemap_max_entries,
+            profiler=profiler,
+            http=self.http
+        ) if use_sitemaps else None
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
@@ -27,38 +115,43 @@ class RSSDiscovery:
             'sign up to read', 'login to view', 'members only', 'paid subscription'
         ]
     
-    def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
+    def fetch_page(self, url: str) -> Optional['BeautifulSoup']:
         """Fetch and parse a web page with retry logic."""
-        import time
-        
+        body = self.fetch_page_bytes(url)
+        if body is None:
+            return None
+        with span(self.profiler, 'parse_html', url=url):
+            return self.parse_page(body)
+    
+    def parse_page(self, body: bytes) -> 'BeautifulSoup':
+        """Parse page bytes (CPU-bound; no network access)."""
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(body, 'html.parser')
+    
+    def _page_retry_configs(self) -> List[Dict]:
+        """PAGE_RETRY_CONFIGS as get() arguments."""
+        return [{**config, 'headers': config['headers'] or self.headers} for config in self.PAGE_RETRY_CONFIGS]
+
+    def fetch_page_bytes(self, url: str) -> Optional[bytes]:
+        """Download a web page with retry logic, without parsing it."""
         # Try different approaches if the first one fails
-        retry_configs = [
-            # First attempt: Full headers
-            {'headers': self.headers, 'timeout': 10},
-            # Second attempt: Minimal headers with different User-Agent
-            {'headers': {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.1 Safari/605.1.15'
-            }, 'timeout': 15},
-            # Third attempt: Simple request
-            {'headers': {
-                'User-Agent': 'RSS Reader Bot 1.0'
-            }, 'timeout': 20}
-        ]
+        retry_configs = self._page_retry_configs()
         
         for attempt, config in enumerate(retry_configs, 1):
             try:
-                response = requests.get(url, **config)
+                with span(self.profiler, 'GET page', 'request', url=url, attempt=attempt):
+                    response = self.http.get(url, **config)
                 
                 # Check for various HTTP status codes
                 if response.status_code == 200:
-                    return BeautifulSoup(response.content, 'html.parser')
+                    return response.content
                 elif response.status_code == 403:
                     if attempt < len(retry_configs):
-                        time.sleep(2)  # Wait before retry
+                        self._backoff(2)  # Wait before retry
                         continue
                 elif response.status_code == 429:
                     if attempt < len(retry_configs):
-                        time.sleep(5)  # Wait longer for rate limits
+                        self._backoff(5)  # Wait longer for rate limits
                         continue
                 else:
                     response.raise_for_status()
@@ -66,9 +159,12 @@ class RSSDiscovery:
             except requests.exceptions.Timeout:
                 if attempt < len(retry_configs):
                     continue
-            except requests.exceptions.ConnectionError:
+            except requests.exceptions.ConnectionError as e:
+                if is_name_resolution_error(e):
+                    # Retrying with other headers can't make the host resolve
+                    break
                 if attempt < len(retry_configs):
-                    time.sleep(1)
+                    self._backoff(1)
                     continue
             except requests.RequestException as e:
                 if attempt < len(retry_configs):
@@ -76,152 +172,357 @@ class RSSDiscovery:
         
         return None
     
-    def check_paywall(self, soup: BeautifulSoup) -> bool:
+    def _backoff(self, seconds: float):
+        """Wait before a retry (replayed responses never change, so skip the wait)."""
+        if not self.replay:
+            time.sleep(seconds)
+    
+    def analyze_page(self, body: Optional[bytes], url: str) -> Dict:
+        """
+        The CPU-bound part of a scan: parse the page, check for a paywall and
+        run methods 1 and 2. Needs no network access and returns only plain
+        data, so it can run in another process (see discovery_pipeline.py):
+        {'fetched', 'is_paywall', 'html_links', 'content_links', 'costs'}.
+        With measure_memory, costs['parse_html'] also has the analysis' peak_bytes.
+        """
+        page = {'fetched': body is not None, 'is_paywall': False, 'html_links': [], 'content_links': [], 'costs': {}}
+        if body is None:
+            return page
+        if not self.measure_memory:
+            self._analyze_page(page, body, url)
+            return page
+        
+        with peak_memory() as memory:
+            self._analyze_page(page, body, url)
+        page['costs']['parse_html']['peak_bytes'] = memory['peak_bytes']
+        return page
+    
+    def _analyze_page(self, page: Dict, body: bytes, url: str):
+        started = time.perf_counter()
+        soup = self.parse_page(body)
+        page['costs']['parse_html'] = self._phase_cost('parse_html', started)
+        
+        if self.check_paywall(soup):
+            page['is_paywall'] = True
+            return
+        
+        # Method 1: Find <link> tags with RSS/Atom feeds (traditional method)
+        started = time.perf_counter()
+        page['html_links'] = self.find_rss_link_tags(soup, url)
+        page['costs']['html_links'] = self._phase_cost('html_links', started)
+        
+        # Method 2: Find RSS feed URLs in page content (for RSS directory pages)
+        started = time.perf_counter()
+        candidates = self.new_candidate_set()
+        page['content_links'] = self.find_rss_links_in_content(soup, url, candidates)
+        page['costs']['content_scan'] = {**self._phase_cost('content_scan', started), **candidates.stats()}
+    
+    def analysis_settings(self) -> Dict:
+        """Constructor arguments that shape analyze_page (for parse workers in other processes)."""
+        return {
+            'max_link_candidates': self.max_link_candidates,
+            'max_text_chars': self.max_text_chars,
+            'max_title_chars': self.max_title_chars,
+            'measure_memory': self.measure_memory
+        }
+    
+    def new_candidate_set(self) -> CandidateSet:
+        return CandidateSet(self.max_link_candidates, self.max_title_chars)
+    
+    def iter_page_text(self, soup: 'BeautifulSoup') -> Iterator[str]:
+        """The page's text strings in order (as joined by get_text()), up to max_text_chars in total."""
+        remaining = self.max_text_chars
+        for text in soup.strings:
+            if remaining <= 0:
+                return
+            if len(text) > remaining:
+                text = text[:remaining]
+            remaining -= len(text)
+            yield text
+    
+    def iter_page_text_runs(self, soup: 'BeautifulSoup') -> Iterator[str]:
+        """
+        iter_page_text regrouped into chunks that end at a whitespace, '<', '>'
+        or '"' character, so a URL split across inline tags
+        ('https://ex.com/<b>news</b>/feed.xml') is never split between chunks.
+        """
+        pending = ''
+        for text in self.iter_page_text(soup):
+            pending += text
+            boundary = TEXT_RUN_BOUNDARY.search(pending)
+            if boundary is not None:
+                yield pending[:boundary.start() + 1]
+                pending = pending[boundary.start() + 1:]
+            elif len(pending) > MAX_TEXT_RUN_CHARS:
+                # No URL is this long; don't let one endless run grow the buffer
+                yield pending
+                pending = ''
+        if pending:
+            yield pending
+    
+    def check_paywall(self, soup: 'BeautifulSoup') -> bool:
         """Check if the page appears to be behind a paywall."""
-        page_text = soup.get_text().lower()
-        return any(keyword in page_text for keyword in self.paywall_keywords)
+        # Scan string by string, carrying a tail so keywords split across strings still match
+        overlap = max(len(keyword) for keyword in self.paywall_keywords) - 1
+        tail = ''
+        for text in self.iter_page_text(soup):
+            window = tail + text.lower()
+            if any(keyword in window for keyword in self.paywall_keywords):
+                return True
+            tail = window[-overlap:]
+        return False
     
-    def find_rss_feeds(self, url: str) -> Dict:
+    def find_rss_feeds(self, url: str, on_feeds: Optional[Callable[[str, List[Dict]], None]] = None) -> Dict:
         """
         Find RSS feeds for a given URL using multiple methods.
-        Returns a dict with 'feeds', 'is_paywall', and 'error' keys.
+        Returns a dict with 'feeds', 'is_paywall', 'error', 'method_counts',
+        'method_costs' and 'article_candidates' keys.
+        
+        If on_feeds is given it is called as on_feeds(method, feeds) for each
+        deduplicated feed as soon as it is found, so callers can show partial results.
         """
-        soup = self.fetch_page(url)
-        if not soup:
-            # If we can't fetch the main page, try pattern discovery anyway
-            pattern_rss_links = self.try_common_rss_patterns(url)
-            
-            if pattern_rss_links:
-                return {'feeds': pattern_rss_links, 'is_paywall': False, 'error': None}
+        result = None
+        with span(self.profiler, 'find_rss_feeds', 'scan', url=url):
+            for event in self.find_rss_feeds_iter(url):
+                if event['event'] == 'feed' and on_feeds is not None:
+                    on_feeds(event['method'], [event['feed']])
+                elif event['event'] == 'done':
+                    result = event['result']
+        
+        self.log_summary(result)
+        return result
+    
+    def log_summary(self, result: Dict):
+        """Print the per-method summary of a find_rss_feeds result (when verbose_logging)."""
+        method_counts = result['method_counts']
+        total_found = len(result['feeds'])
+        if self.verbose_logging and not result['error'] and not result['is_paywall']:
+            if total_found > 0:
+                print(f"✅ RSS Discovery Summary: Found {total_found} unique feeds")
+                print(f"   Method 1 (HTML links): {method_counts['html_links']} feeds")
+                print(f"   Method 2 (Content scan): {method_counts['content_scan']} feeds") 
+                print(f"   Method 3 (Pattern test): {method_counts['pattern_test']} feeds")
+                if 'sitemap' in result['method_costs']:
+                    print(f"   Method 4 (Sitemaps): {method_counts['sitemap']} feeds")
             else:
-                return {'feeds': [], 'is_paywall': False, 'error': 'Failed to fetch page and no RSS patterns found'}
+                print("ℹ️  No RSS feeds found using any discovery method")
+    
+    def find_rss_feeds_iter(self, url: str, page: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Streaming variant of find_rss_feeds that yields events as discovery runs.
+        
+        Events are dicts with an 'event' key:
+          - {'event': 'progress', 'method': m, 'status': 'started'|'finished', 'count': n}
+          - {'event': 'feed', 'method': m, 'feed': {...}} for each new (deduplicated) feed
+          - {'event': 'done', 'result': {...}} last, with the find_rss_feeds result
+        Methods are 'fetch', 'html_links', 'content_scan', 'pattern_test' and
+        'sitemap' (only run when the page can't be fetched or nothing else found
+        a feed; its finished event also carries bytes, entries and sitemaps read).
+        The result's method_costs maps each method that ran to its cost
+        ({'seconds': ...}, plus the sitemap budget counters), and
+        article_candidates lists recent sitemap article URLs for synthetic feeds.
+        Closing the generator early (break or .close()) cancels outstanding pattern probes.
+        Feed URLs are canonicalized, and equivalent forms (http/https, 'www.',
+        trailing slash, tracking parameters) count as the same feed.
+        page is an analyze_page() result (with the fetch cost in its costs) when
+        the page was already fetched and parsed elsewhere; otherwise it's done here.
+        """
+        seen_urls = set()
+        costs: Dict[str, Dict] = {}
+        
+        def new_feeds(method: str, links: List[Dict]) -> Iterator[Dict]:
+            for link in links:
+                link['url'] = canonicalize_url(link['url'])
+                key = canonical_key(link['url'])
+                if key not in seen_urls:
+                    seen_urls.add(key)
+                    yield {'event': 'feed', 'method': method, 'feed': link}
+        
+        yield {'event': 'progress', 'method': 'fetch', 'status': 'started'}
+        if page is None:
+            started = time.perf_counter()
+            body = self.fetch_page_bytes(url)
+            costs['fetch'] = self._phase_cost('fetch', started)
+            page = self.analyze_page(body, url)
+        costs.update(page['costs'])
+        yield {'event': 'progress', 'method': 'fetch', 'status': 'finished', 'count': 1 if page['fetched'] else 0}
+        
+        if not page['fetched']:
+            # If we can't fetch the main page, try pattern and sitemap discovery anyway
+            pattern_rss_links = yield from self._iter_pattern_method(url, new_feeds, costs)
+            sitemap = yield from self._iter_sitemap_method(url, new_feeds, costs)
+            feeds = self._dedupe_links(pattern_rss_links + sitemap['feeds'])
+            
+            result = {
+                'feeds': feeds,
+                'is_paywall': False,
+                'error': None if feeds else 'Failed to fetch page and no RSS patterns found',
+                'method_counts': self._method_counts(0, 0, len(pattern_rss_links), len(sitemap['feeds'])),
+                'method_costs': costs,
+                'article_candidates': sitemap['articles']
+            }
+            yield {'event': 'done', 'result': result}
+            return
         
         # Check for paywall
-        if self.check_paywall(soup):
-            return {'feeds': [], 'is_paywall': True, 'error': None}
+        if page['is_paywall']:
+            yield {'event': 'done', 'result': {'feeds': [], 'is_paywall': True, 'error': None, 'method_counts': self._method_counts(0, 0, 0),
+                                               'method_costs': costs, 'article_candidates': []}}
+            return
         
         # Look for RSS feed links using multiple methods
         rss_links = []
         
-        # Method 1: Find <link> tags with RSS/Atom feeds (traditional method)
-        link_tags = soup.find_all('link', {
-            'rel': 'alternate',
-            'type': ['application/rss+xml', 'application/atom+xml']
-        })
+        # Method 1: <link> tags with RSS/Atom feeds (found by analyze_page)
+        yield {'event': 'progress', 'method': 'html_links', 'status': 'started'}
+        method1_count = len(page['html_links'])
+        rss_links.extend(page['html_links'])
+        yield from new_feeds('html_links', page['html_links'])
+        yield {'event': 'progress', 'method': 'html_links', 'status': 'finished', 'count': method1_count}
         
-        method1_count = 0
-        for link in link_tags:
-            href = link.get('href')
-            if href:
-                full_url = urljoin(url, href)
-                title = link.get('title', 'RSS Feed')
-                rss_links.append({
-                    'url': full_url,
-                    'title': title,
-                    'type': 'discovered'
-                })
-                method1_count += 1
-        
-        # Method 2: Find RSS feed URLs in page content (for RSS directory pages)
-        content_rss_links = self.find_rss_links_in_content(soup, url)
-        method2_count = len(content_rss_links)
-        rss_links.extend(content_rss_links)
+        # Method 2: RSS feed URLs in page content (found by analyze_page)
+        yield {'event': 'progress', 'method': 'content_scan', 'status': 'started'}
+        method2_count = len(page['content_links'])
+        rss_links.extend(page['content_links'])
+        yield from new_feeds('content_scan', page['content_links'])
+        yield {'event': 'progress', 'method': 'content_scan', 'status': 'finished', 'count': method2_count}
         
         # Method 3: Try common RSS URL patterns
-        pattern_rss_links = self.try_common_rss_patterns(url)
+        pattern_rss_links = yield from self._iter_pattern_method(url, new_feeds, costs)
         method3_count = len(pattern_rss_links)
         rss_links.extend(pattern_rss_links)
         
-        # Remove duplicates based on URL
-        seen_urls = set()
-        unique_rss_links = []
-        for link in rss_links:
-            if link['url'] not in seen_urls:
-                seen_urls.add(link['url'])
-                unique_rss_links.append(link)
-        
-        # Summary logging
-        total_found = len(unique_rss_links)
-        if self.verbose_logging:
-            if total_found > 0:
-                print(f"✅ RSS Discovery Summary: Found {total_found} unique feeds")
-                print(f"   Method 1 (HTML links): {method1_count} feeds")
-                print(f"   Method 2 (Content scan): {method2_count} feeds") 
-                print(f"   Method 3 (Pattern test): {method3_count} feeds")
-            else:
-                print("ℹ️  No RSS feeds found using any discovery method")
+        # Method 4: Read the site's sitemaps when nothing else found a feed
+        sitemap = {'feeds': [], 'articles': []}
+        if not rss_links:
+            sitemap = yield from self._iter_sitemap_method(url, new_feeds, costs)
+            rss_links.extend(sitemap['feeds'])
         
-        return {'feeds': unique_rss_links, 'is_paywall': False, 'error': None}
+        yield {'event': 'done', 'result': {
+            'feeds': self._dedupe_links(rss_links),
+            'is_paywall': False,
+            'error': None,
+            'method_counts': self._method_counts(method1_count, method2_count, method3_count, len(sitemap['feeds'])),
+            'method_costs': costs,
+            'article_candidates': sitemap['articles']
+        }}
     
-    def try_common_rss_patterns(self, base_url: str) -> List[Dict]:
-        """Try common RSS URL patterns to find feeds."""
-        rss_links = []
-        
+    def _iter_pattern_method(self, url: str, new_feeds, costs: Dict[str, Dict]) -> Generator[Dict, None, List[Dict]]:
+        """Run method 3 as events; returns the pattern feeds in pattern order."""
+        yield {'event': 'progress', 'method': 'pattern_test', 'status': 'started'}
+        started = time.perf_counter()
+        found = []
+        for index, link in self.iter_common_rss_patterns(url):
+            found.append((index, link))
+            yield from new_feeds('pattern_test', [link])
+        found.sort(key=lambda item: item[0])
+        costs['pattern_test'] = self._phase_cost('pattern_test', started)
+        yield {'event': 'progress', 'method': 'pattern_test', 'status': 'finished', 'count': len(found)}
+        return [link for _, link in found]
+    
+    def _iter_sitemap_method(self, url: str, new_feeds, costs: Dict[str, Dict]) -> Generator[Dict, None, Dict]:
+        """Run method 4 as events; returns the sitemap feeds and article candidates."""
+        if self.sitemaps is None:
+            return {'feeds': [], 'articles': []}
+        yield {'event': 'progress', 'method': 'sitemap', 'status': 'started'}
+        started = time.perf_counter()
+        sitemap = self.sitemaps.discover(url)
+        self._phase_cost('sitemap', started)
+        for link in sitemap['feeds']:
+            link['title'] = link['title'] or self.extract_title_from_url(link['url'])
+        stats = sitemap['stats']
+        costs['sitemap'] = stats
+        yield from new_feeds('sitemap', sitemap['feeds'])
+        yield {'event': 'progress', 'method': 'sitemap', 'status': 'finished', 'count': len(sitemap['feeds']),
+               'bytes': stats['bytes'], 'entries': stats['entries'], 'sitemaps': stats['sitemaps']}
+        return sitemap
+    
+    def _phase_cost(self, method: str, started: float) -> Dict:
+        """Cost entry for a phase that began at perf_counter() value started (also a profiler span)."""
+        if self.profiler is not None:
+            self.profiler.record(method, 'phase', started)
+        return {'seconds': time.perf_counter() - started}
+    
+    def _dedupe_links(self, links: List[Dict]) -> List[Dict]:
+        """Remove duplicates based on canonical URL (keeps method order, patterns in list order)."""
+        seen_urls = set()
+        unique_links = []
+        for link in links:
+            key = canonical_key(link['url'])
+            if key not in seen_urls:
+                seen_urls.add(key)
+                unique_links.append(link)
+        return unique_links
+    
+    def _method_counts(self, html_links: int, content_scan: int, pattern_test: int, sitemap: int = 0) -> Dict[str, int]:
+        """Per-method feed counts reported alongside find_rss_feeds results."""
+        return {'html_links': html_links, 'content_scan': content_scan, 'pattern_test': pattern_test, 'sitemap': sitemap}
+    
+    def try_common_rss_patterns(self, base_url: str, on_feed: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Try common RSS URL patterns to find feeds (on_feed is called for each hit)."""
+        found = []
+        for index, link in self.iter_common_rss_patterns(base_url):
+            found.append((index, link))
+            if on_feed is not None:
+                on_feed(link)
+        found.sort(key=lambda item: item[0])
+        return [link for _, link in found]
+    
+    def iter_common_rss_patterns(self, base_url: str) -> Iterator[Tuple[int, Dict]]:
+        """
+        Probe common RSS URL patterns concurrently, yielding (pattern_index, feed)
+        as each probe succeeds. Closing the iterator cancels probes not yet started.
+        """
         # Parse the base URL
         parsed_url = urlparse(base_url)
         base_domain = f"{parsed_url.scheme}://{parsed_url.netloc}"
         
-        # Common RSS URL patterns to try
-        common_patterns = [
-            '/feed/',
-            '/rss/',
-            '/blog/feed/',
-            '/blog/rss/',
-            '/rss.xml',
-            '/feed.xml',
-            '/atom.xml',
-            '/blog/rss.xml',
-            '/blog/feed.xml',
-            '/blog/atom.xml',
-            '/feeds/',
-            '/feeds/all.xml',
-            '/feeds/posts/default',
-            '/index.xml',
-            '/news/rss/',
-            '/news/feed/',
-            '/?feed=rss2',
-            '/?feed=atom',
-            '/wp/feed/',
-            '/wordpress/feed/',
-            '/feed',
-            '/rss',
-            '/atom'
-        ]
-        
-        # Only show detailed pattern testing if no feeds found by other methods
-        # This reduces console noise when traditional methods work
+        executor = ThreadPoolExecutor(max_workers=self.probe_workers)
+        try:
+            futures = {
+                executor.submit(self._probe_pattern, base_domain, pattern, parsed_url.netloc): index
+                for index, pattern in enumerate(self.COMMON_RSS_PATTERNS)
+            }
+            for future in as_completed(futures):
+                link = future.result()
+                if link:
+                    yield futures[future], link
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _probe_pattern(self, base_domain: str, pattern: str, netloc: str) -> Optional[Dict]:
+        """Test one pattern URL with a HEAD request; returns a feed dict on success."""
+        test_url = base_domain + pattern
         
-        for pattern in common_patterns:
-            test_url = base_domain + pattern
+        try:
+            # Use lighter headers for pattern testing
+            light_headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            }
             
-            try:
-                # Use lighter headers for pattern testing
-                light_headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                }
-                
-                # Test if the URL returns a valid RSS feed
-                response = requests.head(test_url, headers=light_headers, timeout=8, allow_redirects=True)
+            # Test if the URL returns a valid RSS feed
+            with span(self.profiler, 'HEAD pattern', 'request', url=test_url):
+                response = self.http.head(test_url, headers=light_headers, timeout=8, allow_redirects=True)
+            
+            if response.status_code == 200:
+                # Check content type
+                content_type = response.headers.get('content-type', '').lower()
                 
-                if response.status_code == 200:
-                    # Check content type
-                    content_type = response.headers.get('content-type', '').lower()
-                    
-                    if any(rss_type in content_type for rss_type in ['xml', 'rss', 'atom']):
-                        # Generate a descriptive title
-                        title = self.generate_pattern_title(pattern, parsed_url.netloc)
-                        
-                        rss_links.append({
-                            'url': test_url,
-                            'title': title,
-                            'type': 'pattern-discovered'
-                        })
+                if any(rss_type in content_type for rss_type in ['xml', 'rss', 'atom']):
+                    # Generate a descriptive title
+                    title = self.generate_pattern_title(pattern, netloc)
                     
-            except requests.RequestException:
-                # Silently continue to next pattern
-                continue
+                    return {
+                        'url': test_url,
+                        'title': title,
+                        'type': 'pattern-discovered'
+                    }
+                
+        except requests.RequestException:
+            # Silently skip this pattern
+            pass
         
-        return rss_links
+        return None
     
     def generate_pattern_title(self, pattern: str, domain: str) -> str:
         """Generate a descriptive title for pattern-discovered feeds."""
@@ -257,42 +558,55 @@ class RSSDiscovery:
         pattern_name = pattern_names.get(pattern, 'RSS Feed')
         return f"{domain_clean} - {pattern_name}"
     
-    def find_rss_links_in_content(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
-        """Find RSS feed URLs in page content (for RSS directory pages)."""
+    def find_rss_link_tags(self, soup: 'BeautifulSoup', base_url: str) -> List[Dict]:
+        """Find <link rel="alternate"> tags that point to RSS/Atom feeds."""
         rss_links = []
+        link_tags = soup.find_all('link', {
+            'rel': 'alternate',
+            'type': ['application/rss+xml', 'application/atom+xml']
+        })
+        for link in link_tags:
+            href = link.get('href')
+            if href:
+                rss_links.append({
+                    'url': urljoin(base_url, href),
+                    'title': link.get('title', 'RSS Feed'),
+                    'type': 'discovered'
+                })
+        return rss_links
+    
+    def find_rss_links_in_content(self, soup: 'BeautifulSoup', base_url: str,
+                                  candidates: Optional[CandidateSet] = None) -> List[Dict]:
+        """
+        Find RSS feed URLs in page content (for RSS directory pages).
+        Candidates are deduplicated as they are found and capped at max_link_candidates.
+        """
+        candidates = candidates if candidates is not None else self.new_candidate_set()
         
         # Look for <a> tags that point to RSS feeds
         for link in soup.find_all('a', href=True):
             href = link.get('href')
-            text = link.get_text(strip=True)
-            
             if href and self.is_rss_url(href):
-                full_url = urljoin(base_url, href)
-                
                 # Use link text as title, or extract from URL if text is not descriptive
-                title = text if text and len(text) > 3 else self.extract_title_from_url(href)
+                # (only worked out for links not seen before)
+                def title(link=link, href=href):
+                    text = link.get_text(strip=True)
+                    return text if text and len(text) > 3 else self.extract_title_from_url(href)
                 
-                rss_links.append({
-                    'url': full_url,
-                    'title': title,
-                    'type': 'discovered'
-                })
+                candidates.add(urljoin(base_url, href), title)
+                if candidates.truncated:
+                    return candidates.to_dicts()
         
         # Also look for URLs in text content that might be RSS feeds
-        page_text = soup.get_text()
-        url_pattern = r'https?://[^\s<>"]+\.(?:xml|rss|atom)(?:\?[^\s<>"]*)?'
-        text_urls = re.findall(url_pattern, page_text)
-        
-        for text_url in text_urls:
-            if self.is_rss_url(text_url):
-                title = self.extract_title_from_url(text_url)
-                rss_links.append({
-                    'url': text_url,
-                    'title': title,
-                    'type': 'discovered'
-                })
+        url_pattern = re.compile(r'https?://[^\s<>"]+\.(?:xml|rss|atom)(?:\?[^\s<>"]*)?')
+        for text in self.iter_page_text_runs(soup):
+            for text_url in url_pattern.findall(text):
+                if self.is_rss_url(text_url):
+                    candidates.add(text_url, lambda: self.extract_title_from_url(text_url))
+                    if candidates.truncated:
+                        return candidates.to_dicts()
         
-        return rss_links
+        return candidates.to_dicts()
     
     def is_rss_url(self, url: str) -> bool:
         """Check if a URL is likely an RSS feed."""
@@ -326,32 +640,24 @@ class RSSDiscovery:
             domain = parsed.netloc.replace('www.', '')
             return f"{domain} RSS Feed"
     
-    def extract_article_links(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
+    def extract_article_links(self, soup: 'BeautifulSoup', base_url: str, max_links: int = 20) -> List[Dict]:
         """Extract potential article links from the page."""
-        article_links = []
+        # Deduplicated as they are found; stops at max_links
+        candidates = CandidateSet(max_links, self.max_title_chars)
         
         # Look for <a> tags that likely contain article titles
         for link in soup.find_all('a', href=True):
-            text = link.get_text(strip=True)
             href = link.get('href')
             
+            # Skip obvious non-article links
+            if not href or any(skip in href.lower() for skip in ['javascript:', 'mailto:', '#', 'login', 'register', 'subscribe']):
+                continue
+            
             # Filter links with meaningful text (more than 5 words)
-            if text and len(text.split()) > 5 and href:
-                full_url = urljoin(base_url, href)
-                
-                # Skip obvious non-article links
-                if not any(skip in href.lower() for skip in ['javascript:', 'mailto:', '#', 'login', 'register', 'subscribe']):
-                    article_links.append({
-                        'title': text[:200],  # Limit title length
-                        'url': full_url
-                    })
-        
-        # Remove duplicates and limit to reasonable number
-        seen_urls = set()
-        unique_links = []
-        for link in article_links:
-            if link['url'] not in seen_urls and len(unique_links) < 20:
-                seen_urls.add(link['url'])
-                unique_links.append(link)
+            text = link.get_text(strip=True)
+            if text and len(text.split()) > 5:
+                candidates.add(urljoin(base_url, href), text)
+                if candidates.full:
+                    break
         
-        return unique_links
\ No newline at end of file
+        return [{'title': candidate.title, 'url': candidate.url} for candidate in candidates]
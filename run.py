@@ -1,33 +1,48 @@
 #!/usr/bin/env python3
 """
 RSS Architect Launcher
+
+Usage:
+    python run.py                      Start the Streamlit app
+    python run.py scan URL             Scan one site from the command line
+    python run.py prewarm SITES.txt    Pre-warm the discovery cache for a site list
+    python run.py replay SITES.txt     Re-run discovery offline from recorded snapshots
+    python run.py serve-api            Start the headless JSON HTTP API
+    python run.py enqueue SITES.txt    Queue discovery jobs for a site list
+    python run.py worker -n 4          Run discovery worker processes
+    python run.py queue-stats          Show job queue depth, claim latency and throughput
+    python run.py check-health         Check saved feeds that are due (--loop to keep running)
+
+scan, prewarm and check-health accept --profile DIR to write a CPU profile,
+wall-clock spans and memory statistics for the run (see profiling.py).
+
+Subcommands import what they use inside their run_* function, so a CLI run
+or worker never loads Streamlit (see bench_imports.py for import times).
 """
 
+import argparse
+import importlib.util
 import subprocess
 import sys
 import os
+import time
 
-def check_requirements():
-    """Check if required packages are installed"""
-    try:
-        import streamlit
-        import requests
-        import bs4
-        import feedgenerator
-        import validators
-        print("✓ All required packages are installed")
-        return True
-    except ImportError as e:
-        print(f"❌ Missing required package: {e}")
-        print("Please run: pip install -r requirements.txt")
+# Packages every command needs; the Streamlit app needs streamlit on top
+REQUIRED_PACKAGES = ["requests", "bs4", "feedgenerator", "validators"]
+APP_PACKAGES = ["streamlit"] + REQUIRED_PACKAGES
+
+def check_requirements(packages=REQUIRED_PACKAGES):
+    """Check if required packages are installed (without importing them)"""
+    missing = [name for name in packages if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"❌ Missing required packages: {', '.join(missing)}", file=sys.stderr)
+        print("Please run: pip install -r requirements.txt", file=sys.stderr)
         return False
+    print("✓ All required packages are installed", file=sys.stderr)
+    return True
 
-def main():
-    print("🚀 Starting RSS Architect...")
-    
-    if not check_requirements():
-        sys.exit(1)
-    
+def run_app(args):
+    """Run the Streamlit app"""
     # Run Streamlit app with browser auto-open disabled to avoid distutils error
     try:
         cmd = [
@@ -43,5 +58,277 @@ def main():
         print(f"❌ Error running application: {e}")
         sys.exit(1)
 
+def run_profiled(args, name, work):
+    """Call work(profiler), under a Profiler when --profile DIR was given (else with None)"""
+    if not args.profile:
+        return work(None)
+
+    from profiling import Profiler
+
+    profiler = Profiler(args.profile, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+    try:
+        with profiler:
+            return work(profiler)
+    finally:
+        print(f"📊 Profile written: {', '.join(profiler.files)}", file=sys.stderr)
+
+def analysis_options(args):
+    """RSSDiscovery page analysis arguments from the --max-candidates/--max-text-chars/--measure-memory flags"""
+    return {
+        'max_link_candidates': args.max_candidates,
+        'max_text_chars': args.max_text_chars,
+        'measure_memory': args.measure_memory
+    }
+
+def format_page_memory(costs):
+    """One line on the page analysis' peak memory and content candidates, or None if not measured"""
+    parse_cost = costs.get('parse_html', {})
+    if 'peak_bytes' not in parse_cost:
+        return None
+    line = f"🧠 Page analysis peak memory: {parse_cost['peak_bytes'] / 1024 / 1024:.1f} MB"
+    content = costs.get('content_scan')
+    if content:
+        line += (f" ({content['candidates']} candidates kept, {content['duplicates']} duplicates, "
+                 f"{content['dropped']} over the cap)")
+    return line
+
+def run_scan(args):
+    """Scan one site and print the discovered feeds"""
+    import json
+    from rss_discovery import RSSDiscovery
+    from url_utils import normalize_url
+
+    url = normalize_url(args.url)
+    if args.replay and not args.snapshots:
+        print("❌ --replay needs --snapshots DIR", file=sys.stderr)
+        sys.exit(1)
+
+    snapshot_store = None
+    if args.snapshots:
+        from snapshot_store import SnapshotStore
+        snapshot_store = SnapshotStore(args.snapshots)
+
+    def scan(profiler):
+        discovery = RSSDiscovery(verbose_logging=not args.json, use_sitemaps=not args.no_sitemaps, profiler=profiler,
+                                 snapshot_store=snapshot_store, replay=args.replay, **analysis_options(args))
+        return discovery.find_rss_feeds(url)
+
+    started = time.time()
+    result = run_profiled(args, "scan", scan)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    for feed in result['feeds']:
+        print(f"  📡 {feed['title']}: {feed['url']}")
+    if result['error']:
+        print(f"⚠️  {result['error']}")
+    memory_line = format_page_memory(result['method_costs'])
+    if memory_line:
+        print(memory_line)
+    print(f"⏱️  Scanned {url} in {time.time() - started:.1f}s")
+
+def run_prewarm(args):
+    """Scan a list of sites and store the results in the DiscoveryResults table"""
+    from batch_discovery import read_site_list, prewarm
+
+    sites = read_site_list(args.sites_file)
+    print(f"🔥 Pre-warming discovery cache for {len(sites)} sites...")
+    summary = run_profiled(args, "prewarm", lambda profiler: prewarm(
+        sites, db_path=args.db, workers=args.workers, force=args.force, profiler=profiler,
+        snapshot_dir=args.snapshots, parse_processes=args.parse_processes,
+        discovery_options=analysis_options(args)))
+    print(f"✅ Done in {summary['elapsed']:.1f}s: {summary['scanned']} scanned, "
+          f"{summary['cached']} already cached, {summary['failed']} failed, "
+          f"{summary['cached_errors']} cached failures, {summary['feeds']} feeds")
+    if summary['peak_page_memory']:
+        peak = summary['peak_page_memory']
+        print(f"🧠 Largest page analysis: {peak['peak_bytes'] / 1024 / 1024:.1f} MB peak ({peak['url']})")
+    pipeline = summary['pipeline']
+    print(f"🧵 Pipeline: fetch {pipeline['fetch_seconds']:.1f}s, parse {pipeline['parse_seconds']:.1f}s, "
+          f"finish {pipeline['finish_seconds']:.1f}s busy; fetchers waited {pipeline['fetch_blocked_seconds']:.1f}s "
+          f"on parsing")
+    dns = summary['dns']
+    print(f"🌐 DNS: {dns['lookups']} lookups, {dns['misses']} resolved, {dns['negative_hits']} failed fast "
+          f"from cache, ~{dns['saved_seconds']:.1f}s saved")
+
+def run_replay(args):
+    """Re-run discovery for a list of sites from recorded snapshots, without network access"""
+    import json
+    from batch_discovery import read_site_list, replay
+
+    sites = read_site_list(args.sites_file)
+    print(f"⏪ Replaying discovery for {len(sites)} sites from {args.snapshots}...")
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+
+    def on_result(url, result):
+        if output:
+            output.write(json.dumps({'site_url': url, **result}) + "\n")
+
+    try:
+        summary = replay(sites, args.snapshots, processes=args.processes, on_result=on_result)
+    finally:
+        if output:
+            output.close()
+    print(f"✅ Done in {summary['elapsed']:.1f}s ({summary['cpu_seconds']:.1f}s CPU): "
+          f"{summary['with_feeds']}/{summary['sites']} sites with feeds, {summary['feeds']} feeds, "
+          f"{summary['paywalls']} paywalls, {summary['errors']} errors")
+
+def run_serve_api(args):
+    """Run the headless JSON HTTP API"""
+    from api_server import serve
+
+    serve(host=args.host, port=args.port, db_path=args.db, workers=args.workers,
+          scan_workers=args.scan_workers, request_timeout=args.request_timeout,
+          discover_timeout=args.discover_timeout, verbose=args.verbose)
+
+def run_enqueue(args):
+    """Queue discovery jobs for a list of sites"""
+    from batch_discovery import read_site_list
+    from job_queue import JobQueue
+    from url_utils import dedupe_urls
+
+    sites = dedupe_urls(read_site_list(args.sites_file))
+    count = JobQueue(args.db).enqueue_many(sites, force=args.force, max_attempts=args.max_attempts)
+    print(f"📥 Queued {count} discovery jobs")
+
+def run_worker(args):
+    """Run discovery worker processes against the job queue"""
+    from discovery_worker import start_workers
+
+    start_workers(processes=args.processes, db_path=args.db,
+                  visibility_timeout=args.visibility_timeout, poll_interval=args.poll_interval)
+
+def run_queue_stats(args):
+    """Print job queue statistics"""
+    import json
+    from job_queue import JobQueue
+
+    print(json.dumps(JobQueue(args.db).stats(window_seconds=args.window), indent=2))
+
+def run_check_health(args):
+    """Check saved feeds that are due and record their health"""
+    from db_manager import DatabaseManager
+    from feed_health import FeedHealthChecker, OK
+
+    def check(profiler):
+        checker = FeedHealthChecker(DatabaseManager(args.db), workers=args.workers, timeout=args.timeout,
+                                    profiler=profiler)
+        if args.loop:
+            checker.run_forever()
+            return []
+        return checker.check_due()
+
+    if args.loop:
+        print("🩺 Checking feeds as they come due (Ctrl+C to stop)")
+        try:
+            run_profiled(args, "check-health", check)
+        except KeyboardInterrupt:
+            print("\n👋 Feed health checker stopped")
+        return
+
+    results = run_profiled(args, "check-health", check)
+    failing = sum(1 for health in results if health['status'] != OK)
+    print(f"🩺 Checked {len(results)} feeds ({failing} failing)")
+
+def build_parser():
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(description="RSS Architect launcher")
+    subparsers = parser.add_subparsers(dest="command")
+
+    # Shared by the subcommands that can be profiled
+    profile_parent = argparse.ArgumentParser(add_help=False)
+    profile_parent.add_argument("--profile", metavar="DIR",
+                                help="Write a CPU profile, wall-clock spans and memory statistics to DIR")
+
+    app_parser = subparsers.add_parser("app", help="Start the Streamlit app (default)")
+    app_parser.set_defaults(func=run_app)
+
+    # Shared by the subcommands that scan pages
+    analysis_parent = argparse.ArgumentParser(add_help=False)
+    analysis_parent.add_argument("--max-candidates", type=int, default=5000,
+                                 help="Feed candidates kept from one page's content")
+    analysis_parent.add_argument("--max-text-chars", type=int, default=2_000_000,
+                                 help="Page text characters scanned for feed URLs and paywall keywords")
+    analysis_parent.add_argument("--measure-memory", action="store_true",
+                                 help="Report the peak memory of each page analysis (slower)")
+
+    scan_parser = subparsers.add_parser("scan", parents=[profile_parent, analysis_parent],
+                                        help="Scan one site from the command line")
+    scan_parser.add_argument("url", help="Site URL to scan")
+    scan_parser.add_argument("--json", action="store_true", help="Print the full result as JSON")
+    scan_parser.add_argument("--no-sitemaps", action="store_true", help="Skip sitemap discovery")
+    scan_parser.add_argument("--snapshots", metavar="DIR", help="Record every response into a snapshot store")
+    scan_parser.add_argument("--replay", action="store_true", help="Answer requests from --snapshots instead of the network")
+    scan_parser.set_defaults(func=run_scan)
+
+    prewarm_parser = subparsers.add_parser("prewarm", parents=[profile_parent, analysis_parent],
+                                           help="Pre-warm the discovery cache for a site list")
+    prewarm_parser.add_argument("sites_file", help="Text file with one site URL per line")
+    prewarm_parser.add_argument("--db", default="feed_storage.db", help="SQLite database path")
+    prewarm_parser.add_argument("--workers", type=int, default=4, help="Fetch threads (and as many finishing threads)")
+    prewarm_parser.add_argument("--parse-processes", type=int, default=None,
+                                help="HTML parsing processes (default: CPU count; 0 parses on the fetch threads)")
+    prewarm_parser.add_argument("--force", action="store_true", help="Rescan sites that already have fresh results")
+    prewarm_parser.add_argument("--snapshots", metavar="DIR", help="Record every response into a snapshot store")
+    prewarm_parser.set_defaults(func=run_prewarm)
+
+    replay_parser = subparsers.add_parser("replay", help="Re-run discovery offline from recorded snapshots")
+    replay_parser.add_argument("sites_file", help="Text file with one site URL per line")
+    replay_parser.add_argument("--snapshots", metavar="DIR", required=True, help="Snapshot store recorded by prewarm/scan")
+    replay_parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    replay_parser.add_argument("--output", metavar="FILE", help="Write one JSON result per site to FILE")
+    replay_parser.set_defaults(func=run_replay)
+
+    api_parser = subparsers.add_parser("serve-api", help="Start the headless JSON HTTP API")
+    api_parser.add_argument("--host", default="127.0.0.1", help="Address to bind")
+    api_parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    api_parser.add_argument("--db", default="feed_storage.db", help="SQLite database path")
+    api_parser.add_argument("--workers", type=int, default=16, help="Request worker threads")
+    api_parser.add_argument("--scan-workers", type=int, default=4, help="Concurrent discovery scans")
+    api_parser.add_argument("--request-timeout", type=float, default=30, help="Socket timeout per request (seconds)")
+    api_parser.add_argument("--discover-timeout", type=float, default=60, help="Max wait for a synchronous /discover")
+    api_parser.add_argument("--verbose", action="store_true", help="Log every request")
+    api_parser.set_defaults(func=run_serve_api)
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="Queue discovery jobs for a site list")
+    enqueue_parser.add_argument("sites_file", help="Text file with one site URL per line")
+    enqueue_parser.add_argument("--db", default="feed_storage.db", help="SQLite database path")
+    enqueue_parser.add_argument("--force", action="store_true", help="Rescan sites that already have fresh results")
+    enqueue_parser.add_argument("--max-attempts", type=int, default=3, help="Attempts before a job is marked failed")
+    enqueue_parser.set_defaults(func=run_enqueue)
+
+    worker_parser = subparsers.add_parser("worker", help="Run discovery worker processes")
+    worker_parser.add_argument("-n", "--processes", type=int, default=2, help="Number of worker processes")
+    worker_parser.add_argument("--db", default="feed_storage.db", help="SQLite database path")
+    worker_parser.add_argument("--visibility-timeout", type=float, default=120,
+                               help="Seconds before an unrenewed lease expires and the job is requeued")
+    worker_parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between polls of an empty queue")
+    worker_parser.set_defaults(func=run_worker)
+
+    stats_parser = subparsers.add_parser("queue-stats", help="Show job queue statistics")
+    stats_parser.add_argument("--db", default="feed_storage.db", help="SQLite database path")
+    stats_parser.add_argument("--window", type=float, default=3600, help="Window in seconds for latency and throughput")
+    stats_parser.set_defaults(func=run_queue_stats)
+
+    health_parser = subparsers.add_parser("check-health", parents=[profile_parent], help="Check saved feeds that are due")
+    health_parser.add_argument("--db", default="feed_storage.db", help="SQLite database path")
+    health_parser.add_argument("--workers", type=int, default=16, help="Concurrent checks")
+    health_parser.add_argument("--timeout", type=float, default=10, help="Per-feed request timeout in seconds")
+    health_parser.add_argument("--loop", action="store_true", help="Keep running and check feeds as they come due")
+    health_parser.set_defaults(func=run_check_health)
+
+    return parser
+
+def main():
+    args = build_parser().parse_args()
+    # Status lines go to stderr so stdout carries only a command's output (scan --json, queue-stats)
+    print("🚀 Starting RSS Architect...", file=sys.stderr)
+
+    func = getattr(args, "func", run_app)
+    if not check_requirements(APP_PACKAGES if func is run_app else REQUIRED_PACKAGES):
+        sys.exit(1)
+
+    func(args)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
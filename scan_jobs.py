@@ -0,0 +1,160 @@
+"""
+Background scan jobs for the Streamlit UI and the HTTP API.
+
+Scans run on a bounded thread pool owned by the server process, so they keep
+going across reruns and page changes. Callers keep only job IDs and poll job
+snapshots (or wait on them); feeds are published as each discovery method
+finds them.
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+
+from feed_cache import DiscoveryCache
+from url_utils import canonical_key
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+PHASE_LABELS = {
+    'fetch': 'Fetching page',
+    'html_links': 'Reading HTML feed links',
+    'content_scan': 'Scanning page content',
+    'pattern_test': 'Probing common feed URLs',
+    'sitemap': 'Reading sitemaps'
+}
+
+
+class ScanJob:
+    """State of one background scan; mutated only by its worker thread."""
+
+    def __init__(self, job_id: int, url: str):
+        self.id = job_id
+        self.url = url
+        self.status = QUEUED
+        self.phase = 'Queued'
+        self.feeds: List[Dict] = []
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.finished = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def handle_event(self, event: Dict):
+        """Apply a find_rss_feeds_iter event: publish feeds and track the current phase."""
+        with self._lock:
+            if event['event'] == 'feed':
+                self.feeds.append(event['feed'])
+            elif event['event'] == 'progress' and event['status'] == 'started':
+                self.phase = PHASE_LABELS.get(event['method'], 'Scanning')
+
+    def snapshot(self) -> Dict:
+        """Return a consistent copy of the job state for rendering."""
+        with self._lock:
+            return {
+                'id': self.id,
+                'url': self.url,
+                'status': self.status,
+                'phase': self.phase,
+                'feeds': list(self.feeds),
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at
+            }
+
+
+class ScanJobManager:
+    """Runs scans on a bounded executor and keeps recent jobs for polling."""
+
+    def __init__(self, discovery_cache: DiscoveryCache, max_workers: int = 4, max_jobs: int = 500):
+        self.discovery_cache = discovery_cache
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scan-job')
+        self._jobs: Dict[int, ScanJob] = {}
+        self._active_by_url: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, url: str, force: bool = False) -> int:
+        """Start (or join) a scan of url and return its job ID."""
+        with self._lock:
+            key = canonical_key(url)
+            job_id = self._active_by_url.get(key)
+            if job_id is not None:
+                return job_id
+
+            job = ScanJob(next(self._ids), url)
+            self._jobs[job.id] = job
+            self._active_by_url[key] = job.id
+            self._prune()
+
+        self._executor.submit(self._run, job, force)
+        return job.id
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        """Return a snapshot of a job, or None if it is unknown or pruned."""
+        job = self._jobs.get(job_id)
+        return job.snapshot() if job else None
+
+    def wait(self, job_id: int, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Block until a job finishes (or timeout) and return its snapshot."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.finished.wait(timeout)
+        return job.snapshot()
+
+    def _run(self, job: ScanJob, force: bool):
+        """Worker body: serve from the discovery cache or scan progressively (sharing in-flight scans)."""
+        with job._lock:
+            job.status = RUNNING
+            job.phase = 'Scanning'
+        try:
+            result = self.discovery_cache.find_rss_feeds(job.url, force=force, on_event=job.handle_event)
+
+            with job._lock:
+                # The final deduplicated list replaces the progressive one
+                job.feeds = list(result['feeds'])
+                job.result = result
+                job.status = DONE
+                job.phase = 'Done'
+        except Exception as e:
+            with job._lock:
+                job.error = str(e)
+                job.status = FAILED
+                job.phase = 'Failed'
+        finally:
+            with job._lock:
+                job.finished_at = time.time()
+            with self._lock:
+                key = canonical_key(job.url)
+                if self._active_by_url.get(key) == job.id:
+                    del self._active_by_url[key]
+            job.finished.set()
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond max_jobs (caller holds the lock)."""
+        if len(self._jobs) <= self.max_jobs:
+            return
+        finished = sorted((job for job in self._jobs.values() if not job.is_active), key=lambda job: job.created_at)
+        for job in finished[:len(self._jobs) - self.max_jobs]:
+            del self._jobs[job.id]
+
+    def stats(self) -> Dict:
+        """Return job counts by status."""
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
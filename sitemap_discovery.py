@@ -0,0 +1,207 @@
+"""
+Sitemap-based discovery of feed URLs and recent article URLs.
+
+Sitemaps are found through robots.txt 'Sitemap:' lines (falling back to
+/sitemap.xml) and followed through sitemap indexes. Each document is streamed
+into an incremental XML parser and every <url>/<sitemap> element is dropped
+as soon as it has been read, so memory stays constant however large the
+sitemap is. Only the newest max_articles article candidates are kept (in a
+heap). Byte, entry and sitemap budgets bound the cost of a scan.
+"""
+
+import heapq
+import time
+import zlib
+import xml.etree.ElementTree as ET
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from profiling import span
+
+CHUNK_SIZE = 64 * 1024
+
+# robots.txt is read line by line and never beyond this many bytes
+MAX_ROBOTS_BYTES = 512 * 1024
+
+
+def _local_name(tag: str) -> str:
+    """'{http://www.sitemaps.org/schemas/sitemap/0.9}loc' -> 'loc'"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_date(value: Optional[str]) -> float:
+    """W3C datetime (as used by <lastmod>) to a timestamp; 0 if missing or invalid."""
+    if not value:
+        return 0.0
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return 0.0
+    try:
+        return parsed.timestamp()
+    except (OverflowError, OSError):
+        return 0.0
+
+
+class SitemapDiscovery:
+    """
+    Reads a site's sitemaps within a budget.
+
+    max_bytes and max_entries are totals across every sitemap of one scan
+    (bytes after decompression); max_sitemaps caps how many documents are
+    fetched, and max_depth how deep sitemap indexes are followed.
+    """
+
+    def __init__(self, headers: Optional[Dict] = None, is_feed_url: Optional[Callable[[str], bool]] = None,
+                 max_bytes: int = 5 * 1024 * 1024, max_entries: int = 50000, max_sitemaps: int = 10,
+                 max_depth: int = 2, max_articles: int = 50, timeout: float = 10, profiler=None, http=None):
+        self.headers = headers or {'User-Agent': 'Mozilla/5.0 (compatible; RSS Architect)'}
+        self.is_feed_url = is_feed_url or (lambda url: False)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_sitemaps = max_sitemaps
+        self.max_depth = max_depth
+        self.max_articles = max_articles
+        self.timeout = timeout
+        self.profiler = profiler
+        # requests itself, or a session such as a snapshot store's
+        self.http = http or requests
+
+    def sitemaps_from_robots(self, base_url: str) -> List[str]:
+        """Sitemap URLs listed in the site's robots.txt (empty if none or unreachable)."""
+        sitemaps = []
+        try:
+            with span(self.profiler, 'GET robots.txt', 'request', url=base_url), \
+                    self.http.get(urljoin(base_url, '/robots.txt'), headers=self.headers,
+                                  timeout=self.timeout, stream=True) as response:
+                if response.status_code != 200:
+                    return []
+                read = 0
+                for line in response.iter_lines(decode_unicode=False):
+                    read += len(line) + 1
+                    if read > MAX_ROBOTS_BYTES:
+                        break
+                    name, _, value = line.decode('utf-8', 'replace').partition(':')
+                    if name.strip().lower() == 'sitemap' and value.strip():
+                        sitemaps.append(urljoin(base_url, value.strip()))
+        except requests.RequestException:
+            return []
+        return list(dict.fromkeys(sitemaps))
+
+    def _iter_chunks(self, url: str) -> Iterator[bytes]:
+        """Stream a sitemap body, gunzipping .xml.gz files on the fly."""
+        with self.http.get(url, headers=self.headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code != 200:
+                return
+            decompressor = None
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if decompressor is None and chunk[:2] == b'\x1f\x8b':
+                    # Gzipped file (not just gzip transfer encoding, which requests already undid)
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                if decompressor is not None:
+                    chunk = decompressor.decompress(chunk, CHUNK_SIZE * 4)
+                    while decompressor.unconsumed_tail:
+                        yield chunk
+                        chunk = decompressor.decompress(decompressor.unconsumed_tail, CHUNK_SIZE * 4)
+                yield chunk
+
+    def _iter_entries(self, url: str, budget: Dict) -> Iterator[Tuple[str, Dict]]:
+        """
+        Yield ('url', entry) or ('sitemap', entry) for each entry of one sitemap
+        document, spending from budget['bytes'] and budget['entries'].
+        """
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        root = None
+        fields: Dict[str, str] = {}
+        try:
+            for chunk in self._iter_chunks(url):
+                budget['bytes'] += len(chunk)
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    name = _local_name(elem.tag)
+                    if event == 'start':
+                        if root is None:
+                            root = elem
+                        elif name in ('url', 'sitemap'):
+                            fields = {}
+                        continue
+                    if name in ('url', 'sitemap'):
+                        if fields.get('loc'):
+                            budget['entries'] += 1
+                            yield name, fields
+                        fields = {}
+                        # Drop everything parsed so far: keeps memory flat
+                        root.clear()
+                    elif elem is not root and elem.text and name in ('loc', 'lastmod', 'publication_date', 'title'):
+                        fields.setdefault(name, elem.text.strip())
+                    if budget['entries'] >= self.max_entries:
+                        budget['truncated'] = True
+                        return
+                if budget['bytes'] >= self.max_bytes:
+                    budget['truncated'] = True
+                    return
+        except ET.ParseError:
+            # Malformed or HTML error page: keep whatever was read before it
+            budget['errors'] += 1
+        except zlib.error:
+            # Corrupt .xml.gz: keep whatever was read before it
+            budget['errors'] += 1
+        except requests.RequestException:
+            budget['errors'] += 1
+
+    def discover(self, base_url: str) -> Dict:
+        """
+        Read the sitemaps of base_url's site.
+
+        Returns {'feeds': [...], 'articles': [...], 'stats': {...}} where
+        articles are the newest entries (by lastmod or news publication date)
+        as {'url', 'title', 'published'} and stats holds the scan's cost.
+        """
+        started = time.time()
+        parsed = urlparse(base_url)
+        site_root = f"{parsed.scheme}://{parsed.netloc}"
+        budget = {'bytes': 0, 'entries': 0, 'sitemaps': 0, 'errors': 0, 'truncated': False}
+
+        seeds = self.sitemaps_from_robots(site_root) or [f"{site_root}/sitemap.xml"]
+        pending = deque((sitemap_url, 0) for sitemap_url in seeds)
+        visited = set()
+        feeds: Dict[str, Dict] = {}
+        articles: List[Tuple[float, int, Dict]] = []  # min-heap of the newest max_articles
+        order = 0
+
+        while pending and not budget['truncated'] and budget['sitemaps'] < self.max_sitemaps:
+            sitemap_url, depth = pending.popleft()
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            budget['sitemaps'] += 1
+
+            fetch_started = time.perf_counter()
+            for kind, entry in self._iter_entries(sitemap_url, budget):
+                loc = urljoin(sitemap_url, entry['loc'])
+                if kind == 'sitemap':
+                    if depth < self.max_depth:
+                        pending.append((loc, depth + 1))
+                elif self.is_feed_url(loc):
+                    feeds.setdefault(loc, {'url': loc, 'title': entry.get('title') or '', 'type': 'sitemap-discovered'})
+                elif self.max_articles > 0:
+                    published = _parse_date(entry.get('publication_date') or entry.get('lastmod'))
+                    order += 1
+                    item = (published, -order, {'url': loc, 'title': entry.get('title') or '', 'published': published or None})
+                    if len(articles) < self.max_articles:
+                        heapq.heappush(articles, item)
+                    elif item[:2] > articles[0][:2]:
+                        heapq.heapreplace(articles, item)
+            if self.profiler is not None:
+                self.profiler.record('GET sitemap', 'request', fetch_started, url=sitemap_url)
+
+        budget['truncated'] = budget['truncated'] or bool(pending)
+        return {
+            'feeds': list(feeds.values()),
+            'articles': [item[2] for item in sorted(articles, key=lambda item: item[:2], reverse=True)],
+            'stats': {**budget, 'seconds': time.time() - started}
+        }
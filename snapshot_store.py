@@ -0,0 +1,217 @@
+"""
+Compressed, content-addressed store of raw HTTP responses.
+
+Bodies are zlib-compressed and stored once per SHA-256 under
+<root>/objects/ab/cdef..., and an SQLite index (<root>/index.db) maps each
+request (method + canonicalized URL) to the response seen at each fetch time.
+
+The store plugs into requests as a transport adapter:
+
+    session = store.session()             # record: real requests, saved as they happen
+    session = store.session(replay=True)  # replay: answered from snapshots, no network
+
+Every hop of a redirect is a separate snapshot, so replay follows the same
+redirects the live fetch did.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from url_utils import canonicalize_url
+
+# Larger bodies are stored truncated (sitemap budgets stop well before this)
+MAX_BODY_BYTES = 20 * 1024 * 1024
+
+# Headers that describe the encoded transfer, not the stored (decoded) body
+TRANSFER_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+
+class SnapshotStore:
+    def __init__(self, root_dir: str = "snapshots", compression_level: int = 6):
+        self.root_dir = root_dir
+        self.compression_level = compression_level
+        self.db_path = os.path.join(root_dir, "index.db")
+        os.makedirs(os.path.join(root_dir, "objects"), exist_ok=True)
+        self.init_index()
+
+    def init_index(self):
+        """Create the Snapshots table and its index if they don't exist."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS Snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    method TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    url_key TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    headers_json TEXT NOT NULL,
+                    sha256 TEXT,
+                    size INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_snapshots_lookup
+                ON Snapshots (url_key, method, fetched_at)
+            """)
+            conn.commit()
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.root_dir, "objects", sha256[:2], sha256[2:])
+
+    def put_body(self, body: bytes) -> str:
+        """Store a body once (compressed) and return its SHA-256."""
+        sha256 = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent writers never expose a partial object
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(body, self.compression_level))
+            os.replace(tmp_path, path)
+        return sha256
+
+    def read_body(self, sha256: str) -> bytes:
+        """Read and decompress a stored body."""
+        with open(self._object_path(sha256), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def save(self, method: str, url: str, status_code: int, headers: Dict, body: Optional[bytes],
+             fetched_at: Optional[float] = None) -> int:
+        """Record one response; returns the snapshot ID."""
+        sha256 = self.put_body(body) if body else None
+        headers = {name: value for name, value in headers.items() if name.lower() not in TRANSFER_HEADERS}
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO Snapshots (method, url, url_key, fetched_at, status_code, headers_json, sha256, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (method.upper(), url, canonicalize_url(url), time.time() if fetched_at is None else fetched_at,
+                  status_code, json.dumps(headers), sha256, len(body) if body else 0))
+            conn.commit()
+            return cursor.lastrowid
+
+    def latest(self, method: str, url: str, as_of: Optional[float] = None) -> Optional[Dict]:
+        """The newest snapshot of a request (fetched at or before as_of, if given)."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, url, fetched_at, status_code, headers_json, sha256, size
+                FROM Snapshots
+                WHERE url_key = ? AND method = ? AND fetched_at <= ?
+                ORDER BY fetched_at DESC
+                LIMIT 1
+            """, (canonicalize_url(url), method.upper(), float('inf') if as_of is None else as_of))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            snapshot_id, stored_url, fetched_at, status_code, headers_json, sha256, size = row
+            return {
+                'id': snapshot_id,
+                'url': stored_url,
+                'fetched_at': fetched_at,
+                'status_code': status_code,
+                'headers': json.loads(headers_json),
+                'sha256': sha256,
+                'size': size
+            }
+
+    def session(self, replay: bool = False, as_of: Optional[float] = None) -> requests.Session:
+        """A requests session that records into (or, with replay, answers from) this store."""
+        session = requests.Session()
+        adapter = SnapshotAdapter(self, replay=replay, as_of=as_of)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def stats(self) -> Dict:
+        """Snapshot and object counts, with raw and compressed sizes."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*), COUNT(DISTINCT url_key), COUNT(DISTINCT sha256) FROM Snapshots")
+            snapshots, urls, objects = cursor.fetchone()
+            cursor.execute("""
+                SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT sha256, size FROM Snapshots WHERE sha256 IS NOT NULL)
+            """)
+            raw_bytes = cursor.fetchone()[0]
+
+        compressed_bytes = 0
+        for directory, _, files in os.walk(os.path.join(self.root_dir, "objects")):
+            compressed_bytes += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        return {
+            'snapshots': snapshots,
+            'urls': urls,
+            'objects': objects,
+            'raw_bytes': raw_bytes,
+            'compressed_bytes': compressed_bytes
+        }
+
+
+class SnapshotAdapter(HTTPAdapter):
+    """Transport adapter that records responses into a SnapshotStore, or replays them."""
+
+    def __init__(self, store: SnapshotStore, replay: bool = False, as_of: Optional[float] = None):
+        super().__init__()
+        self.store = store
+        self.replay = replay
+        self.as_of = as_of
+
+    def send(self, request, **kwargs):
+        if self.replay:
+            return self._replay(request)
+
+        response = super().send(request, **kwargs)
+        body = b'' if request.method == 'HEAD' else self._read_body(response)
+        # Serve the body we just read to the caller as if it were never streamed
+        response._content = body
+        response._content_consumed = True
+        response.raw.release_conn()
+        self.store.save(request.method, request.url, response.status_code, dict(response.headers), body)
+        return response
+
+    def _read_body(self, response: requests.Response) -> bytes:
+        """
+        Up to MAX_BODY_BYTES of the decoded body. iter_content turns urllib3 read
+        errors into requests exceptions, which callers already handle.
+        """
+        chunks = []
+        size = 0
+        try:
+            for chunk in response.iter_content(64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= MAX_BODY_BYTES:
+                    break
+        except requests.RequestException:
+            response.close()
+            raise
+        return b''.join(chunks)[:MAX_BODY_BYTES]
+
+    def _replay(self, request) -> requests.Response:
+        """Build a response from the newest matching snapshot."""
+        snapshot = self.store.latest(request.method, request.url, self.as_of)
+        if snapshot is None:
+            raise requests.ConnectionError(f"No snapshot for {request.method} {request.url}", request=request)
+
+        response = requests.Response()
+        response.status_code = snapshot['status_code']
+        response.headers = CaseInsensitiveDict(snapshot['headers'])
+        response.url = request.url
+        response.request = request
+        response.reason = 'Replayed'
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = self.store.read_body(snapshot['sha256']) if snapshot['sha256'] else b''
+        response._content_consumed = True
+        return response
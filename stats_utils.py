@@ -0,0 +1,14 @@
+"""
+Small statistics helpers shared by the load generators and queue-stats.
+"""
+
+import math
+from typing import List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
@@ -0,0 +1,119 @@
+"""AsyncRSSDiscovery must return what RSSDiscovery returns for the same sites, hostile ones included."""
+
+import asyncio
+import gzip
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from async_discovery import AsyncRSSDiscovery
+from rss_discovery import RSSDiscovery
+
+PAGE = (b'<html><head><link rel="alternate" type="application/rss+xml" href="/feed.xml"></head>'
+        b'<body><a href="/news/rss.xml">News feed</a><p>https://example.org/blog/atom.xml</p></body></html>')
+FEED = b'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title></channel></rss>'
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def _respond(self, with_body: bool):
+        path = self.path.split('?')[0]
+        if path == '/':
+            self._send(200, 'text/html', PAGE, with_body)
+        elif path in ('/feed.xml', '/rss.xml'):
+            self._send(200, 'application/rss+xml', FEED, with_body)
+        elif path == '/redirect/':
+            self._send(301, 'text/html', b'', with_body, {'Location': '/gzip/'})
+        elif path == '/gzip/':
+            self._send(200, 'text/html', gzip.compress(PAGE), with_body, {'Content-Encoding': 'gzip'})
+        elif path == '/huge-header/':
+            self._send(200, 'text/html', PAGE, with_body, {'X-Padding': 'x' * 70000})
+        elif path == '/bad-deflate/':
+            self._send(200, 'text/html', b'not deflate at all', with_body, {'Content-Encoding': 'deflate'})
+        elif path == '/bad-gzip/':
+            self._send(200, 'text/html', b'\x1f\x8b' + b'x' * 30, with_body, {'Content-Encoding': 'gzip'})
+        else:
+            self._send(404, 'text/plain', b'Not found', with_body)
+
+    def _send(self, status, content_type, body, with_body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 64
+
+
+def comparable(result):
+    """A find_rss_feeds result without timings."""
+    return {key: value for key, value in result.items() if key != 'method_costs'}
+
+
+class AsyncParityTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FixtureServer(('127.0.0.1', 0), FixtureHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def scan_both(self, url):
+        sync_result = RSSDiscovery(verbose_logging=False, use_sitemaps=False).find_rss_feeds(url)
+
+        async def scan():
+            async with AsyncRSSDiscovery(use_sitemaps=False) as discovery:
+                return await discovery.find_rss_feeds(url)
+
+        return sync_result, asyncio.run(scan())
+
+    def assert_same(self, path):
+        sync_result, async_result = self.scan_both(self.base + path)
+        self.assertEqual(comparable(async_result), comparable(sync_result))
+        self.assertEqual(sorted(async_result['method_costs']), sorted(sync_result['method_costs']))
+        return async_result
+
+    def test_page_with_feeds(self):
+        result = self.assert_same('/')
+        self.assertIsNone(result['error'])
+        self.assertTrue(result['feeds'])
+
+    def test_redirect_to_gzip_page(self):
+        self.assertTrue(self.assert_same('/redirect/')['feeds'])
+
+    def test_hostile_responses_return_results(self):
+        for path in ('/huge-header/', '/bad-deflate/', '/bad-gzip/'):
+            with self.subTest(path=path):
+                self.assert_same(path)
+
+    def test_unreachable_and_tls_mismatch(self):
+        port = self.server.server_address[1]
+        for url in ("http://127.0.0.1:1/", f"https://127.0.0.1:{port}/"):
+            with self.subTest(url=url):
+                sync_result, async_result = self.scan_both(url)
+                self.assertEqual(comparable(async_result), comparable(sync_result))
+                self.assertTrue(async_result['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
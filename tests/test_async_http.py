@@ -0,0 +1,68 @@
+"""AsyncHTTPClient connection limits."""
+
+import asyncio
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from async_http import AsyncHTTPClient
+
+HOSTS = 5
+REQUESTS_PER_HOST = 8
+RESPONSE_DELAY = 0.2
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(RESPONSE_DELAY)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SlowServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 64
+
+
+class ConnectionLimitTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servers = [SlowServer(('127.0.0.1', 0), SlowHandler) for _ in range(HOSTS)]
+        for server in cls.servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in cls.servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_busy_host_does_not_hold_global_slots(self):
+        # Requests are queued host by host, so the first ones all wait on one host's slots
+        urls = [f"http://127.0.0.1:{server.server_address[1]}/{n}"
+                for server in self.servers for n in range(REQUESTS_PER_HOST)]
+
+        async def fetch_all():
+            client = AsyncHTTPClient(max_connections=HOSTS * 2, max_connections_per_host=2)
+            try:
+                responses = await asyncio.gather(*(client.get(url) for url in urls))
+                return responses, client.stats()
+            finally:
+                await client.close()
+
+        responses, stats = asyncio.run(fetch_all())
+        self.assertEqual([response.status_code for response in responses], [200] * len(urls))
+        self.assertEqual(stats['peak_active'], HOSTS * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+URL normalization and canonicalization.
+
+normalize_url()    - light cleanup used for display and storage of site URLs
+canonicalize_url() - a fetchable URL with tracking parameters, fragments,
+                     default ports and duplicate slashes removed
+canonical_key()    - an identity key that also folds http/https, 'www.' and
+                     trailing slashes, used for dedupe, caches and DB lookups
+dedupe_urls()      - normalized site list with equivalent forms removed
+CanonicalResolver  - follows a host's redirects once (cached per host) to
+                     learn its preferred scheme and 'www.' form
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the visitor and never change the content
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref_src', 'ref_url', 'cmpid', 'ncid'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """Normalize URL for consistent storage."""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}{parsed.path}".rstrip('/')
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _clean_query(query: str, sort: bool) -> str:
+    """Drop tracking parameters (and optionally sort the rest)."""
+    params = [(name, value) for name, value in parse_qsl(query, keep_blank_values=True)
+              if not _is_tracking_param(name)]
+    if sort:
+        params.sort()
+    return urlencode(params)
+
+
+def _split(url: str):
+    url = url.strip()
+    if '://' not in url:
+        url = 'https://' + url
+    return urlsplit(url)
+
+
+def _host_port(parts) -> Tuple[str, str]:
+    """Lowercased host (no trailing dot) and ':port' unless it is the scheme's default."""
+    try:
+        port = parts.port
+    except ValueError:
+        # Out-of-range or non-numeric port: keep the netloc as written
+        return parts.netloc.rpartition('@')[2].lower(), ''
+    host = (parts.hostname or '').lower().rstrip('.')
+    scheme = parts.scheme.lower()
+    if port and port != DEFAULT_PORTS.get(scheme):
+        return host, f":{port}"
+    return host, ''
+
+
+def canonicalize_url(url: str) -> str:
+    """Return a cleaned, still fetchable form of url."""
+    parts = _split(url)
+    scheme = parts.scheme.lower()
+    host, port = _host_port(parts)
+    path = re.sub(r'/{2,}', '/', parts.path) or '/'
+    return urlunsplit((scheme, host + port, path, _clean_query(parts.query, sort=False), ''))
+
+
+def canonical_key(url: str) -> str:
+    """
+    Identity key for a site or feed URL: 'example.com/feed?a=1' for
+    'https://www.Example.com/feed/?utm_source=x&a=1#top'.
+    """
+    parts = _split(url)
+    host, port = _host_port(parts)
+    if host.startswith('www.'):
+        host = host[4:]
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/')
+    query = _clean_query(parts.query, sort=True)
+    return host + port + path + (f"?{query}" if query else '')
+
+
+def dedupe_urls(urls) -> List[str]:
+    """Normalize urls, keeping the first of each group of equivalent forms."""
+    unique = {}
+    for url in urls:
+        url = normalize_url(url)
+        unique.setdefault(canonical_key(url), url)
+    return list(unique.values())
+
+
+class CanonicalResolver:
+    """
+    Learns each host's preferred scheme and 'www.' form by following the
+    redirects of its home page once; results are cached per host (LRU,
+    at most max_entries hosts).
+
+    Only redirects that stay on the same host (ignoring 'www.') are adopted,
+    so consent pages and login walls on other domains never become canonical.
+    """
+
+    def __init__(self, ttl_seconds: float = 24 * 3600, failure_ttl_seconds: float = 900, timeout: float = 5,
+                 http=None, max_entries: int = 4096):
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.timeout = timeout
+        self.max_entries = max_entries
+        # A session such as a snapshot store's; None for plain requests
+        self.http = http
+        self._targets: "OrderedDict[str, Tuple[float, Optional[Tuple[str, str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, scheme: str, netloc: str) -> Optional[Tuple[str, str]]:
+        """Return the (scheme, netloc) the host redirects to, or None to keep it as is."""
+        cache_key = f"{scheme}://{netloc}"
+        with self._lock:
+            entry = self._targets.get(cache_key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._targets.move_to_end(cache_key)
+                    return entry[1]
+                del self._targets[cache_key]
+
+        # Imported here so url_utils (and db_manager) load without requests
+        import requests
+
+        target = None
+        try:
+            response = (self.http or requests).head(f"{cache_key}/", timeout=self.timeout, allow_redirects=True,
+                                     headers={'User-Agent': 'Mozilla/5.0 (compatible; RSS Architect)'})
+            final = urlsplit(response.url)
+            same_site = (final.hostname or '').lower().removeprefix('www.') == netloc.lower().split(':')[0].removeprefix('www.')
+            if same_site and (final.scheme, final.netloc) != (scheme, netloc):
+                target = (final.scheme, final.netloc)
+            ttl = self.ttl_seconds
+        except requests.RequestException:
+            ttl = self.failure_ttl_seconds
+
+        with self._lock:
+            self._targets[cache_key] = (time.time() + ttl, target)
+            self._targets.move_to_end(cache_key)
+            while len(self._targets) > self.max_entries:
+                self._targets.popitem(last=False)
+        return target
+
+    def resolve(self, url: str) -> str:
+        """Return canonicalize_url(url) rewritten onto the host's redirect target."""
+        url = canonicalize_url(url)
+        parts = urlsplit(url)
+        target = self._lookup(parts.scheme, parts.netloc)
+        if target is None:
+            return url
+        return urlunsplit((target[0], target[1], parts.path, parts.query, ''))
+
+
+# Shared by every discovery entry point in the process
+canonical_resolver = CanonicalResolver()